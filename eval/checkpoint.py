@@ -0,0 +1,149 @@
+"""Turn-level journal of in-flight conversations, so an interrupted run resumes questions mid-conversation."""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+
+def get_checkpoint_dir(output_path: Path) -> Path:
+    """Return the directory holding the turn journals of a run, e.g. 'eval/runs/checkpoints/<run>/'."""
+    return output_path.parent / 'checkpoints' / output_path.stem
+
+
+class TurnJournal:
+    """Append-only journal of each in-flight conversation, written before every model request.
+
+    Each question has one JSONL file. A record holds only the messages added since the previous record (plus the
+    position they start at), the tool call counts and the token count, so a journal grows with the conversation
+    rather than quadratically. The system prompt is stored as a hash and checked on load, so a journal is only
+    resumed with the prompt it was written with. Records that are truncated, or that do not continue the messages
+    read so far (e.g. from a second worker writing the same question), are ignored.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+    ) -> None:
+        """Initialize the journal.
+
+        Parameters
+        ----------
+        directory : str | Path
+            Directory holding the journal files. Created if it does not exist.
+
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.offsets = {}  # Number of messages already journaled for each key
+
+    @staticmethod
+    def hash_prompt(system_prompt: str) -> str:
+        """Return a short hash of a system prompt."""
+        return hashlib.sha1(system_prompt.encode()).hexdigest()[:16]
+
+    def path(
+        self,
+        key: str,
+    ) -> Path:
+        """Return the journal file of a question."""
+        return self.directory / f'{hashlib.sha1(str(key).encode()).hexdigest()[:20]}.jsonl'
+
+    def append(
+        self,
+        key: str,
+        messages: list[dict],
+        tool_call_counts: dict,
+        token_count: int,
+    ) -> None:
+        """Journal the state of a conversation at the end of a turn, unless nothing changed since the last record.
+
+        Parameters
+        ----------
+        key : str
+            Identifier of the question, e.g. its dataset id.
+        messages : list[dict]
+            All messages of the conversation so far, starting with the system prompt.
+        tool_call_counts : dict
+            Number of calls per (tool name, JSON arguments) pair.
+        token_count : int
+            Number of tokens of the conversation so far.
+
+        """
+        offset = self.offsets.get(key, 1)
+        if key in self.offsets and offset == len(messages):
+            return
+        record = {
+            'prompt': self.hash_prompt(messages[0]['content']),
+            'offset': offset,
+            'messages': messages[offset:],
+            'tool_call_counts': [[name, arguments, count] for (name, arguments), count in tool_call_counts.items()],
+            'token_count': token_count,
+        }
+        with self.path(key).open('a') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.offsets[key] = len(messages)
+
+    def load(
+        self,
+        key: str,
+        system_prompt: str,
+    ) -> dict | None:
+        """Rebuild the state of a conversation from its journal.
+
+        Parameters
+        ----------
+        key : str
+            Identifier of the question.
+        system_prompt : str
+            The system prompt the conversation must have been started with.
+
+        Returns
+        -------
+        dict | None
+            The 'messages', 'tool_call_counts', 'token_count' and number of completed 'turns', or None if there is no
+            usable journal.
+
+        """
+        path = self.path(key)
+        if not path.exists():
+            return None
+
+        prompt_hash = self.hash_prompt(system_prompt)
+        messages = [{'role': 'system', 'content': system_prompt}]
+        state = None
+        records = 0
+        with path.open() as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('prompt') != prompt_hash or record.get('offset') != len(messages):
+                    continue
+                messages.extend(record['messages'])
+                records += 1
+                state = record
+
+        if state is None:
+            logging.warning(f'⚠️  Ignoring journal {path}: no records match the current system prompt.')
+            return None
+
+        self.offsets[key] = len(messages)
+        return {
+            'messages': messages,
+            'tool_call_counts': {(name, arguments): count for name, arguments, count in state['tool_call_counts']},
+            'token_count': state['token_count'],
+            'turns': records - 1,  # The first record is written before the first model request
+        }
+
+    def discard(
+        self,
+        key: str,
+    ) -> None:
+        """Delete the journal of a finished question."""
+        self.path(key).unlink(missing_ok=True)
+        self.offsets.pop(key, None)
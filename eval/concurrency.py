@@ -0,0 +1,170 @@
+"""Adaptive (AIMD) control of the number of in-flight LLM requests."""
+
+import logging
+import math
+import random
+import threading
+import time
+from collections import defaultdict, deque
+
+
+def percentile(
+    values: list[float],
+    q: float,
+) -> float | None:
+    """Return the q-th percentile (0-100) of a list of values by nearest rank, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def token_bucket(tokens: int | None) -> int | None:
+    """Return the bucket of a completion token count, half an octave wide (e.g. 1, 2, 3-4, 5-7, ...), or None."""
+    if tokens is None:
+        return None
+    return int(2 * math.log2(max(int(tokens), 0) + 1))
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = 1.0,
+    cap: float = 60.0,
+) -> float:
+    """Return a jittered exponential backoff delay in seconds for a (0-based) retry attempt."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class AIMDController:
+    """Limit the number of in-flight requests with additive-increase/multiplicative-decrease.
+
+    While latency stays flat the limit grows by one every `limit` successful requests (i.e. roughly once per round
+    of requests). On a rate limit, a timeout, or a latency spike (a latency above `spike_factor` times the recent
+    median of responses of about the same number of completion tokens, see `token_bucket`) the limit is multiplied
+    by `decrease_factor`, at most once per cool-down so a burst of failures from one overload only counts once.
+    Comparing like with like keeps both long answers and short ones (whose latency is mostly the fixed cost of the
+    prompt) from being mistaken for overload.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        decrease_factor: float = 0.5,
+        spike_factor: float = 2.0,
+        window: int = 200,
+        min_samples: int = 20,
+        cooldown: float = 5.0,
+    ) -> None:
+        """Initialize the controller.
+
+        Parameters
+        ----------
+        initial_limit : int
+            Number of requests allowed in flight at the start.
+        min_limit : int
+            Lower bound of the limit.
+        max_limit : int
+            Upper bound of the limit.
+        decrease_factor : float
+            Factor the limit is multiplied by when backing off.
+        spike_factor : float
+            A latency above this multiple of the recent median of its token bucket counts as a spike.
+        window : int
+            Number of recent latencies to keep for percentiles, overall and per token bucket.
+        min_samples : int
+            Number of latencies of a token bucket required before spikes are detected in it.
+        cooldown : float
+            Minimum number of seconds between two decreases.
+
+        """
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.spike_factor = spike_factor
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self.bucket_latencies = defaultdict(lambda: deque(maxlen=window))
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+        self.stats = {'requests': 0, 'increases': 0, 'decreases': 0, 'overloads': 0, 'spikes': 0}
+
+    def acquire(self) -> None:
+        """Block until a request may be sent, then count it as in flight."""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(
+        self,
+        latency: float | None = None,
+        overloaded: bool = False,
+        tokens: int | None = None,
+    ) -> None:
+        """Count a request as finished and adapt the limit.
+
+        Parameters
+        ----------
+        latency : float | None
+            Latency of the request in seconds, if it succeeded.
+        overloaded : bool
+            True if the request hit a rate limit or a timeout.
+        tokens : int | None
+            Number of completion tokens of the response. The latency is compared with those of responses of about
+            as many tokens, or with those of other requests without a token count if not given.
+
+        """
+        with self.condition:
+            self.in_flight -= 1
+            self.stats['requests'] += 1
+
+            if overloaded:
+                self.stats['overloads'] += 1
+                self.decrease('overload')
+            elif latency is not None:
+                self.latencies.append(latency)
+                similar = self.bucket_latencies[token_bucket(tokens)]
+                median = percentile(list(similar), 50)
+                similar.append(latency)
+                if len(similar) > self.min_samples and latency > self.spike_factor * median:
+                    self.stats['spikes'] += 1
+                    self.decrease(f'latency spike ({latency:.1f}s vs. median {median:.1f}s for {tokens} tokens)')
+                elif self.limit < self.max_limit:
+                    previous = int(self.limit)
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                    if int(self.limit) > previous:
+                        self.stats['increases'] += 1
+
+            self.condition.notify_all()
+
+    def decrease(
+        self,
+        reason: str,
+    ) -> None:
+        """Multiply the limit by the decrease factor, unless it was decreased within the cool-down."""
+        now = time.monotonic()
+        if now - self.last_decrease < self.cooldown:
+            return
+        self.last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        self.stats['decreases'] += 1
+        logging.warning(f'🐢 Concurrency limit reduced to {int(self.limit)} after {reason}.')
+
+    def get_stats(self) -> dict:
+        """Return the current limit, in-flight requests, latency percentiles and counters."""
+        with self.condition:
+            latencies = list(self.latencies)
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'p50': percentile(latencies, 50),
+                'p90': percentile(latencies, 90),
+                'p99': percentile(latencies, 99),
+                **self.stats,
+            }
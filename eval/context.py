@@ -0,0 +1,153 @@
+"""Keep the prompts of long tool-using loops under a token budget."""
+
+import json
+import logging
+
+import litellm
+
+
+def format_call(
+    name: str,
+    arguments: str,
+) -> str:
+    """Format a tool call as `name(key='value', ...)`, falling back to the raw arguments if they are not JSON."""
+    try:
+        parsed = json.loads(arguments)
+    except (json.JSONDecodeError, TypeError):
+        return f'{name}({arguments})'
+    if not isinstance(parsed, dict):
+        return f'{name}({arguments})'
+    return f'{name}({", ".join(f"{k}={v!r}" for k, v in parsed.items())})'
+
+
+class ContextBudget:
+    """Compact the messages sent to the model once they exceed a token budget.
+
+    When the prompt grows over `max_tokens`, every turn except the last `keep_recent_turns` is folded into a
+    "facts so far" table appended to the question: one row per tool call with its result kept verbatim, while the
+    `think` calls and the assistant's text of those turns are elided. The fold boundary only moves forward when the
+    budget is exceeded again, so the compacted prefix stays the same (and cacheable) between folds.
+
+    Only the messages sent to the model are compacted. The full conversation is kept for saving and matching.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        keep_recent_turns: int = 4,
+    ) -> None:
+        """Initialize the context budget.
+
+        Parameters
+        ----------
+        max_tokens : int
+            Number of prompt tokens above which older turns are folded.
+        keep_recent_turns : int
+            Number of most recent turns (assistant messages and their tool results) that are never folded.
+
+        """
+        self.max_tokens = max_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self.stats = {'folds': 0, 'folded_messages': 0}
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new conversation, with nothing folded."""
+        self.boundary = 2  # Messages before this index (after the system prompt and question) are folded
+
+    def count_tokens(
+        self,
+        messages: list[dict],
+        model_name: str,
+    ) -> int | None:
+        """Count the tokens of a list of messages, or return None if they cannot be counted."""
+        try:
+            return litellm.token_counter(messages=messages, model=model_name)
+        except Exception:
+            return None
+
+    def compact(
+        self,
+        messages: list[dict],
+        model_name: str,
+    ) -> list[dict]:
+        """Return the messages to send to the model, folding older turns if they exceed the budget.
+
+        Parameters
+        ----------
+        messages : list[dict]
+            The full conversation, starting with the system prompt and the question.
+        model_name : str
+            Name of the model, used to count tokens.
+
+        Returns
+        -------
+        list[dict]
+            The (possibly compacted) messages.
+
+        """
+        view = self.render(messages)
+        tokens = self.count_tokens(view, model_name)
+        if tokens is None or tokens <= self.max_tokens:
+            return view
+
+        turn_starts = [i for i, message in enumerate(messages) if i >= 2 and message['role'] == 'assistant']
+        if len(turn_starts) <= self.keep_recent_turns:
+            return view
+        boundary = turn_starts[-self.keep_recent_turns] if self.keep_recent_turns else len(messages)
+        if boundary <= self.boundary:
+            return view
+
+        self.stats['folds'] += 1
+        self.stats['folded_messages'] += boundary - self.boundary
+        self.boundary = boundary
+        compacted = self.render(messages)
+        logging.info(
+            f'🗜️ Folded {boundary - 2} messages into facts so far: {tokens} -> '
+            f'{self.count_tokens(compacted, model_name)} tokens'
+        )
+        return compacted
+
+    def render(
+        self,
+        messages: list[dict],
+    ) -> list[dict]:
+        """Render the conversation with the messages before the fold boundary replaced by a facts table."""
+        if self.boundary <= 2:
+            return messages
+
+        rows = []
+        thoughts = 0
+        pending_calls = []
+        for message in messages[2 : self.boundary]:
+            if message['role'] == 'assistant':
+                pending_calls = list(message.get('tool_calls') or [])
+            elif message['role'] == 'tool' and pending_calls:
+                # Tool messages follow their assistant message in the order of its tool calls
+                function = pending_calls.pop(0)['function']
+                if function['name'] == 'think':
+                    thoughts += 1
+                    continue
+                result = str(message['content']).replace('\n', ' ').replace('|', '\\|')
+                rows.append(f'| {format_call(function["name"], function["arguments"])} | {result} |')
+
+        table = '\n'.join(
+            [
+                'Facts so far (results of your earlier tool calls, kept verbatim'
+                + (f'; {thoughts} earlier think steps elided' if thoughts else '')
+                + '):',
+                '| Tool call | Result |',
+                '| --- | --- |',
+                *rows,
+            ]
+        )
+        question = messages[1]
+        return [
+            messages[0],
+            {**question, 'content': f'{question["content"]}\n\n{table}'},
+            *messages[self.boundary :],
+        ]
+
+    def get_stats(self) -> dict:
+        """Return the number of folds and of folded messages."""
+        return dict(self.stats)
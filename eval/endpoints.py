@@ -0,0 +1,229 @@
+"""Pool of model server endpoints with health checks, load balancing and session affinity."""
+
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+
+DEFAULT_API_BASE = 'http://0.0.0.0:8000/v1'
+
+
+class Endpoint:
+    """A single OpenAI-compatible model server (e.g. one `vllm serve` replica)."""
+
+    def __init__(
+        self,
+        api_base: str,
+    ) -> None:
+        """Initialize the endpoint.
+
+        Parameters
+        ----------
+        api_base : str
+            Base URL of the server, e.g. 'http://0.0.0.0:8000/v1'.
+
+        """
+        self.api_base = api_base.rstrip('/')
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.retry_at = 0.0
+        self.probing = False  # Whether a background health check of the endpoint is running
+        self.stats = {'requests': 0, 'failures': 0}
+
+    def __repr__(self):
+        """Return the endpoint as a string."""
+        return (
+            f'Endpoint(api_base={self.api_base!r}, healthy={self.healthy}, outstanding={self.outstanding}, '
+            f'stats={self.stats})'
+        )
+
+
+class EndpointPool:
+    """Route requests across several endpoints.
+
+    Each conversation (session) is pinned to one endpoint so its prefix KV-cache is reused between turns. New
+    sessions go to the healthy endpoint with the fewest outstanding requests. An endpoint that errors or stalls is
+    marked unhealthy, its sessions fail over to another endpoint, and it is probed again after a cool-down.
+    """
+
+    def __init__(
+        self,
+        api_bases: list[str] | None = None,
+        health_check_timeout: float = 2.0,
+        retry_after: float = 30.0,
+        max_failures: int = 1,
+    ) -> None:
+        """Initialize the pool.
+
+        Parameters
+        ----------
+        api_bases : list[str] | None
+            Base URLs of the endpoints. Defaults to a single local server.
+        health_check_timeout : float
+            Timeout in seconds for a health check request.
+        retry_after : float
+            Seconds to wait before probing an unhealthy endpoint again.
+        max_failures : int
+            Number of consecutive failures after which an endpoint is marked unhealthy.
+
+        """
+        self.endpoints = [Endpoint(api_base) for api_base in (api_bases or [DEFAULT_API_BASE])]
+        self.health_check_timeout = health_check_timeout
+        self.retry_after = retry_after
+        self.max_failures = max_failures
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of endpoints in the pool."""
+        return len(self.endpoints)
+
+    def check_health(
+        self,
+        endpoint: Endpoint,
+    ) -> bool:
+        """Probe an endpoint by listing its models.
+
+        Parameters
+        ----------
+        endpoint : Endpoint
+            The endpoint to probe.
+
+        Returns
+        -------
+        bool
+            True if the endpoint responded successfully, False otherwise.
+
+        """
+        try:
+            with urllib.request.urlopen(f'{endpoint.api_base}/models', timeout=self.health_check_timeout) as response:
+                return response.status == 200
+        except (urllib.error.URLError, OSError, ValueError):
+            return False
+
+    def check_all(self) -> list[Endpoint]:
+        """Probe every endpoint, updating their health, and return the healthy ones."""
+        for endpoint in self.endpoints:
+            healthy = self.check_health(endpoint)
+            with self.lock:
+                self.set_health(endpoint, healthy)
+            logging.info(f'{"🟢" if healthy else "🔴"} {endpoint.api_base}')
+        return [endpoint for endpoint in self.endpoints if endpoint.healthy]
+
+    def set_health(
+        self,
+        endpoint: Endpoint,
+        healthy: bool,
+    ) -> None:
+        """Mark an endpoint as healthy or unhealthy. Must be called with the lock held."""
+        endpoint.healthy = healthy
+        if healthy:
+            endpoint.consecutive_failures = 0
+        else:
+            endpoint.retry_at = time.monotonic() + self.retry_after
+            # Unpin sessions so they fail over on their next turn
+            self.sessions = {s: e for s, e in self.sessions.items() if e is not endpoint}
+
+    def revive(self) -> None:
+        """Start background probes of unhealthy endpoints whose cool-down has passed, without waiting for them.
+
+        Each endpoint is probed by at most one thread at a time, so requests never wait on a health check.
+        """
+        now = time.monotonic()
+        with self.lock:
+            due = [e for e in self.endpoints if not e.healthy and not e.probing and e.retry_at <= now]
+            for endpoint in due:
+                endpoint.probing = True
+        for endpoint in due:
+            threading.Thread(target=self.probe, args=(endpoint,), daemon=True).start()
+
+    def probe(
+        self,
+        endpoint: Endpoint,
+    ) -> None:
+        """Probe an unhealthy endpoint, marking it healthy again if it responds or scheduling the next probe."""
+        healthy = self.check_health(endpoint)
+        with self.lock:
+            endpoint.probing = False
+            if healthy:
+                logging.info(f'🟢 Endpoint {endpoint.api_base} is healthy again.')
+                self.set_health(endpoint, True)
+            else:
+                endpoint.retry_at = time.monotonic() + self.retry_after
+
+    def acquire(
+        self,
+        session_id: str | None = None,
+        exclude: set[str] | None = None,
+    ) -> Endpoint:
+        """Choose an endpoint for a request and count it as outstanding.
+
+        Parameters
+        ----------
+        session_id : str | None
+            Identifier of the conversation. Requests of one session stick to the same endpoint while it is healthy.
+        exclude : set[str] | None
+            Base URLs to avoid, e.g. endpoints that already failed for this request.
+
+        Returns
+        -------
+        Endpoint
+            The chosen endpoint. Must be handed back with `release`.
+
+        """
+        self.revive()
+        exclude = exclude or set()
+        with self.lock:
+            endpoint = self.sessions.get(session_id)
+            if endpoint is None or not endpoint.healthy or endpoint.api_base in exclude:
+                candidates = [e for e in self.endpoints if e.healthy and e.api_base not in exclude]
+                if not candidates:
+                    # Nothing healthy is left, so fall back to any endpoint not yet tried
+                    candidates = [e for e in self.endpoints if e.api_base not in exclude] or self.endpoints
+                endpoint = min(candidates, key=lambda e: (e.outstanding, e.stats['requests']))
+                if session_id is not None:
+                    self.sessions[session_id] = endpoint
+            endpoint.outstanding += 1
+            endpoint.stats['requests'] += 1
+        return endpoint
+
+    def release(
+        self,
+        endpoint: Endpoint,
+        success: bool = True,
+    ) -> None:
+        """Hand back an endpoint after a request, recording whether it succeeded.
+
+        Parameters
+        ----------
+        endpoint : Endpoint
+            The endpoint returned by `acquire`.
+        success : bool
+            False if the endpoint errored or stalled. Repeated failures mark it unhealthy.
+
+        """
+        with self.lock:
+            endpoint.outstanding -= 1
+            if success:
+                endpoint.consecutive_failures = 0
+                return
+            endpoint.stats['failures'] += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.max_failures and endpoint.healthy:
+                logging.warning(f'🔴 Endpoint {endpoint.api_base} marked unhealthy, failing over.')
+                self.set_health(endpoint, False)
+
+    def end_session(
+        self,
+        session_id: str,
+    ) -> None:
+        """Forget the endpoint a finished session was pinned to."""
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def get_stats(self) -> dict:
+        """Return request and failure counts per endpoint."""
+        with self.lock:
+            return {e.api_base: {**e.stats, 'healthy': e.healthy, 'outstanding': e.outstanding} for e in self.endpoints}
@@ -1,5 +1,11 @@
 import argparse
 import logging
+import queue
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import openai
@@ -7,6 +13,19 @@ import pandas as pd
 from rich.logging import RichHandler
 from runner import Runner
 
+from eval.checkpoint import TurnJournal, get_checkpoint_dir
+from eval.concurrency import AIMDController
+from eval.context import ContextBudget
+from eval.endpoints import EndpointPool
+from eval.executor import ToolExecutor
+from eval.formatting import RESULT_FORMATS, ResultFormatter, to_canonical
+from eval.hedging import Hedger
+from eval.loop_detector import LoopDetector
+from eval.paths import get_output_path
+from eval.scheduler import SCHEDULES, estimate_makespan, get_template_costs, predict_cost, schedule_questions
+from eval.tool_server import ToolClient
+from eval.work_queue import append_to_shard, get_shard_dir, merge_shards, open_work_queue
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(message)s',
@@ -32,6 +51,25 @@ class FrankensteinEvaluator:
         split: str = 'answerable-full',
         n_shots: int = 0,
         debug: bool = False,  # Add debug argument
+        api_bases: list[str] | None = None,
+        concurrency: int = 1,
+        work_queue: str | None = None,
+        worker_id: str | None = None,
+        batch_size: int = 8,
+        lease_seconds: float = 600.0,
+        adaptive_concurrency: bool = False,
+        hedge_percentile: float | None = None,
+        max_hedge_rate: float = 0.05,
+        schedule: str = 'longest-first',
+        checkpoint: bool = True,
+        max_repeated_errors: int = 0,
+        max_cycles: int = 0,
+        max_equivalent_retries: int = 0,
+        context_budget: int | None = None,
+        keep_recent_turns: int = 4,
+        result_format: str = 'repr',
+        mode: str = 'step',
+        tool_server: str | None = None,
     ):
         """Initialize the evaluator.
 
@@ -49,6 +87,58 @@ class FrankensteinEvaluator:
             Dataset split to use.
         n_shots : int
             Number of n-shot tool call examples to prepend to the prompt.
+        api_bases : list[str] | None
+            Base URLs of the local model servers to spread questions across.
+        concurrency : int
+            Number of questions to run at the same time.
+        work_queue : str | None
+            Path to a shared work queue (a '.sqlite' file, or a directory for lease files). If given, the evaluator
+            runs as one of several workers that claim questions from the queue. Requires `save`, as questions are
+            only marked done in the queue once their results are written.
+        worker_id : str | None
+            Name of this worker. Defaults to the host name plus a random suffix.
+        batch_size : int
+            Number of questions a worker claims from the queue at a time.
+        lease_seconds : float
+            Seconds after which questions claimed by a worker that stopped heartbeating are handed to another worker.
+        adaptive_concurrency : bool
+            If True, the number of in-flight requests is adapted (AIMD) between 1 and `concurrency` instead of being
+            fixed at `concurrency`.
+        hedge_percentile : float | None
+            If given, a request slower than this percentile (0-100) of recent latencies is duplicated to another
+            endpoint, keeping whichever answers first.
+        max_hedge_rate : float
+            Maximum fraction of requests that may be hedged.
+        schedule : str
+            Order to evaluate questions in: 'longest-first' (by predicted cost, to minimise the makespan of
+            concurrent runs) or 'file' (dataset order).
+        checkpoint : bool
+            If True (and `save` is set), in-flight conversations are journaled after every turn to
+            'eval/runs/checkpoints/<run>/', and an interrupted run resumes them from their last completed turn.
+        max_repeated_errors : int
+            Stop a conversation once the same error is returned in this many turns. 0 (the default) disables the
+            check. Conversations are only checked for loops if one of these three thresholds is set, so that runs
+            are comparable with earlier ones by default.
+        max_cycles : int
+            Stop a conversation once its tool calls repeat a cycle of turns this many times. 0 disables the check.
+        max_equivalent_retries : int
+            Stop a conversation once a failing call is retried this many times with equivalent arguments. 0
+            disables the check.
+        context_budget : int | None
+            If given, older turns of a conversation whose prompt exceeds this many tokens are folded into a facts
+            table, keeping the last `keep_recent_turns` turns as they are.
+        keep_recent_turns : int
+            Number of most recent turns that are never folded.
+        result_format : str
+            How tool results are sent to the model: 'compact' (canonical JSON, with truncated and paginated
+            indicator search results) or 'repr' (`str(result)`, the default, as in earlier runs written to the same
+            paths).
+        mode : str
+            'step' to let the model call tools one turn at a time, or 'plan' to let it submit whole plans of tool
+            calls that are executed locally (plan-then-execute).
+        tool_server : str | None
+            Unix socket of a tool server (see `eval/tool_server.py`) to execute tool calls on, sharing its warm
+            caches and memoized results with other processes. Tool calls are executed in this process if not given.
 
         """
         self.model_name = model_name
@@ -58,6 +148,28 @@ class FrankensteinEvaluator:
         self.split = split
         self.n_shots = n_shots
         self.debug = debug
+        self.api_bases = api_bases
+        self.concurrency = concurrency
+        if work_queue is not None and not save:
+            raise ValueError('A work queue requires saving results, as questions are marked done once written.')
+        self.work_queue = work_queue
+        self.worker_id = worker_id or f'{socket.gethostname()}-{uuid.uuid4().hex[:8]}'
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.adaptive_concurrency = adaptive_concurrency
+        self.hedge_percentile = hedge_percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.schedule = schedule
+        self.checkpoint = checkpoint
+        self.max_repeated_errors = max_repeated_errors
+        self.max_cycles = max_cycles
+        self.max_equivalent_retries = max_equivalent_retries
+        self.context_budget = context_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.result_format = result_format
+        self.mode = mode
+        self.tool_server = tool_server
+        self.journal = None
 
         # Load dataset from dataset/{split}.jsonl or .json
         dataset_path = Path('dataset', f'{self.split}.jsonl')
@@ -79,16 +191,159 @@ class FrankensteinEvaluator:
             List of messages generated by the model for each input in the dataset.
 
         """
-        results = []
-        runner = Runner(
-            model_name=self.model_name,
-            toolbox=self.toolbox,
-            n_shots=self.n_shots,
-            debug=self.debug,
+        # Runners hold per-conversation state, so each concurrent question gets its own runner. They share one
+        # endpoint pool (for load balancing and failover) and one tool executor (for memoization), which may be a
+        # client of a tool server shared with other processes.
+        pool = EndpointPool(self.api_bases)
+        if not str(self.model_name).startswith('openai/'):
+            pool.check_all()
+        executor = ToolClient(self.tool_server) if self.tool_server else ToolExecutor()
+        controller = (
+            AIMDController(initial_limit=max(1, self.concurrency // 4), max_limit=self.concurrency)
+            if self.adaptive_concurrency
+            else None
+        )
+        hedger = (
+            Hedger(
+                pool=None if str(self.model_name).startswith('openai/') else pool,
+                hedge_percentile=self.hedge_percentile,
+                max_hedge_rate=self.max_hedge_rate,
+            )
+            if self.hedge_percentile is not None
+            else None
+        )
+        output_path = get_output_path(self.model_name, self.split, self.toolbox, self.n_shots, self.mode)
+        self.journal = TurnJournal(get_checkpoint_dir(output_path)) if self.save and self.checkpoint else None
+        runners = queue.Queue()
+        for _ in range(max(1, self.concurrency)):
+            runners.put(
+                Runner(
+                    model_name=self.model_name,
+                    toolbox=self.toolbox,
+                    n_shots=self.n_shots,
+                    debug=self.debug,
+                    pool=pool,
+                    executor=executor,
+                    controller=controller,
+                    hedger=hedger,
+                    journal=self.journal,
+                    loop_detector=(
+                        LoopDetector(
+                            max_repeated_errors=self.max_repeated_errors,
+                            max_cycles=self.max_cycles,
+                            max_equivalent_retries=self.max_equivalent_retries,
+                        )
+                        if self.max_repeated_errors or self.max_cycles or self.max_equivalent_retries
+                        else None
+                    ),
+                    context_budget=(
+                        ContextBudget(self.context_budget, keep_recent_turns=self.keep_recent_turns)
+                        if self.context_budget is not None
+                        else None
+                    ),
+                    formatter=ResultFormatter() if self.result_format == 'compact' else None,
+                    mode=self.mode,
+                )
+            )
+
+        if self.work_queue is not None:
+            results = self.run_worker(runners, output_path)
+        else:
+            results = self.run_local(runners, output_path)
+
+        cache_stats = executor.get_stats()
+        logging.info(
+            f'🗃️ Tool cache: {cache_stats["hits"]} hits, {cache_stats["misses"]} misses '
+            f'({cache_stats["hit_rate"]:.1%} hit rate), {cache_stats["evictions"]} evictions'
         )
+        if not str(self.model_name).startswith('openai/'):
+            logging.info(f'🖥️ Endpoints: {pool.get_stats()}')
+        if controller is not None:
+            logging.info(f'🚦 Concurrency: {controller.get_stats()}')
+        if hedger is not None:
+            logging.info(f'🏇 Hedging: {hedger.get_stats()}')
+        if self.context_budget is not None:
+            budgets = [runner.context_budget for runner in runners.queue]
+            logging.info(
+                f'🗜️ Context: {sum(b.stats["folds"] for b in budgets)} folds, '
+                f'{sum(b.stats["folded_messages"] for b in budgets)} messages folded'
+            )
 
-        model_name = str(self.model_name).split('/')[-1]
-        output_path = Path('eval', 'runs', f'{model_name}_{self.split}_{self.toolbox}-tools_{self.n_shots}-shot.jsonl')
+        results_df = pd.DataFrame(results)
+
+        if self.save and self.work_queue is None:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            results_df.to_json(output_path, orient='records', lines=True)
+            logging.info(f'Saved evaluation results to {output_path}')
+
+        return results_df['messages'].tolist() if 'messages' in results_df else []
+
+    def run_questions(
+        self,
+        runners: queue.Queue,
+        pending: list[tuple[int, pd.Series]],
+        on_result,
+    ) -> None:
+        """Evaluate questions, concurrently if `concurrency` > 1.
+
+        Parameters
+        ----------
+        runners : queue.Queue
+            Idle runners. Each question borrows one for its duration.
+        pending : list[tuple[int, pd.Series]]
+            Position in the dataset and dataset row of each question to evaluate.
+        on_result : Callable[[pd.Series, dict], None]
+            Called with the dataset row and result row of each finished question. Calls are serialised.
+
+        """
+        results_lock = threading.Lock()
+
+        def process(idx: int, row: pd.Series) -> None:
+            runner = runners.get()
+            try:
+                logging.info(f'✨ Processing question {idx + 1}/{len(self.dataset)}')
+                result_row = self.evaluate_question(runner, row)
+                if runner.controller is not None:
+                    logging.info(f'🚦 Concurrency: {runner.controller.get_stats()}')
+            finally:
+                runners.put(runner)
+
+            with results_lock:
+                on_result(row, result_row)
+
+            # The result is saved, so the conversation no longer needs its checkpoint
+            if self.journal is not None:
+                self.journal.discard(self.get_checkpoint_key(row))
+
+        if self.concurrency > 1:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as thread_pool:
+                for future in [thread_pool.submit(process, idx, row) for idx, row in pending]:
+                    future.result()
+        else:
+            for idx, row in pending:
+                process(idx, row)
+
+    def run_local(
+        self,
+        runners: queue.Queue,
+        output_path: Path,
+    ) -> list[dict]:
+        """Evaluate every question of the dataset not already in `output_path`, saving after each question.
+
+        Parameters
+        ----------
+        runners : queue.Queue
+            Idle runners to evaluate questions with.
+        output_path : Path
+            Path of the run file, used to resume a partial run.
+
+        Returns
+        -------
+        list[dict]
+            Result rows of all questions, including those from a previous partial run.
+
+        """
+        results = []
 
         # --- Resume logic: load previous results and skip already processed questions ---
         completed_ids = set()
@@ -105,51 +360,216 @@ class FrankensteinEvaluator:
             except Exception as e:
                 logging.warning(f'Could not load previous results for resuming: {e}')
 
-        for idx, (_, row) in enumerate(self.dataset.iterrows()):
-            # Use 'id' if present, else fallback to question text as unique identifier
-            row_id = row['id'] if 'id' in row else row['question']
-            if row_id in completed_ids:
-                continue
-
-            runner.reset()
-
-            logging.info(f"✨ Processing question {idx + 1}/{len(self.dataset)} of '{output_path}'")
-            logging.info('🔎 Question Metadata')
-            self.log_question_info(row)
-
-            messages, tokens_used = runner.loop(row['question'])
-            gold_answer = row['answer']
-            answer_format = row['answer_format']
-
-            correct, error = runner.match_results(messages, gold_answer, answer_format)
-            pred = runner.matcher.extract_final_answer(messages)
-
-            result_row = row.to_dict()
-            result_row.update(
-                {
-                    'messages': runner.format_messages(messages),
-                    'tokens': tokens_used,
-                    'pred': pred,
-                    'correct': correct if correct is not None else False,
-                    'error': error,
-                }
-            )
+        def on_result(row: pd.Series, result_row: dict) -> None:
             results.append(result_row)
-            completed_ids.add(row_id)
+            completed_ids.add(row['id'] if 'id' in row else row['question'])
 
             # Save after every iteration
             if self.save:
                 output_path.parent.mkdir(parents=True, exist_ok=True)
                 pd.DataFrame(results).to_json(output_path, orient='records', lines=True)
 
-        results_df = pd.DataFrame(results)
+        # Use 'id' if present, else fallback to question text as unique identifier
+        pending = [
+            (idx, row)
+            for idx, (_, row) in enumerate(self.dataset.iterrows())
+            if (row['id'] if 'id' in row else row['question']) not in completed_ids
+        ]
+        pending = self.schedule_pending(pending)
+        self.run_questions(runners, pending, on_result)
+
+        return results
+
+    def run_worker(
+        self,
+        runners: queue.Queue,
+        output_path: Path,
+        poll_interval: float = 10.0,
+    ) -> list[dict]:
+        """Evaluate questions claimed from the shared work queue until every question of the run is finished.
+
+        Results are appended to this worker's shard in 'eval/runs/shards/<run>/'. Once the queue is empty the
+        shards are merged into `output_path`.
+
+        Parameters
+        ----------
+        runners : queue.Queue
+            Idle runners to evaluate questions with.
+        output_path : Path
+            Path of the canonical run file.
+        poll_interval : float
+            Seconds to wait before checking again when all remaining questions are leased by other workers.
+
+        Returns
+        -------
+        list[dict]
+            Result rows of the questions evaluated by this worker.
+
+        """
+        run_name = output_path.stem
+        work_queue = open_work_queue(self.work_queue, lease_seconds=self.lease_seconds)
+        # Populate in schedule order, so workers claim the longest questions first
+        scheduled = self.schedule_pending(list(enumerate(row for _, row in self.dataset.iterrows())))
+        # Questions are identified by their id, or by their row index if the dataset has no ids
+        ids = self.dataset['id'] if 'id' in self.dataset.columns else self.dataset.index.to_series()
+        keys = dict(zip(self.dataset.index, ids.astype(str)))
+        work_queue.populate(run_name, [keys[row.name] for _, row in scheduled])
+        # Questions already in the run file (e.g. from an earlier run with another queue) are not evaluated again
+        finished = self.load_finished(output_path)
+        if finished:
+            for label, row in self.dataset.iterrows():
+                if self.get_checkpoint_key(row) in finished:
+                    work_queue.complete(run_name, self.worker_id, keys[label])
+            logging.info(f'Resuming from partial run: {len(finished)} questions already processed.')
+        positions = {keys[label]: idx for idx, label in enumerate(self.dataset.index)}
+        shard_path = get_shard_dir(output_path) / f'{self.worker_id}.jsonl'
+        logging.info(f"👷 Worker '{self.worker_id}' claiming questions from '{self.work_queue}'")
+
+        # Heartbeat in the background so long questions do not lose their leases
+        stop = threading.Event()
+
+        def heartbeat() -> None:
+            while not stop.wait(self.lease_seconds / 3):
+                work_queue.heartbeat(run_name, self.worker_id)
+
+        heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+        heartbeat_thread.start()
+
+        results = []
+
+        def on_result(row: pd.Series, result_row: dict) -> None:
+            results.append(result_row)
+            append_to_shard(shard_path, result_row)
+            # Only once the result is written, so a crash before then leaves the question to be claimed again
+            work_queue.complete(run_name, self.worker_id, keys[row.name])
+
+        try:
+            while True:
+                claimed = work_queue.claim(run_name, self.worker_id, self.batch_size)
+                if not claimed:
+                    if work_queue.remaining(run_name) == 0:
+                        break
+                    # Remaining questions are leased by other workers, whose leases may yet expire
+                    time.sleep(poll_interval)
+                    continue
+                pending = [(positions[i], self.dataset.iloc[positions[i]]) for i in claimed if i in positions]
+                self.run_questions(runners, schedule_questions(pending, self.dataset, self.schedule), on_result)
+        finally:
+            stop.set()
 
         if self.save:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            results_df.to_json(output_path, orient='records', lines=True)
-            logging.info(f'Saved evaluation results to {output_path}')
+            merged = merge_shards(output_path)
+            logging.info(f"Merged {len(merged)} results from '{get_shard_dir(output_path)}' into {output_path}")
+
+        return results
+
+    @staticmethod
+    def load_finished(output_path: Path) -> set[str]:
+        """Return the keys (see `get_checkpoint_key`) of the questions already in a run file, if it exists."""
+        if not output_path.exists():
+            return set()
+        try:
+            previous = pd.read_json(output_path, orient='records', lines=True, precise_float=True)
+        except Exception as e:
+            logging.warning(f'Could not load previous results for resuming: {e}')
+            return set()
+        if previous.empty:
+            return set()
+        return set(previous['id' if 'id' in previous.columns else 'question'].astype(str))
+
+    def schedule_pending(
+        self,
+        pending: list[tuple[int, pd.Series]],
+    ) -> list[tuple[int, pd.Series]]:
+        """Order pending questions according to `schedule`, logging the predicted makespan against file order.
+
+        Parameters
+        ----------
+        pending : list[tuple[int, pd.Series]]
+            Position in the dataset and dataset row of each question to evaluate.
+
+        Returns
+        -------
+        list[tuple[int, pd.Series]]
+            The questions in the order to evaluate them.
+
+        """
+        scheduled = schedule_questions(pending, self.dataset, self.schedule)
+        if pending and self.schedule != 'file':
+            template_costs = get_template_costs(self.dataset)
+            workers = max(1, self.concurrency)
+            before, after = (
+                estimate_makespan([predict_cost(row, template_costs) for _, row in questions], workers)
+                for questions in (pending, scheduled)
+            )
+            logging.info(
+                f"📅 Scheduled {len(scheduled)} questions '{self.schedule}': predicted makespan {after:.0f} "
+                f'tool calls (vs. {before:.0f} in file order) over {workers} workers'
+            )
+        return scheduled
+
+    @staticmethod
+    def get_checkpoint_key(row: pd.Series) -> str:
+        """Return the key of a question in the turn journal: its id, or its text if the dataset has no ids."""
+        return str(row['id'] if 'id' in row else row['question'])
+
+    def evaluate_question(
+        self,
+        runner: Runner,
+        row: pd.Series,
+    ) -> dict:
+        """Run the tool-using loop for a single question and score the answer.
 
-        return results_df['messages'].tolist()
+        Parameters
+        ----------
+        runner : Runner
+            The runner to use. It is reset before the question is asked.
+        row : pd.Series
+            The dataset row of the question.
+
+        Returns
+        -------
+        dict
+            The dataset row extended with the messages, token usage, prediction and match result.
+
+        """
+        runner.reset()
+
+        logging.info('🔎 Question Metadata')
+        self.log_question_info(row)
+
+        messages, tokens_used = runner.loop(row['question'], checkpoint_key=self.get_checkpoint_key(row))
+        gold_answer = row['answer']
+        answer_format = row['answer_format']
+
+        correct, error = runner.match_results(messages, gold_answer, answer_format)
+        pred = runner.matcher.extract_final_answer(messages)
+
+        result_row = row.to_dict()
+        result_row.update(
+            {
+                'messages': runner.format_messages(messages),
+                'tokens': tokens_used,
+                'tool_times': list(runner.tool_timings),
+                'latencies': list(runner.latencies),
+                'stop_reason': runner.stop_reason,
+                'pred': pred,
+                'correct': correct if correct is not None else False,
+                'error': error,
+            }
+        )
+        if self.mode == 'plan':
+            result_row['plan_steps'] = [
+                {
+                    **step,
+                    'arguments': to_canonical(step['arguments']),
+                    'result': (
+                        str(step['result']) if isinstance(step['result'], Exception) else to_canonical(step['result'])
+                    ),
+                }
+                for step in runner.plan_steps
+            ]
+        return result_row
 
     def log_config(
         self,
@@ -241,6 +661,122 @@ if __name__ == '__main__':
         action='store_true',
         help='If set, the loop will wait for user input after each message.',
     )
+    parser.add_argument(
+        '--api-base',
+        type=str,
+        nargs='+',
+        default=None,
+        help='Base URLs of one or more local model servers to spread questions across.',
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Number of questions to run at the same time.',
+    )
+    parser.add_argument(
+        '--adaptive-concurrency',
+        action='store_true',
+        help='Adapt the number of in-flight requests between 1 and --concurrency based on latency and errors.',
+    )
+    parser.add_argument(
+        '--work-queue',
+        type=str,
+        default=None,
+        help='Shared work queue to claim questions from: a ".sqlite" file, or a directory for lease files.',
+    )
+    parser.add_argument(
+        '--worker-id',
+        type=str,
+        default=None,
+        help='Name of this worker when using --work-queue. Defaults to the host name plus a random suffix.',
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=8,
+        help='Number of questions to claim from the work queue at a time.',
+    )
+    parser.add_argument(
+        '--lease-seconds',
+        type=float,
+        default=600.0,
+        help='Seconds after which questions claimed by an unresponsive worker are handed to another worker.',
+    )
+    parser.add_argument(
+        '--hedge-percentile',
+        type=float,
+        default=None,
+        help='Duplicate requests slower than this latency percentile (e.g. 95) to another endpoint.',
+    )
+    parser.add_argument(
+        '--max-hedge-rate',
+        type=float,
+        default=0.05,
+        help='Maximum fraction of requests that may be hedged.',
+    )
+    parser.add_argument(
+        '--schedule',
+        type=str,
+        default='longest-first',
+        choices=SCHEDULES,
+        help='Order to evaluate questions in: longest (by predicted cost) first, or dataset file order.',
+    )
+    parser.add_argument(
+        '--no-checkpoint',
+        action='store_true',
+        help='Do not journal in-flight conversations after every turn (journals are only written with --save).',
+    )
+    parser.add_argument(
+        '--max-repeated-errors',
+        type=int,
+        default=0,
+        help='Stop a conversation once the same error is returned in this many turns (default: 0, disabled).',
+    )
+    parser.add_argument(
+        '--max-cycles',
+        type=int,
+        default=0,
+        help='Stop a conversation once its tool calls repeat a cycle of turns this many times (default: 0, disabled).',
+    )
+    parser.add_argument(
+        '--max-equivalent-retries',
+        type=int,
+        default=0,
+        help='Stop a conversation once a failing call is retried this many times with equivalent arguments (0: off).',
+    )
+    parser.add_argument(
+        '--context-budget',
+        type=int,
+        default=None,
+        help='Fold older turns into a facts table once a prompt exceeds this many tokens.',
+    )
+    parser.add_argument(
+        '--keep-recent-turns',
+        type=int,
+        default=4,
+        help='Number of most recent turns never folded when using --context-budget.',
+    )
+    parser.add_argument(
+        '--result-format',
+        type=str,
+        default='repr',
+        choices=RESULT_FORMATS,
+        help='How tool results are sent to the model: compact canonical JSON, or Python str().',
+    )
+    parser.add_argument(
+        '--mode',
+        type=str,
+        default='step',
+        choices=['step', 'plan'],
+        help='Call tools one turn at a time, or submit whole plans of tool calls that are executed locally.',
+    )
+    parser.add_argument(
+        '--tool-server',
+        type=str,
+        default=None,
+        help='Unix socket of a tool server (see eval/tool_server.py) to execute tool calls on.',
+    )
     args = parser.parse_args()
 
     evaluator = FrankensteinEvaluator(
@@ -251,6 +787,25 @@ if __name__ == '__main__':
         split=args.split,
         n_shots=args.n_shots,
         debug=args.debug,  # Pass debug argument
+        api_bases=args.api_base,
+        concurrency=args.concurrency,
+        work_queue=args.work_queue,
+        worker_id=args.worker_id,
+        batch_size=args.batch_size,
+        lease_seconds=args.lease_seconds,
+        adaptive_concurrency=args.adaptive_concurrency,
+        hedge_percentile=args.hedge_percentile,
+        max_hedge_rate=args.max_hedge_rate,
+        schedule=args.schedule,
+        checkpoint=not args.no_checkpoint,
+        max_repeated_errors=args.max_repeated_errors,
+        max_cycles=args.max_cycles,
+        max_equivalent_retries=args.max_equivalent_retries,
+        context_budget=args.context_budget,
+        keep_recent_turns=args.keep_recent_turns,
+        result_format=args.result_format,
+        mode=args.mode,
+        tool_server=args.tool_server,
     )
     evaluator.args = args  # Attach args for logging
 
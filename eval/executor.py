@@ -0,0 +1,197 @@
+"""Tool execution layer for the runner, memoizing the results of pure tools."""
+
+import functools
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from frankenstein.action import FrankensteinAction
+from frankenstein.exceptions import InvalidToolArgumentError
+from frankenstein.utils import get_data_version
+from frankenstein.validation import validate_arguments
+
+# Tools whose calls should always be executed, as they echo model output rather than look anything up
+UNCACHED_TOOLS = frozenset({'think', 'final_answer'})
+
+
+def rebuild_exception(
+    error_type: type[Exception],
+    args: tuple,
+    attributes: dict,
+) -> Exception:
+    """Return a new exception of a type with the given arguments and attributes, without calling its __init__.
+
+    Tool exceptions build their message in __init__ from other arguments, so they are rebuilt from the resulting
+    `args` (the message) instead, keeping `str()` of the exception unchanged.
+    """
+    error = error_type.__new__(error_type, *args)
+    error.args = args
+    vars(error).update(attributes)
+    return error
+
+
+@functools.cache
+def get_tool_map() -> dict:
+    """Return the tool functions by name."""
+    return FrankensteinAction().tool_map
+
+
+def to_key_json(value):
+    """Convert values the json module cannot encode (NumPy arrays and scalars) for a cache key. NaN stays NaN."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class ToolExecutor:
+    """Execute tool calls, memoizing results (and exceptions) of pure tools in a bounded LRU cache.
+
+    The cache is guarded by a lock so one executor can be shared by concurrent tool calls. Tools themselves run
+    outside the lock.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 4096,
+        uncached_tools: frozenset[str] = UNCACHED_TOOLS,
+    ) -> None:
+        """Initialize the executor.
+
+        Parameters
+        ----------
+        max_size : int
+            Maximum number of results to keep. The least recently used entry is evicted first.
+        uncached_tools : frozenset[str]
+            Names of tools that are never cached.
+
+        """
+        self.max_size = max_size
+        self.uncached_tools = uncached_tools
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'uncached': 0, 'evictions': 0}
+
+    def make_key(
+        self,
+        name: str,
+        arguments: dict,
+    ) -> tuple[str, str, str]:
+        """Build the cache key for a tool call.
+
+        The arguments are validated and converted first (see `validate_arguments`), so equivalent spellings of a
+        call (e.g. year=2019 and year='2019', or [1, 2] and (1, 2)) share an entry. Arguments that fail validation
+        are keyed as given.
+
+        Parameters
+        ----------
+        name : str
+            The name of the tool.
+        arguments : dict
+            The arguments of the tool call.
+
+        Returns
+        -------
+        tuple[str, str, str]
+            The tool name, the arguments as canonical JSON, and the version of the data the call reads: the values of
+            the indicator named by its 'indicator_code' argument, if any, so updating an indicator only invalidates
+            the results of calls reading it.
+
+        """
+        tool = get_tool_map().get(name)
+        if tool is not None:
+            try:
+                arguments = validate_arguments(name, tool, arguments)
+            except InvalidToolArgumentError:
+                pass
+        canonical_arguments = json.dumps(arguments, sort_keys=True, separators=(',', ':'), default=to_key_json)
+        indicator_code = arguments.get('indicator_code')
+        return (name, canonical_arguments, get_data_version([str(indicator_code)] if indicator_code else []))
+
+    def execute(
+        self,
+        name: str,
+        arguments: dict,
+    ):
+        """Execute a tool call, returning a cached result where possible.
+
+        Parameters
+        ----------
+        name : str
+            The name of the tool.
+        arguments : dict
+            The arguments of the tool call.
+
+        Returns
+        -------
+        Any
+            The result of the tool call. Exceptions raised by the tool are cached, and an equal exception is raised on
+            a hit.
+
+        """
+        if name in self.uncached_tools:
+            with self.lock:
+                self.stats['uncached'] += 1
+            return FrankensteinAction(action=name, **arguments).execute(error_handling='raise')
+
+        key = self.make_key(name, arguments)
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.cache.move_to_end(key)
+                self.stats['hits'] += 1
+            else:
+                self.stats['misses'] += 1
+
+        if entry is not None:
+            is_error, value = entry
+            if is_error:
+                raise rebuild_exception(*value)
+            return value
+
+        try:
+            result = FrankensteinAction(action=name, **arguments).execute(error_handling='raise')
+        except Exception as e:
+            # Keep what the exception is made of rather than the instance, whose traceback grows with every raise
+            self.store(key, (True, (type(e), e.args, dict(vars(e)))))
+            raise
+
+        self.store(key, (False, result))
+        return result
+
+    def store(
+        self,
+        key: tuple[str, str, str],
+        entry: tuple[bool, object],
+    ) -> None:
+        """Insert an entry into the cache, evicting the least recently used entry if full."""
+        with self.lock:
+            self.cache[key] = entry
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the fraction of cacheable tool calls served from the cache."""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def get_stats(self) -> dict:
+        """Return a copy of the cache statistics, including the hit rate and current size."""
+        with self.lock:
+            return {**self.stats, 'hit_rate': round(self.hit_rate, 5), 'size': len(self.cache)}
+
+    def reset_stats(self) -> None:
+        """Reset the cache statistics without clearing cached results."""
+        with self.lock:
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def clear(self) -> None:
+        """Clear all cached results."""
+        with self.lock:
+            self.cache.clear()
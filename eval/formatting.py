@@ -0,0 +1,149 @@
+"""Compact, canonical text for the tool results sent back to the model."""
+
+import json
+import math
+
+import numpy as np
+
+RESULT_FORMATS = ('compact', 'repr')
+
+
+def to_canonical(value):
+    """Convert a tool result to plain JSON types.
+
+    NumPy scalars and arrays become Python numbers and lists, NaN becomes None, and tuples and sets become lists.
+    Floats are left as floats, so they are written in Python's shortest round-trip form (e.g. '118.35961' or
+    '10421137.0') and parse back to the same value.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, float):
+        return None if math.isnan(value) else value
+    if isinstance(value, dict):
+        return {str(k): to_canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_canonical(v) for v in value]
+    return value
+
+
+def dumps(value) -> str:
+    """Serialize a tool result as compact JSON, or as is if it is a string."""
+    value = to_canonical(value)
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def truncate(
+    text: str,
+    max_chars: int,
+) -> str:
+    """Shorten text to at most `max_chars` characters, cutting at a word boundary and marking the cut."""
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(' ', 1)[0].rstrip(' ,.;:') + '…'
+
+
+class ResultFormatter:
+    """Format tool results as compact canonical text, with a formatter per tool.
+
+    By default, results are written as compact JSON (see `dumps`), which `FrankensteinGraph` parses back into the
+    same values. Indicator search results additionally have their descriptions truncated, and only the first page
+    of results is sent, with a hint on how to see the others (by searching again with an `offset`) as the last
+    element of the list (so the text stays valid JSON). Errors and warnings are sent verbatim.
+    """
+
+    def __init__(
+        self,
+        max_description_chars: int = 200,
+        page_size: int = 10,
+        formatters: dict | None = None,
+    ) -> None:
+        """Initialize the formatter.
+
+        Parameters
+        ----------
+        max_description_chars : int
+            Maximum number of characters of an indicator description in search results.
+        page_size : int
+            Maximum number of indicator search results sent at once.
+        formatters : dict | None
+            Functions taking a tool result and the arguments of its call and returning its text, by tool name. They
+            override the default formatters, and tools without one are formatted with `dumps`.
+
+        """
+        self.max_description_chars = max_description_chars
+        self.page_size = page_size
+        self.formatters = {
+            'search_for_indicator_names': self.format_search_results,
+            **(formatters or {}),
+        }
+
+    def format(
+        self,
+        name: str,
+        result,
+        arguments: dict | None = None,
+    ) -> str:
+        """Return the text of a tool result (or of the exception raised by the tool) to send to the model.
+
+        Parameters
+        ----------
+        name : str
+            The name of the tool.
+        result : Any
+            The result of the tool call, or the exception it raised.
+        arguments : dict | None
+            The arguments of the tool call.
+
+        Returns
+        -------
+        str
+            The formatted result.
+
+        """
+        if isinstance(result, Exception):
+            return str(result)
+        formatter = self.formatters.get(name)
+        return dumps(result) if formatter is None else formatter(result, arguments or {})
+
+    def format_search_results(
+        self,
+        results: list[dict],
+        arguments: dict,
+    ) -> str:
+        """Format indicator search results, truncating descriptions and keeping only the first page.
+
+        The hint after a partial page gives the `offset` of the next page, counted from the start of the ranking, so
+        that the model can page through the results by searching again. Notes of the tool itself (e.g. that more
+        indicators match) are kept if the whole page is sent.
+        """
+        if not isinstance(results, list):
+            return dumps(results)
+
+        notes = [result for result in results if isinstance(result, str)]
+        results = [result for result in results if not isinstance(result, str)]
+        page = []
+        for result in results[: self.page_size]:
+            if isinstance(result, dict) and isinstance(result.get('indicator_description'), str):
+                # Names first, as they are what the model needs to look up codes
+                result = {
+                    **{k: v for k, v in result.items() if k != 'indicator_description'},
+                    'indicator_description': truncate(result['indicator_description'], self.max_description_chars),
+                }
+            page.append(result)
+        if len(results) > self.page_size:
+            try:
+                offset = max(int(arguments.get('offset', 0)), 0)
+            except (TypeError, ValueError):
+                offset = 0
+            page.append(
+                f'Showing {self.page_size} of {len(results)} matching indicators. If the indicator you need is not '
+                f'listed, search again with more specific keywords, or with the same keywords and '
+                f'offset={offset + self.page_size} to see the next ones.'
+            )
+        else:
+            page.extend(notes)
+        return dumps(page)
@@ -0,0 +1,191 @@
+"""Hedged LLM requests: send a backup request when the first is slow and keep whichever answers first."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+
+import litellm
+
+from eval.concurrency import percentile
+from eval.endpoints import EndpointPool
+
+
+class Hedger:
+    """Issue completions that are duplicated once they take longer than a latency percentile.
+
+    The backup request goes to another endpoint of the pool if there is one, otherwise to the same endpoint. The
+    first successful response wins and the other request is cancelled, which closes its connection so the server
+    stops generating. The fraction of hedged requests is capped so hedging cannot amplify an overload.
+
+    Requests run on one background event loop shared by all runners, as cancelling a request needs async I/O.
+    """
+
+    def __init__(
+        self,
+        pool: EndpointPool | None = None,
+        hedge_percentile: float = 95.0,
+        max_hedge_rate: float = 0.05,
+        min_delay: float = 1.0,
+        window: int = 200,
+        min_samples: int = 20,
+    ) -> None:
+        """Initialize the hedger and start its event loop.
+
+        Parameters
+        ----------
+        pool : EndpointPool | None
+            Endpoint pool to pick backup endpoints from. Backups go to the same endpoint if not given.
+        hedge_percentile : float
+            Percentile (0-100) of recent latencies after which a backup request is sent.
+        max_hedge_rate : float
+            Maximum fraction of requests that may be hedged.
+        min_delay : float
+            Minimum number of seconds to wait before hedging.
+        window : int
+            Number of recent latencies to compute the percentile over.
+        min_samples : int
+            Number of latencies required before any request is hedged.
+
+        """
+        self.pool = pool
+        self.hedge_percentile = hedge_percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+
+        self.latencies = deque(maxlen=window)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'cancelled': 0, 'rate_limited': 0}
+
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def hedge_delay(self) -> float | None:
+        """Return the number of seconds after which to hedge, or None if too few latencies are known."""
+        with self.lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            return max(self.min_delay, percentile(list(self.latencies), self.hedge_percentile))
+
+    def take_hedge(self) -> bool:
+        """Count a hedge if the hedge rate allows another one, returning whether it may be sent."""
+        with self.lock:
+            if self.stats['hedged'] + 1 > self.max_hedge_rate * self.stats['requests']:
+                self.stats['rate_limited'] += 1
+                return False
+            self.stats['hedged'] += 1
+            return True
+
+    def completion(
+        self,
+        api_base: str | None,
+        **kwargs,
+    ):
+        """Run a (possibly hedged) completion, blocking until it finishes.
+
+        Parameters
+        ----------
+        api_base : str | None
+            Base URL of the endpoint to send the first request to.
+        kwargs : dict
+            Arguments for `litellm.acompletion`.
+
+        Returns
+        -------
+        ModelResponse
+            The first successful response. If every request fails, the first request's exception is raised.
+
+        """
+        with self.lock:
+            self.stats['requests'] += 1
+        return asyncio.run_coroutine_threadsafe(self.race(api_base, kwargs), self.loop).result()
+
+    async def race(
+        self,
+        api_base: str | None,
+        kwargs: dict,
+    ):
+        """Send the first request, and a backup once it is slower than the hedge delay, returning the winner."""
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(litellm.acompletion(api_base=api_base, **kwargs))
+
+        delay = self.hedge_delay()
+        if delay is not None:
+            await asyncio.wait({primary}, timeout=delay)
+        if delay is None or primary.done() or not self.take_hedge():
+            response = await primary
+            self.record(time.perf_counter() - start)
+            return response
+
+        hedge = asyncio.ensure_future(self.backup(api_base, kwargs))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.record(time.perf_counter() - start)
+                        if task is hedge:
+                            with self.lock:
+                                self.stats['hedge_wins'] += 1
+                        return task.result()
+            raise primary.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+                with self.lock:
+                    self.stats['cancelled'] += 1
+
+    async def backup(
+        self,
+        api_base: str | None,
+        kwargs: dict,
+    ):
+        """Send the backup request, preferring an endpoint other than the one of the first request."""
+        endpoint = None
+        success = True
+        try:
+            if self.pool is not None and api_base is not None:
+                # Acquiring may probe unhealthy endpoints, so keep it off the event loop
+                acquiring = asyncio.ensure_future(asyncio.to_thread(self.pool.acquire, exclude={api_base}))
+                try:
+                    endpoint = await asyncio.shield(acquiring)
+                except asyncio.CancelledError:
+                    # The acquire still finishes in its thread, so hand the endpoint back once it does
+                    acquiring.add_done_callback(self.release_acquired)
+                    raise
+            return await litellm.acompletion(api_base=endpoint.api_base if endpoint else api_base, **kwargs)
+        except Exception:
+            success = False
+            raise
+        finally:
+            if endpoint is not None:
+                self.pool.release(endpoint, success=success)
+
+    def release_acquired(
+        self,
+        acquiring: asyncio.Future,
+    ) -> None:
+        """Release the endpoint of an acquire whose backup request was cancelled before it could be sent."""
+        if not acquiring.cancelled() and acquiring.exception() is None:
+            self.pool.release(acquiring.result())
+
+    def record(
+        self,
+        latency: float,
+    ) -> None:
+        """Record the latency of a successful request."""
+        with self.lock:
+            self.latencies.append(latency)
+
+    def get_stats(self) -> dict:
+        """Return hedging counters, the hedge rate and the current hedge delay."""
+        delay = self.hedge_delay()
+        with self.lock:
+            requests = self.stats['requests']
+            return {
+                **self.stats,
+                'hedge_rate': round(self.stats['hedged'] / requests, 5) if requests else 0.0,
+                'hedge_delay': round(delay, 5) if delay is not None else None,
+            }
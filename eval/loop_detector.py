@@ -0,0 +1,129 @@
+"""Detect tool-using loops that are stuck, so they can be stopped before they reach the hard limits."""
+
+import json
+
+
+def normalize_value(value):
+    """Normalize an argument value so that trivially different spellings of it compare equal.
+
+    Strings are case-folded, whitespace-collapsed and stripped of surrounding quotes and full stops, numeric
+    strings and numbers become floats, and lists and dicts are normalized recursively.
+    """
+    if isinstance(value, str):
+        text = ' '.join(value.casefold().split()).strip(' .\'"')
+        try:
+            return float(text)
+        except ValueError:
+            return text
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_value(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(k).casefold(), normalize_value(v)) for k, v in value.items()))
+    return str(value)
+
+
+def normalize_call(
+    name: str,
+    arguments: dict,
+) -> tuple:
+    """Return a hashable key under which argument-equivalent calls of a tool are equal."""
+    return name, normalize_value(arguments)
+
+
+class LoopDetector:
+    """Detect conversations that are stuck, from the tool calls and results of each turn.
+
+    Three patterns are detected, each with its own threshold (0 disables a check):
+
+    - Repeated errors: the same error message is returned in `max_repeated_errors` different turns.
+    - Cycles: the calls of the last turns repeat with a period of up to `max_period` turns, `max_cycles` times in a
+      row (e.g. A, B, A, B, A, B). Tools are deterministic, so a cycle never yields anything new.
+    - Equivalent retries: a call that errored is retried with equivalent arguments (see `normalize_call`) and errors
+      again, more than `max_equivalent_retries` times.
+    """
+
+    def __init__(
+        self,
+        max_repeated_errors: int = 3,
+        max_cycles: int = 3,
+        max_period: int = 3,
+        max_equivalent_retries: int = 3,
+    ) -> None:
+        """Initialize the detector.
+
+        Parameters
+        ----------
+        max_repeated_errors : int
+            Number of turns returning the same error after which the loop is stopped.
+        max_cycles : int
+            Number of consecutive repetitions of a cycle of turns after which the loop is stopped.
+        max_period : int
+            Longest cycle, in turns, to look for.
+        max_equivalent_retries : int
+            Number of failed retries of an equivalent call after which the loop is stopped.
+
+        """
+        self.max_repeated_errors = max_repeated_errors
+        self.max_cycles = max_cycles
+        self.max_period = max_period
+        self.max_equivalent_retries = max_equivalent_retries
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the turns of the previous conversation."""
+        self.turns = []
+        self.error_turns = {}
+        self.failed_calls = {}
+
+    def observe(
+        self,
+        calls: list[tuple[str, dict, object]],
+    ) -> tuple[str, str] | None:
+        """Record the tool calls of one turn and check whether the conversation is stuck.
+
+        Parameters
+        ----------
+        calls : list[tuple[str, dict, object]]
+            Name, parsed arguments and result (or raised exception) of each tool call of the turn.
+
+        Returns
+        -------
+        tuple[str, str] | None
+            The stop reason ('repeated_error', 'cycle' or 'equivalent_retries') and a description of it, or None
+            if the conversation is not stuck.
+
+        """
+        signature = tuple(sorted((name, json.dumps(arguments, sort_keys=True)) for name, arguments, _ in calls))
+        self.turns.append(signature)
+
+        # Repeated errors, counted once per turn so parallel calls failing alike do not stop the loop at once
+        for error in {str(result) for _, _, result in calls if isinstance(result, Exception)}:
+            self.error_turns[error] = self.error_turns.get(error, 0) + 1
+            if self.max_repeated_errors and self.error_turns[error] >= self.max_repeated_errors:
+                return 'repeated_error', f'The same error was returned in {self.error_turns[error]} turns: {error}'
+
+        # Equivalent retries of a failing call
+        for name, arguments, result in calls:
+            if not isinstance(result, Exception):
+                continue
+            key = normalize_call(name, arguments)
+            self.failed_calls[key] = self.failed_calls.get(key, 0) + 1
+            retries = self.failed_calls[key] - 1
+            if self.max_equivalent_retries and retries >= self.max_equivalent_retries:
+                return 'equivalent_retries', f'"{name}" failed {retries} times with equivalent arguments: {result}'
+
+        # Cycles of turns
+        if self.max_cycles and signature:
+            for period in range(1, self.max_period + 1):
+                span = period * self.max_cycles
+                if len(self.turns) < span:
+                    break
+                recent = self.turns[-span:]
+                if all(recent[i] == recent[i % period] for i in range(span)):
+                    return 'cycle', f'The last {span} turns repeat a cycle of {period} turn(s) {self.max_cycles} times.'
+
+        return None
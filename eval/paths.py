@@ -0,0 +1,36 @@
+"""Paths of evaluation runs, importable without loading the model and tool stacks."""
+
+from pathlib import Path
+
+
+def get_output_path(
+    model_name: str,
+    split: str,
+    toolbox: str,
+    n_shots: int,
+    mode: str = 'step',
+) -> Path:
+    """Return the path results of an evaluation run are saved to.
+
+    Parameters
+    ----------
+    model_name : str
+        Path or name of the model. Only the last path component is used.
+    split : str
+        Dataset split.
+    toolbox : str
+        Toolbox used for the evaluation.
+    n_shots : int
+        Number of n-shot examples.
+    mode : str
+        Evaluation mode. Plan mode runs get a '_plan' suffix.
+
+    Returns
+    -------
+    Path
+        The path of the run in 'eval/runs/'.
+
+    """
+    model_name = str(model_name).split('/')[-1]
+    suffix = '_plan' if mode == 'plan' else ''
+    return Path('eval', 'runs', f'{model_name}_{split}_{toolbox}-tools_{n_shots}-shot{suffix}.jsonl')
@@ -0,0 +1,214 @@
+"""Execute plans of tool calls (see `frankenstein.model.Plan`) for plan-then-execute evaluation."""
+
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from pydantic import ValidationError
+
+from eval.executor import ToolExecutor
+from eval.formatting import ResultFormatter
+from frankenstein.model import Plan, PlanStep
+
+REFERENCE_PATTERN = re.compile(r'^\$([\w-]+)$')
+
+
+def find_references(value) -> set[str]:
+    """Return the ids of the steps referred to by an argument value, e.g. {'s1'} for '$s1' or ['$s1', 2]."""
+    if isinstance(value, str):
+        match = REFERENCE_PATTERN.match(value.strip())
+        return {match.group(1)} if match else set()
+    if isinstance(value, list):
+        return set().union(*(find_references(v) for v in value))
+    if isinstance(value, dict):
+        return set().union(*(find_references(v) for v in value.values()))
+    return set()
+
+
+def resolve_references(
+    value,
+    outputs: dict,
+):
+    """Replace the references in an argument value by the outputs of the steps they refer to."""
+    if isinstance(value, str):
+        match = REFERENCE_PATTERN.match(value.strip())
+        return outputs[match.group(1)] if match else value
+    if isinstance(value, list):
+        return [resolve_references(v, outputs) for v in value]
+    if isinstance(value, dict):
+        return {k: resolve_references(v, outputs) for k, v in value.items()}
+    return value
+
+
+class PlanExecutor:
+    """Run the steps of a plan, executing independent steps in parallel as soon as their inputs are ready.
+
+    A step whose inputs include the output of a failed step is skipped with an error, so one failure does not
+    hide the results of unrelated steps. All results are returned together, one line per step.
+    """
+
+    def __init__(
+        self,
+        executor: ToolExecutor,
+        tool_names: set[str],
+        formatter: ResultFormatter | None = None,
+        max_workers: int = 8,
+    ) -> None:
+        """Initialize the plan executor.
+
+        Parameters
+        ----------
+        executor : ToolExecutor
+            Executor for the tool calls of each step.
+        tool_names : set[str]
+            Names of the tools plans may use.
+        formatter : ResultFormatter | None
+            Formatter of step results. Results are formatted with `str` if not given.
+        max_workers : int
+            Maximum number of steps to execute at the same time.
+
+        """
+        self.executor = executor
+        self.tool_names = tool_names
+        self.formatter = formatter
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def parse(
+        self,
+        arguments: dict,
+    ) -> Plan:
+        """Validate the arguments of an `execute_plan` call into a plan.
+
+        Parameters
+        ----------
+        arguments : dict
+            The arguments of the call, i.e. {'steps': [...]}.
+
+        Returns
+        -------
+        Plan
+            The validated plan.
+
+        Raises
+        ------
+        ValueError
+            If the plan does not match the schema, uses an unknown tool, repeats a step id, or refers to a step
+            that is not an earlier step.
+
+        """
+        try:
+            plan = Plan.model_validate(arguments)
+        except ValidationError as e:
+            raise ValueError(f'Error: the plan does not match the schema: {e.errors(include_url=False)}') from e
+
+        seen = set()
+        for step in plan.steps:
+            if step.id in seen:
+                raise ValueError(f"Error: step id '{step.id}' is used more than once. Step ids must be unique.")
+            if step.tool not in self.tool_names:
+                raise ValueError(
+                    f"Error: step '{step.id}' uses the unknown tool '{step.tool}'. Plans may use: "
+                    f'{", ".join(sorted(self.tool_names))}.'
+                )
+            unknown = find_references(step.arguments) - seen
+            if unknown:
+                raise ValueError(
+                    f"Error: step '{step.id}' refers to {', '.join(sorted(unknown))}, which are not earlier steps."
+                )
+            seen.add(step.id)
+        return plan
+
+    def run_step(
+        self,
+        step: PlanStep,
+        arguments: dict,
+    ):
+        """Execute one step, returning its result or the exception it raised."""
+        try:
+            return self.executor.execute(step.tool, arguments)
+        except Exception as e:
+            return e
+
+    def execute(
+        self,
+        plan: Plan,
+    ) -> list[dict]:
+        """Execute a plan.
+
+        Parameters
+        ----------
+        plan : Plan
+            A plan validated with `parse`.
+
+        Returns
+        -------
+        list[dict]
+            The 'id', 'tool', resolved 'arguments' and 'result' (or exception) of each step, in plan order.
+
+        """
+        dependencies = {step.id: find_references(step.arguments) for step in plan.steps}
+        outputs = {}
+        resolved = {}
+        remaining = list(plan.steps)
+        running = {}
+
+        while remaining or running:
+            # Start (or skip) every step whose inputs are ready; skipping may make further steps ready
+            progress = True
+            while progress:
+                progress = False
+                for step in list(remaining):
+                    if not dependencies[step.id] <= outputs.keys():
+                        continue
+                    remaining.remove(step)
+                    progress = True
+                    failed = sorted(d for d in dependencies[step.id] if isinstance(outputs[d], Exception))
+                    if failed:
+                        outputs[step.id] = ValueError(
+                            f"Error: step '{step.id}' was skipped because step '{failed[0]}' failed."
+                        )
+                        resolved[step.id] = step.arguments
+                        continue
+                    resolved[step.id] = resolve_references(step.arguments, outputs)
+                    running[self.pool.submit(self.run_step, step, resolved[step.id])] = step
+
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outputs[running.pop(future).id] = future.result()
+
+        return [
+            {'id': step.id, 'tool': step.tool, 'arguments': resolved[step.id], 'result': outputs[step.id]}
+            for step in plan.steps
+        ]
+
+    def run(
+        self,
+        arguments: dict,
+    ) -> tuple[str, list[dict]]:
+        """Parse and execute an `execute_plan` call.
+
+        Parameters
+        ----------
+        arguments : dict
+            The arguments of the call.
+
+        Returns
+        -------
+        tuple[str, list[dict]]
+            The results of all steps as text, one 'id (tool): result' line per step, and the executed steps.
+
+        Raises
+        ------
+        ValueError
+            If the plan is invalid. Nothing is executed in that case.
+
+        """
+        steps = self.execute(self.parse(arguments))
+        lines = []
+        for step in steps:
+            if self.formatter is not None:
+                result = self.formatter.format(step['tool'], step['result'])
+            else:
+                result = str(step['result'])
+            lines.append(f'{step["id"]} ({step["tool"]}): {result}')
+        return '\n'.join(lines), steps
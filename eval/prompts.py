@@ -1,15 +1,68 @@
 """Prompts for passing to LLMs, including the base prompt, tool use prompt, and tool metadata."""
 
+import functools
+import hashlib
 import inspect
+import json
 import random
 from pathlib import Path
 
 import pandas as pd
 
+from frankenstein import aggregates as region_aggregates
 from frankenstein.action import FrankensteinAction
+from frankenstein.model import Plan
 from frankenstein.slot_values import Property, Region, Subject, Year
 from frankenstein.tools import arithmetic, data_retrieval
-from frankenstein.utils import get_tool_metadata
+from frankenstein.utils import get_data_version, get_tool_metadata
+
+N_SHOT_SEED = 0
+N_SHOT_CACHE_DIR = Path('eval', 'cache', 'n_shot')
+
+# Tool schemas are built once per process so every request in a sweep sends identical `tools` payloads
+TOOL_SCHEMAS = {toolbox: get_tool_metadata(toolbox=toolbox) for toolbox in ('all', 'arithmetic', 'data')}
+
+
+def get_plan_tool_metadata() -> dict:
+    """Return the schema of the `execute_plan` tool of plan mode, built from `frankenstein.model.Plan`."""
+    parameters = Plan.model_json_schema()
+    # Inline the step schema, as not every server resolves '$defs' references in tool parameters
+    parameters['properties']['steps']['items'] = parameters.pop('$defs')['PlanStep']
+    return {
+        'type': 'function',
+        'function': {
+            'name': 'execute_plan',
+            'description': 'Execute a plan of tool calls and return the results of all steps at once.',
+            'parameters': parameters,
+        },
+    }
+
+
+# In plan mode the model can only submit plans and its final answer; the other tools are used inside plans
+PLAN_TOOL_SCHEMAS = {
+    toolbox: [get_plan_tool_metadata()] + [tool for tool in tools if tool['function']['name'] == 'final_answer']
+    for toolbox, tools in TOOL_SCHEMAS.items()
+}
+
+
+def format_tool_metadata(
+    toolbox: str,
+) -> str:
+    """Render the tool schemas for a toolbox as canonical JSON, one tool per line.
+
+    Parameters
+    ----------
+    toolbox : str
+        The toolbox to render. Options are 'all', 'arithmetic', or 'data'.
+
+    Returns
+    -------
+    str
+        Compact JSON with sorted keys, so the text is byte-identical across processes.
+
+    """
+    return '\n'.join(json.dumps(tool, sort_keys=True, separators=(',', ':')) for tool in TOOL_SCHEMAS[toolbox])
+
 
 BASE_PROMPT = """You are a helpful assistant tasked with answering questions that require multiple intermediate steps of reasoning to arrive at a final answer.
 
@@ -45,15 +98,27 @@ Only provide the answer itself (e.g., the number, list, string, or boolean value
 
 """
 
+PLAN_USE_BASE = """You have access to a set of tools to help you answer the question, but instead of calling them one at a time, you must call them as steps of a plan.
+
+Create a plan of all the tool calls needed to answer the question and submit it with a single `execute_plan` tool call. Each step has a unique `id` (e.g. "s1"), the `tool` to call, and its `arguments`. To use the output of an earlier step as an argument (or as an element of a list argument), write "$" followed by the id of that step, e.g. "$s1". A step may only use the outputs of steps listed before it.
+
+I will execute the plan, running independent steps in parallel, and return the results of all steps at once. If a step fails, steps using its output are skipped, and you can submit a new plan to repair it.
+
+Only provide the answer itself (e.g., the number, list, string, or boolean value) as your answer. Do not include any additional text or explanations. Do not perform any rounding or formatting of the answer.
+
+**Once you have the results you need, you must create a `final_answer` tool call to return your final answer - I will not be able to parse your answer from message content.**
+
+"""
+
 ALL_TOOLS = f"""The tools you have access to are below:
 
-{get_tool_metadata(toolbox='all')}
+{format_tool_metadata('all')}
 
 """
 
 ARITHMETIC_TOOLS = f"""The tools you have access to are below:
 
-{get_tool_metadata(toolbox='arithmetic')}
+{format_tool_metadata('arithmetic')}
 
 These tools can help you perform arithmetic operations (e.g., summation, averages, differences, ratios) on numeric values. However, you must **recall the necessary data yourself** — these tools cannot access external data sources like the World Bank.
 
@@ -61,7 +126,7 @@ These tools can help you perform arithmetic operations (e.g., summation, average
 
 DATA_TOOLS = f"""The tools you have access to are below:
 
-{get_tool_metadata(toolbox='data')}
+{format_tool_metadata('data')}
 
 These tools allow you to access World Bank indicators and retrieve data for specific countries, indicators, and years. Use them to fetch relevant data to answer the question.
 
@@ -71,17 +136,10 @@ If it helps you, generate the tool calls in your message content, structured as
 """
 
 
-def generate_tool_call_example(tool_name: str, tool_modules: list) -> str:
-    """Generate and execute a single tool call example for a given tool name."""
-    # Gather all available tool functions
-    tool_map = {}
-    for module in tool_modules:
-        tool_map.update(dict(inspect.getmembers(module, inspect.isfunction)))
-
-    tool_func = tool_map[tool_name]
-
+@functools.lru_cache(maxsize=1)
+def get_example_values() -> dict[str, list]:
+    """Load the pools of slot values that n-shot examples are drawn from."""
     country_codes = Subject.get_values()
-    regions = [r for r in Region.get_values() if r and isinstance(r, str)]
     indicator_codes = Property.get_values()
     try:
         wdi_data = pd.read_json(Path('resources', 'indicator_paraphrases.json'))
@@ -93,35 +151,89 @@ def generate_tool_call_example(tool_name: str, tool_modules: list) -> str:
         country_names = iso_data['country_name'].dropna().unique().tolist()
     except Exception:
         country_names = country_codes
-    years = Year.get_values()
+
+    return {
+        'country_code': country_codes,
+        'country_name': country_names,
+        'region': [r for r in Region.get_values() if r and isinstance(r, str)],
+        'indicator_name': indicator_names,
+        'indicator_code': indicator_codes,
+        'year': Year.get_values(),
+    }
+
+
+def generate_tool_call_example(
+    tool_name: str,
+    tool_modules: list,
+    rng: random.Random | None = None,
+) -> str:
+    """Generate and execute a single tool call example for a given tool name.
+
+    Parameters
+    ----------
+    tool_name : str
+        The name of the tool to generate an example for.
+    tool_modules : list
+        The modules to look the tool up in.
+    rng : random.Random | None
+        Random number generator to draw arguments from. Pass a seeded instance for reproducible examples.
+
+    Returns
+    -------
+    str
+        The example tool call and the result of executing it.
+
+    """
+    rng = rng or random.Random()
+
+    # Gather all available tool functions
+    tool_map = {}
+    for module in tool_modules:
+        tool_map.update(dict(inspect.getmembers(module, inspect.isfunction)))
+
+    tool_func = tool_map[tool_name]
+    example_values = get_example_values()
 
     params = inspect.signature(tool_func).parameters
     kwargs = {}
     for pname, p in params.items():
-        if p.default is not inspect.Parameter.empty:
+        if pname == 'order':
+            kwargs[pname] = rng.choice(['descending', 'ascending'])
+        elif p.default is not inspect.Parameter.empty:
             kwargs[pname] = p.default
-        elif pname == 'country_code':
-            kwargs[pname] = random.choice(country_codes)
-        elif pname == 'country_name':
-            kwargs[pname] = random.choice(country_names)
-        elif pname == 'region':
-            kwargs[pname] = random.choice(regions)
-        elif pname == 'indicator_name':
-            kwargs[pname] = random.choice(indicator_names)
-        elif pname == 'indicator_code':
-            kwargs[pname] = random.choice(indicator_codes)
-        elif pname == 'year':
-            kwargs[pname] = random.choice(years)
+        elif pname in example_values:
+            kwargs[pname] = rng.choice(example_values[pname])
         elif pname in {'value_a', 'value_b'}:
-            kwargs[pname] = round((random.random() - 0.5) * 10, random.randint(3, 10))
+            kwargs[pname] = round((rng.random() - 0.5) * 10, rng.randint(3, 10))
         elif pname == 'values':
-            kwargs[pname] = [round((random.random() - 0.5) * 10, random.randint(3, 10)) for _ in range(3)]
+            kwargs[pname] = [round((rng.random() - 0.5) * 10, rng.randint(3, 10)) for _ in range(3)]
+        elif pname == 'start_year':
+            kwargs[pname] = rng.choice(example_values['year'][:-4])
+        elif pname == 'end_year':
+            start = example_values['year'].index(kwargs['start_year'])
+            kwargs[pname] = rng.choice(example_values['year'][start + 1 : start + 5])
+        elif pname == 'country_codes':
+            kwargs[pname] = rng.sample(example_values['country_code'], 3)
+        elif pname == 'statistic':
+            kwargs[pname] = rng.choice(region_aggregates.STATISTICS)
+        elif pname == 'threshold':
+            kwargs[pname] = round((rng.random() - 0.5) * 10, rng.randint(0, 3))
+        elif pname == 'mapping':
+            kwargs[pname] = {
+                code: round(rng.random() * 100, rng.randint(1, 3))
+                for code in rng.sample(example_values['country_code'], 4)
+            }
+        elif pname == 'n':
+            kwargs[pname] = rng.randint(1, 3)
+        elif pname == 'expression':
+            first, second = (round(rng.random() * 100, rng.randint(1, 3)) for _ in range(2))
+            kwargs[pname] = f'({first} + {second}) / 2'
         elif pname == 'keywords':
-            kwargs[pname] = random.choice(['water', 'secondary', 'poverty', 'tuberculosis'])
+            kwargs[pname] = rng.choice(['water', 'secondary', 'poverty', 'tuberculosis'])
         elif pname == 'thought':
             kwargs[pname] = 'Use this field to plan or think aloud about what actions to take.'
         elif pname == 'answer':
-            kwargs[pname] = round((random.random() - 0.5) * 100, random.randint(0, 10))
+            kwargs[pname] = round((rng.random() - 0.5) * 100, rng.randint(0, 10))
         elif pname == 'query_value':
             kwargs[pname] = 0.0
         else:
@@ -138,8 +250,15 @@ def generate_tool_call_example(tool_name: str, tool_modules: list) -> str:
     return example
 
 
-def create_n_shot_examples(n: int = 3, toolbox: str = 'all') -> str:
-    """Create n random examples for each available tool, grouped by tool (DFS order), for the specified toolbox."""
+def create_n_shot_examples(
+    n: int = 3,
+    toolbox: str = 'all',
+    seed: int = N_SHOT_SEED,
+) -> str:
+    """Create n random examples for each available tool, grouped by tool (DFS order), for the specified toolbox.
+
+    Examples are drawn from a generator seeded with `seed`, so the same arguments always produce the same text.
+    """
     # Select modules based on toolbox
     if toolbox == 'arithmetic':
         tool_modules = [arithmetic]
@@ -153,16 +272,105 @@ def create_n_shot_examples(n: int = 3, toolbox: str = 'all') -> str:
         tool_map.update(dict(inspect.getmembers(module, inspect.isfunction)))
     tool_names = list(tool_map.keys())
 
+    rng = random.Random(seed)
     all_examples = []
     for tool_name in tool_names:
         tool_examples = []
         for _ in range(n):
-            example = generate_tool_call_example(tool_name, tool_modules)
+            example = generate_tool_call_example(tool_name, tool_modules, rng=rng)
             tool_examples.append(example)
         all_examples.append('\n\n'.join(tool_examples))
     return '\n---\n'.join(all_examples)
 
 
+def load_n_shot_examples(
+    n: int = 3,
+    toolbox: str = 'all',
+    seed: int = N_SHOT_SEED,
+) -> str:
+    """Return n-shot examples for a toolbox, reading them from the on-disk cache if possible.
+
+    The cache is keyed by toolbox, number of shots, seed, the data version, and the tool schemas, so a stale file
+    is never reused after the resources or the tools change.
+
+    Parameters
+    ----------
+    n : int
+        Number of examples per tool.
+    toolbox : str
+        The toolbox to create examples for.
+    seed : int
+        Seed for the random number generator used to draw example arguments.
+
+    Returns
+    -------
+    str
+        The n-shot examples text.
+
+    """
+    schema_toolbox = toolbox if toolbox in TOOL_SCHEMAS else 'all'
+    schema_hash = hashlib.sha256(format_tool_metadata(schema_toolbox).encode()).hexdigest()[:8]
+    cache_path = N_SHOT_CACHE_DIR / f'{toolbox}_{n}-shot_seed-{seed}_{get_data_version()}_{schema_hash}.txt'
+    if cache_path.exists():
+        return cache_path.read_text(encoding='utf-8')
+
+    examples = create_n_shot_examples(n, toolbox=toolbox, seed=seed)
+
+    # Write to a temporary file first so concurrent processes never read a partial file
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(f'.{random.getrandbits(32):08x}.tmp')
+    tmp_path.write_text(examples, encoding='utf-8')
+    tmp_path.replace(cache_path)
+
+    return examples
+
+
+@functools.lru_cache(maxsize=None)
+def build_system_prompt(
+    toolbox: str = 'all',
+    n_shots: int = 0,
+    mode: str = 'step',
+) -> str:
+    """Assemble the system prompt for a toolbox and number of n-shot examples.
+
+    Parameters
+    ----------
+    toolbox : str
+        The toolbox to use. Options are 'all', 'arithmetic', 'data', or 'none'.
+    n_shots : int
+        Number of n-shot examples to append to the prompt.
+    mode : str
+        'step' to call tools one turn at a time, or 'plan' to submit plans of tool calls with `execute_plan`.
+
+    Returns
+    -------
+    str
+        The system prompt. Identical arguments always return an identical string.
+
+    """
+    if mode not in {'step', 'plan'}:
+        raise ValueError(f'Invalid mode: {mode}')
+    if mode == 'plan' and (toolbox == 'none' or n_shots > 0):
+        raise ValueError('Plan mode needs a toolbox and does not support n-shot examples.')
+    tool_use = PLAN_USE_BASE if mode == 'plan' else TOOL_USE_BASE
+
+    if toolbox == 'arithmetic':
+        system_prompt = BASE_PROMPT + tool_use + ARITHMETIC_TOOLS
+    elif toolbox == 'data':
+        system_prompt = BASE_PROMPT + tool_use + DATA_TOOLS
+    elif toolbox == 'all':
+        system_prompt = BASE_PROMPT + tool_use + ALL_TOOLS
+    elif toolbox == 'none':
+        system_prompt = BASE_PROMPT
+    else:
+        raise ValueError(f'Invalid toolbox: {toolbox}')
+
+    if n_shots > 0:
+        system_prompt += '\n\n' + load_n_shot_examples(n_shots, toolbox=toolbox)
+
+    return system_prompt
+
+
 if __name__ == '__main__':
     print('=== BASE PROMPT ===')
     print(BASE_PROMPT)
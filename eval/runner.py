@@ -5,16 +5,29 @@ import datetime
 import gc
 import json
 import logging
-from pathlib import Path
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from uuid import uuid4
+
 import litellm
 import pandas as pd
 from rich.logging import RichHandler
 
+from eval.checkpoint import TurnJournal
+from eval.concurrency import AIMDController, backoff_delay
+from eval.context import ContextBudget
+from eval.endpoints import EndpointPool
+from eval.executor import ToolExecutor
+from eval.formatting import ResultFormatter
+from eval.hedging import Hedger
+from eval.loop_detector import LoopDetector
 from eval.matcher import Matcher
-from eval.prompts import ALL_TOOLS, ARITHMETIC_TOOLS, BASE_PROMPT, DATA_TOOLS, TOOL_USE_BASE, create_n_shot_examples
-from frankenstein.action import FrankensteinAction
-from frankenstein.utils import get_tool_metadata, parse_json_arguments, to_json_safe
+from eval.planner import PlanExecutor
+from eval.prompts import PLAN_TOOL_SCHEMAS, TOOL_SCHEMAS, build_system_prompt
+from eval.tool_server import ToolClient
+from frankenstein.utils import parse_json_arguments, to_json_safe
 
 SINGLE_TOOL_CALL_MODELS = {
     'Llama-3.1-8B-Instruct',
@@ -34,6 +47,19 @@ class Runner:
         debug: bool = False,
         n_shots: int = 0,
         rerun_on_incorrect: bool = False,  # New argument
+        executor: ToolExecutor | ToolClient | None = None,
+        max_tool_workers: int = 8,
+        api_bases: list[str] | None = None,
+        pool: EndpointPool | None = None,
+        request_timeout: float = 600.0,
+        controller: AIMDController | None = None,
+        max_retries: int = 5,
+        hedger: Hedger | None = None,
+        journal: TurnJournal | None = None,
+        loop_detector: LoopDetector | None = None,
+        context_budget: ContextBudget | None = None,
+        formatter: ResultFormatter | None = None,
+        mode: str = 'step',
     ) -> None:
         """Initialize the Runner class.
 
@@ -47,42 +73,86 @@ class Runner:
             If True, the loop will wait for user input after each message.
         n_shots : int
             Number of n-shot examples to prepend to the prompt.
+        executor : ToolExecutor | ToolClient | None
+            Executor for tool calls, or a client of a tool server shared with other processes. A new memoizing
+            executor is created if not given.
+        max_tool_workers : int
+            Maximum number of tool calls from one assistant message to execute concurrently.
+        api_bases : list[str] | None
+            Base URLs of local model servers. Ignored for 'openai/' models or if `pool` is given.
+        pool : EndpointPool | None
+            Endpoint pool to share between runners. A new pool over `api_bases` is created if not given.
+        request_timeout : float
+            Seconds after which a request is treated as stalled and failed over to another endpoint.
+        controller : AIMDController | None
+            Shared controller limiting the number of in-flight requests. Requests are not limited if not given.
+        max_retries : int
+            Number of times a request is retried, with jittered backoff, after rate limits or endpoint errors.
+        hedger : Hedger | None
+            Shared hedger sending a backup request when a request is slow. Requests are not hedged if not given.
+        journal : TurnJournal | None
+            Journal to checkpoint conversations to after every turn, and to resume them from.
+        loop_detector : LoopDetector | None
+            Detector stopping conversations that are stuck. Conversations are only stopped by the hard limits if not
+            given.
+        context_budget : ContextBudget | None
+            Budget folding older turns of long conversations into a facts table. Prompts are not compacted if not
+            given.
+        formatter : ResultFormatter | None
+            Formatter of the tool results sent to the model. Results are sent as `str(result)` if not given.
+        mode : str
+            'step' to let the model call tools one turn at a time, or 'plan' to let it submit whole plans of tool
+            calls with `execute_plan`, which are executed locally with independent steps in parallel.
 
         """
         if model_name.startswith('openai/'):
             # Use the OpenAI API key from the environment variable
-            self.api_base = None
+            self.pool = None
             self.model_name = model_name
         else:
-            # Use the local model
-            self.api_base = 'http://0.0.0.0:8000/v1'
+            # Use local model servers
+            self.pool = pool or EndpointPool(api_bases)
             self.model_name = 'hosted_vllm/' + model_name
-
+        # Listed without their provider prefix, e.g. 'hosted_vllm/'
+        self.single_tool_call_model = self.model_name.split('/', 1)[-1] in SINGLE_TOOL_CALL_MODELS
+
+        self.request_timeout = request_timeout
+        self.controller = controller
+        self.max_retries = max_retries
+        self.hedger = hedger
+        self.journal = journal
+        self.session_id = None
+        self.latencies = []  # Latency of each model request in the current loop
         self.n_shots = n_shots
         self.rerun_on_incorrect = rerun_on_incorrect
 
-        if toolbox == 'arithmetic':
-            self.system_prompt = BASE_PROMPT + TOOL_USE_BASE + ARITHMETIC_TOOLS
-            self.tools = get_tool_metadata(toolbox='arithmetic')
-        elif toolbox == 'data':
-            self.system_prompt = BASE_PROMPT + TOOL_USE_BASE + DATA_TOOLS
-            self.tools = get_tool_metadata(toolbox='data')
-        elif toolbox == 'all':
-            self.system_prompt = BASE_PROMPT + TOOL_USE_BASE + ALL_TOOLS
-            self.tools = get_tool_metadata(toolbox='all')
-        elif toolbox == 'none':
-            self.system_prompt = BASE_PROMPT
-            self.tools = {}
-
-        # Add n-shot examples if requested
-        if self.n_shots > 0:
-            self.system_prompt += '\n\n' + create_n_shot_examples(self.n_shots, toolbox=toolbox)
+        # System prompts and tool schemas are canonical and cached, so every conversation shares the same prefix
+        self.mode = mode
+        self.system_prompt = build_system_prompt(toolbox=toolbox, n_shots=self.n_shots, mode=mode)
+        self.tools = (PLAN_TOOL_SCHEMAS if mode == 'plan' else TOOL_SCHEMAS).get(toolbox, {})
 
         self.debug = debug
         self.MAX_REPEATED_TOOL_CALLS = 10
+        self.loop_detector = loop_detector
+        self.stop_reason = None  # Why the last loop stopped, e.g. 'final_answer' or 'cycle'
+        self.context_budget = context_budget
+        self.formatter = formatter
         self.tool_call_counts = {}
         self.matcher = Matcher()
+        self.executor = executor or ToolExecutor()
+        self.tool_pool = ThreadPoolExecutor(max_workers=max_tool_workers)
+        self.tool_timings = []  # Time taken by each tool call in the current loop
+        self.plan_steps = []  # Steps executed by the plans of the current loop, in plan mode
+        self.planner = None
+        if mode == 'plan':
+            self.planner = PlanExecutor(
+                self.executor,
+                tool_names={tool['function']['name'] for tool in TOOL_SCHEMAS.get(toolbox, {})} - {'final_answer'},
+                formatter=formatter,
+                max_workers=max_tool_workers,
+            )
         self.total_tokens = 0  # Track total tokens used in this Runner session
+        self.token_count = 0
 
         if self.debug:
             # Print config
@@ -123,31 +193,78 @@ class Runner:
         # Log the number of messages so far
         logging.info(f'📨 {len(messages)} messages created')
 
-        try:
-            response = litellm.completion(
-                model=self.model_name,
-                messages=messages,
-                temperature=0.15,
-                # top_p=0.95,
-                tools=self.tools,
-                tool_choice='auto',
-                # tool_choice='required',
-                api_base=self.api_base,
-                # max_tokens=4096,
-                # max_input_tokens=4096,
-            )
-        except litellm.exceptions.ContextWindowExceededError as e:
-            logging.error(f'❌ Context window exceeded: {e}')  # noqa: TRY400
-            return None
-        except litellm.exceptions.BadRequestError as e:
-            logging.error(f'❌ Bad request: {e}')  # noqa: TRY400
-            return None
-        except litellm.exceptions.RateLimitError as e:
-            logging.error(f'❌ Rate limit exceeded: {e}')  # noqa: TRY400
-            return None
-        except litellm.exceptions.Timeout as e:
-            logging.error(f'❌ Timeout error: {e}')  # noqa: TRY400
-            return None
+        # Requests stick to the endpoint of this conversation, failing over to another endpoint on errors or stalls.
+        # Rate limits and errors on every endpoint are retried with jittered exponential backoff.
+        # Slow requests are hedged with a backup request if a hedger is given.
+        completion = self.hedger.completion if self.hedger is not None else litellm.completion
+        tried = set()
+        attempt = 0
+        while True:
+            if self.controller is not None:
+                self.controller.acquire()
+            endpoint = self.pool.acquire(self.session_id, exclude=tried) if self.pool is not None else None
+            api_base = endpoint.api_base if endpoint is not None else None
+            response = None
+            failed = False
+            overloaded = False
+            start = time.perf_counter()
+            try:
+                response = completion(
+                    model=self.model_name,
+                    messages=messages,
+                    temperature=0.15,
+                    # top_p=0.95,
+                    tools=self.tools,
+                    tool_choice='auto',
+                    # tool_choice='required',
+                    api_base=api_base,
+                    timeout=self.request_timeout,
+                    # max_tokens=4096,
+                    # max_input_tokens=4096,
+                )
+                break
+            except litellm.exceptions.ContextWindowExceededError as e:
+                logging.error(f'❌ Context window exceeded: {e}')  # noqa: TRY400
+                return None
+            except litellm.exceptions.BadRequestError as e:
+                logging.error(f'❌ Bad request: {e}')  # noqa: TRY400
+                return None
+            except litellm.exceptions.RateLimitError as e:
+                overloaded = True
+                error = e
+            except (
+                litellm.exceptions.Timeout,
+                litellm.exceptions.APIConnectionError,
+                litellm.exceptions.ServiceUnavailableError,
+                litellm.exceptions.InternalServerError,
+            ) as e:
+                failed = True
+                overloaded = isinstance(e, litellm.exceptions.Timeout)
+                error = e
+                tried.add(api_base)
+                if endpoint is not None and len(tried) < len(self.pool):
+                    logging.warning(f'⚠️  Endpoint {api_base} failed, failing over: {e}')
+                    continue
+            finally:
+                latency = time.perf_counter() - start
+                if self.controller is not None:
+                    tokens = getattr(getattr(response, 'usage', None), 'completion_tokens', None)
+                    self.controller.release(
+                        latency if response is not None else None, overloaded=overloaded, tokens=tokens
+                    )
+                if endpoint is not None:
+                    self.pool.release(endpoint, success=not failed)
+
+            if attempt >= self.max_retries:
+                logging.error(f'❌ Giving up after {attempt + 1} attempts: {error}')  # noqa: TRY400
+                return None
+            delay = backoff_delay(attempt)
+            logging.warning(f'⚠️  {error.__class__.__name__}, retrying in {delay:.1f}s: {error}')
+            time.sleep(delay)
+            attempt += 1
+            tried = set()
+
+        self.latencies.append(round(latency, 5))
 
         output = response.choices[0]
         message = response.choices[0].message
@@ -160,6 +277,7 @@ class Runner:
         input_text: str,
         gold_answer=None,
         answer_format: str | None = None,
+        checkpoint_key: str | None = None,
     ) -> list[dict]:
         """Run a full tool-using loop for a single input.
 
@@ -167,6 +285,9 @@ class Runner:
         ----------
         input_text : str
             The input text to start the loop.
+        checkpoint_key : str | None
+            Identifier of the question in the journal. If given (and the runner has a journal), the conversation
+            is checkpointed before every model request and resumed from its last checkpoint.
 
         Returns
         -------
@@ -179,8 +300,28 @@ class Runner:
             {'role': 'user', 'content': input_text},
         ]
 
+        # Each conversation is a new session, pinned to one endpoint for the reuse of its prefix cache
+        if self.pool is not None and self.session_id is not None:
+            self.pool.end_session(self.session_id)
+        self.session_id = str(uuid4())
+
         logging.info(f'❓ {input_text!r}')
 
+        self.stop_reason = None
+        if self.loop_detector is not None:
+            self.loop_detector.reset()
+        if self.context_budget is not None:
+            self.context_budget.reset()
+
+        journal = self.journal if checkpoint_key is not None else None
+        if journal is not None:
+            state = journal.load(checkpoint_key, self.system_prompt)
+            if state is not None:
+                messages = state['messages']
+                self.tool_call_counts = state['tool_call_counts']
+                self.token_count = state['token_count']
+                logging.info(f"♻️  Resuming from turn {state['turns']} ({len(messages)} messages)")
+
         while True:
             if self.debug:
                 i = input('')
@@ -190,11 +331,20 @@ class Runner:
                     logging.info('🪲  Debug mode disabled.')
                 if i.lower() == 'exit':
                     logging.info('🛑  Cancelled by user.')
+                    self.stop_reason = 'cancelled'
                     break
 
-            # Generate a response from the model
-            output = self.generate(messages)
+            # Checkpoint the conversation, so an interrupted run resumes from this turn
+            if journal is not None:
+                journal.append(checkpoint_key, messages, self.tool_call_counts, self.token_count)
+
+            # Generate a response from the model, from a compacted history if the conversation is over budget
+            if self.context_budget is not None:
+                output = self.generate(self.context_budget.compact(messages, self.model_name))
+            else:
+                output = self.generate(messages)
             if output is None:  # Caused by error
+                self.stop_reason = 'generation_error'
                 return messages, self.token_count
 
             # If output is None, it indicates a malformed tool call or an error
@@ -234,7 +384,7 @@ class Runner:
             }
 
             # Only include one tool call for single-tool-call models
-            single_tool_call_model = self.model_name in SINGLE_TOOL_CALL_MODELS
+            single_tool_call_model = self.single_tool_call_model
             if parsed_tool_calls:
                 if single_tool_call_model:
                     assistant_message['tool_calls'] = [parsed_tool_calls[0]]
@@ -245,19 +395,23 @@ class Runner:
 
             # Filter tool calls for single-tool-call models
             tool_calls_to_execute = parsed_tool_calls
-            single_tool_call_model = self.model_name in SINGLE_TOOL_CALL_MODELS
+            single_tool_call_model = self.single_tool_call_model
             if single_tool_call_model:
                 tool_calls_to_execute = [parsed_tool_calls[0]] if parsed_tool_calls else []
 
-            # Execute each tool call
+            # Parse the arguments of each tool call, stopping at the first that cannot be parsed
+            parsed_calls = []
+            parse_failed = False
             for tool_call in tool_calls_to_execute:
-                name = tool_call['function']['name']
-                arguments = tool_call['function']['arguments']
                 try:
-                    parsed_args = json.loads(arguments)
+                    parsed_calls.append((tool_call, json.loads(tool_call['function']['arguments'])))
                 except json.JSONDecodeError:
                     logging.exception('❌ Could not parse tool call arguments.')
-                    return messages, self.token_count
+                    parse_failed = True
+                    break
+
+            for tool_call, parsed_args in parsed_calls:
+                name = tool_call['function']['name']
 
                 # Format and log the function call
                 args_string = ', '.join([f'{k}={v!r}' for k, v in parsed_args.items()])
@@ -267,46 +421,75 @@ class Runner:
                 key = (name, json.dumps(parsed_args, sort_keys=True))
                 self.tool_call_counts[key] = self.tool_call_counts.get(key, 0) + 1
 
-                # Execute the function call
-                try:
-                    result = FrankensteinAction(action=name, **parsed_args).execute(error_handling='raise')
-                    logging.info(f'↪️  {result!r}')
+            # Execute the function calls, concurrently if there are several independent calls in this turn
+            if len(parsed_calls) > 1 and not single_tool_call_model:
+                outcomes = list(
+                    self.tool_pool.map(
+                        lambda call: self.execute_tool_call(call[0]['function']['name'], call[1]),
+                        parsed_calls,
+                    )
+                )
+            else:
+                outcomes = [self.execute_tool_call(call['function']['name'], args) for call, args in parsed_calls]
+
+            stuck = None
+            if self.loop_detector is not None:
+                stuck = self.loop_detector.observe(
+                    [
+                        (call['function']['name'], args, result)
+                        for (call, args), (result, _) in zip(parsed_calls, outcomes)
+                    ]
+                )
+
+            # Append the tool messages in the original order, paired with their tool_call_id
+            for (tool_call, args), (result, elapsed) in zip(parsed_calls, outcomes):
+                self.tool_timings.append({'name': tool_call['function']['name'], 'seconds': round(elapsed, 5)})
 
-                except Exception as e:
-                    result = e
+                if isinstance(result, Exception):
                     # Check if first word of message is "Warning" or "Error" and log accordingly
                     if str(result).startswith('Warning'):
                         logging.warning(f'⚠️  {result}')
                     elif str(result).startswith('Error'):
                         logging.error(f'❌ {result}')  # noqa: TRY400
+                else:
+                    logging.info(f'↪️  {result!r}')
 
                 messages.append(
                     {
                         'role': 'tool',
                         'tool_call_id': tool_call.get('id'),
-                        'content': str(result),
+                        'content': (
+                            self.formatter.format(tool_call['function']['name'], result, args)
+                            if self.formatter is not None
+                            else str(result)
+                        ),
                     }
                 )
 
-                # After first tool call, add user message if single-tool-call model
-                if single_tool_call_model:
-                    messages.append(
-                        {
-                            'role': 'user',
-                            'content': 'Note: Only the first tool call was executed because this model only supports single tool calls at a time. Please only call one tool per turn.',
-                        }
-                    )
-                    break
+            # After first tool call, add user message if single-tool-call model
+            if single_tool_call_model and parsed_calls:
+                messages.append(
+                    {
+                        'role': 'user',
+                        'content': 'Note: Only the first tool call was executed because this model only supports single tool calls at a time. Please only call one tool per turn.',
+                    }
+                )
+
+            if parse_failed:
+                self.stop_reason = 'parse_error'
+                return messages, self.token_count
 
             # After each tool call, check total tool calls limit
             total_tool_calls = sum(self.tool_call_counts.values())
             if total_tool_calls >= 100:
                 logging.warning('🛑 Stopping: total number of tool calls reached the limit of 100.')
+                self.stop_reason = 'tool_call_limit'
                 return messages, self.token_count
 
             # Also stop after 100 messages to prevent infinite loops
             if len(messages) >= 100:
                 logging.warning('🛑 Stopping: total number of messages reached the limit of 100.')
+                self.stop_reason = 'message_limit'
                 return messages, self.token_count
 
             # # Or, stop if the last 5 messages do not contain tool calls
@@ -325,6 +508,7 @@ class Runner:
                     break
 
             if final_answer_found:
+                self.stop_reason = 'final_answer'
                 # Run matcher if gold_answer is provided
                 if gold_answer is not None:
                     match_result = (
@@ -358,13 +542,51 @@ class Runner:
                     logging.warning(
                         f'🛑 Tool "{tool}" called {self.MAX_REPEATED_TOOL_CALLS} times with same arguments: {args_json}'
                     )
+                    self.stop_reason = 'repeated_tool_call'
                     return messages, self.token_count
 
+            # Stop early if the conversation is stuck in a cycle or keeps hitting the same errors
+            if stuck is not None:
+                self.stop_reason, description = stuck
+                logging.warning(f'🛑 Stopping: {description}')
+                return messages, self.token_count
+
             # Optionally run garbage collection to free memory
             gc.collect()
 
         return messages, self.token_count
 
+    def execute_tool_call(
+        self,
+        name: str,
+        arguments: dict,
+    ) -> tuple:
+        """Execute a single tool call and time it.
+
+        Parameters
+        ----------
+        name : str
+            The name of the tool.
+        arguments : dict
+            The parsed arguments of the tool call.
+
+        Returns
+        -------
+        tuple
+            The result of the tool call (or the exception it raised) and the time taken in seconds.
+
+        """
+        start = time.perf_counter()
+        try:
+            if name == 'execute_plan' and self.planner is not None:
+                result, steps = self.planner.run(arguments)
+                self.plan_steps.extend(steps)
+            else:
+                result = self.executor.execute(name, arguments)
+        except Exception as e:
+            result = e
+        return result, time.perf_counter() - start
+
     def format_messages(
         self,
         messages: list[dict],
@@ -411,7 +633,14 @@ class Runner:
     def reset(self):
         """Reset stateful variables for a new evaluation run."""
         self.tool_call_counts = {}
+        self.tool_timings = []
+        self.plan_steps = []
+        self.latencies = []
         self.total_tokens = 0  # Reset token counter
+        self.token_count = 0
+        self.stop_reason = None
+        if self.loop_detector is not None:
+            self.loop_detector.reset()
         # Add any other stateful variables that should be reset here
 
 
@@ -451,6 +680,19 @@ if __name__ == '__main__':
         action='store_true',
         help='If set, rerun the loop with a message if the final answer is incorrect.',
     )
+    parser.add_argument(
+        '--api-base',
+        type=str,
+        nargs='+',
+        default=None,
+        help='Base URLs of one or more local model servers to spread requests across.',
+    )
+    parser.add_argument(
+        '--tool-server',
+        type=str,
+        default=None,
+        help='Unix socket of a tool server (see eval/tool_server.py) to execute tool calls on.',
+    )
 
     args = parser.parse_args()
 
@@ -467,6 +709,8 @@ if __name__ == '__main__':
         debug=args.debug,
         n_shots=args.n_shots,
         rerun_on_incorrect=args.rerun_on_incorrect,  # Pass new argument
+        api_bases=args.api_base,
+        executor=ToolClient(args.tool_server) if args.tool_server else None,
     )
 
     file = Path('dataset', 'answerable-full.jsonl')
@@ -488,6 +732,8 @@ if __name__ == '__main__':
     if gold_answer is not None:
         runner.match_results(messages, gold_answer, answer_format)
 
+    logging.info(f'🗃️  Tool cache: {runner.executor.get_stats()}')
+
     if args.save:
         timestamp = datetime.datetime.now()
         output_path = Path('eval', 'dumps', f'{timestamp}').with_suffix('.json')
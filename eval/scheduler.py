@@ -0,0 +1,92 @@
+"""Order evaluation questions by predicted cost, so long questions do not straggle at the end of concurrent runs."""
+
+import heapq
+
+import pandas as pd
+
+SCHEDULES = ('file', 'longest-first')
+
+
+def get_template_costs(dataset: pd.DataFrame) -> dict[str, float]:
+    """Return the mean number of gold actions of each question template in a dataset."""
+    if 'actions' not in dataset or 'question_template' not in dataset:
+        return {}
+    n_actions = dataset['actions'].map(lambda actions: len(actions) if isinstance(actions, list) else None)
+    return n_actions.groupby(dataset['question_template']).mean().dropna().to_dict()
+
+
+def predict_cost(
+    row: pd.Series,
+    template_costs: dict[str, float],
+    template_weight: float = 0.5,
+) -> float:
+    """Predict the cost of a question, in tool calls, from its gold actions and its template.
+
+    Parameters
+    ----------
+    row : pd.Series
+        The dataset row of the question.
+    template_costs : dict[str, float]
+        Mean number of gold actions per template, from `get_template_costs`.
+    template_weight : float
+        Weight of the template mean against the question's own number of gold actions. The template mean smooths
+        out questions whose gold trace is unusually short or long for their template.
+
+    Returns
+    -------
+    float
+        The predicted cost. Higher is more expensive.
+
+    """
+    actions = row.get('actions')
+    n_actions = len(actions) if isinstance(actions, list) else None
+    template_cost = template_costs.get(row.get('question_template'))
+    if n_actions is None:
+        return template_cost or 0.0
+    if template_cost is None:
+        return float(n_actions)
+    return (1 - template_weight) * n_actions + template_weight * template_cost
+
+
+def estimate_makespan(
+    costs: list[float],
+    workers: int,
+) -> float:
+    """Estimate the makespan of running questions with the given costs, in order, on a number of workers."""
+    loads = [0.0] * max(1, workers)
+    for cost in costs:
+        heapq.heapreplace(loads, loads[0] + cost)
+    return max(loads)
+
+
+def schedule_questions(
+    pending: list[tuple[int, pd.Series]],
+    dataset: pd.DataFrame,
+    schedule: str = 'longest-first',
+) -> list[tuple[int, pd.Series]]:
+    """Order questions for evaluation.
+
+    'longest-first' starts the questions with the highest predicted cost first (longest processing time first),
+    which keeps every worker busy until close to the end of the run. 'file' keeps the dataset order.
+
+    Parameters
+    ----------
+    pending : list[tuple[int, pd.Series]]
+        Position in the dataset and dataset row of each question to evaluate.
+    dataset : pd.DataFrame
+        The whole dataset split, used to compute the mean cost of each template.
+    schedule : str
+        Either 'file' or 'longest-first'.
+
+    Returns
+    -------
+    list[tuple[int, pd.Series]]
+        The questions in the order to evaluate them.
+
+    """
+    if schedule not in SCHEDULES:
+        raise ValueError(f"Unknown schedule '{schedule}', expected one of {SCHEDULES}.")
+    if schedule == 'file':
+        return list(pending)
+    template_costs = get_template_costs(dataset)
+    return sorted(pending, key=lambda item: predict_cost(item[1], template_costs), reverse=True)
@@ -1 +0,0 @@
-python eval/evaluate.py --save --model "Qwen3-30B-A3B" --split "answerable-partial"
\ No newline at end of file
@@ -0,0 +1,332 @@
+"""Run a sweep of evaluations (models x splits x toolboxes x n-shots) concurrently across model endpoints."""
+
+import argparse
+import itertools
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+
+from eval.endpoints import DEFAULT_API_BASE
+from eval.paths import get_output_path
+
+LOG_DIR = Path('eval', 'runs', 'logs')
+STATUS_STYLES = {
+    'pending': 'dim',
+    'running': 'cyan',
+    'done': 'green',
+    'skipped': 'green dim',
+    'failed': 'red',
+}
+
+
+def count_lines(path: Path) -> int:
+    """Count the non-empty lines of a JSONL file, returning 0 if it does not exist."""
+    if not path.exists():
+        return 0
+    with path.open('rb') as f:
+        return sum(1 for line in f if line.strip())
+
+
+class SweepJob:
+    """One `eval/evaluate.py` invocation of a sweep."""
+
+    def __init__(
+        self,
+        model_name: str,
+        split: str,
+        toolbox: str,
+        n_shots: int,
+        num_samples: int = -1,
+        tool_server: str | None = None,
+        mode: str = 'step',
+    ) -> None:
+        """Initialize the job.
+
+        Parameters
+        ----------
+        model_name : str
+            Name of the model, as served by the endpoint.
+        split : str
+            Dataset split to evaluate on.
+        toolbox : str
+            Toolbox to use.
+        n_shots : int
+            Number of n-shot examples.
+        num_samples : int
+            Number of samples to evaluate. Use -1 for all samples.
+        tool_server : str | None
+            Unix socket of a tool server to execute tool calls on, shared by all jobs.
+        mode : str
+            Evaluation mode, 'step' or 'plan'.
+
+        """
+        self.model_name = model_name
+        self.split = split
+        self.toolbox = toolbox
+        self.n_shots = n_shots
+        self.num_samples = num_samples
+        self.tool_server = tool_server
+        self.mode = mode
+        self.output_path = get_output_path(model_name, split, toolbox, n_shots, mode)
+
+        split_size = count_lines(Path('dataset', f'{split}.jsonl'))
+        self.total = split_size if num_samples == -1 else min(num_samples, split_size)
+        self.done_at_start = count_lines(self.output_path)
+        self.status = 'skipped' if self.total and self.done_at_start >= self.total else 'pending'
+
+        self.endpoint = None
+        self.process = None
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def name(self) -> str:
+        """Return the name of the job, matching the stem of its output file."""
+        return self.output_path.stem
+
+    @property
+    def done(self) -> int:
+        """Return the number of questions with saved results."""
+        return count_lines(self.output_path)
+
+    def command(
+        self,
+        api_base: str | None,
+        concurrency: int,
+    ) -> list[str]:
+        """Build the command line that runs the job."""
+        command = [
+            sys.executable,
+            str(Path('eval', 'evaluate.py')),
+            '--save',
+            '--model-name',
+            self.model_name,
+            '--split',
+            self.split,
+            '--toolbox',
+            self.toolbox,
+            '--n-shots',
+            str(self.n_shots),
+            '--num-samples',
+            str(self.num_samples),
+            '--concurrency',
+            str(concurrency),
+            '--mode',
+            self.mode,
+        ]
+        if api_base is not None:
+            command += ['--api-base', api_base]
+        if self.tool_server is not None:
+            command += ['--tool-server', self.tool_server]
+        return command
+
+    def start(
+        self,
+        endpoint: dict,
+        concurrency: int,
+    ) -> None:
+        """Start the job as a subprocess on an endpoint, logging its output to 'eval/runs/logs/'."""
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        log_file = (LOG_DIR / f'{self.name}.log').open('a')
+        self.endpoint = endpoint
+        self.process = subprocess.Popen(
+            self.command(endpoint['api_base'], concurrency),
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+        )
+        log_file.close()
+        self.status = 'running'
+        self.started_at = time.monotonic()
+
+    def poll(self) -> bool:
+        """Update the status of a running job, returning True if it has finished."""
+        if self.process is None or self.process.poll() is None:
+            return False
+        self.status = 'done' if self.process.returncode == 0 else 'failed'
+        self.finished_at = time.monotonic()
+        return True
+
+
+class SweepOrchestrator:
+    """Run the jobs of a sweep concurrently, up to the capacity of each model's endpoints.
+
+    Jobs whose output file already holds every question are skipped, and partial runs are resumed by the
+    evaluator itself, so a sweep can be restarted at any time.
+    """
+
+    def __init__(
+        self,
+        definition: dict,
+        poll_interval: float = 2.0,
+    ) -> None:
+        """Initialize the orchestrator.
+
+        Parameters
+        ----------
+        definition : dict
+            The sweep definition. Keys are 'models', 'splits', 'toolboxes' and 'n_shots' (lists whose product
+            gives the jobs), and optionally 'num_samples', 'mode' ('step' or 'plan'), 'concurrency' (questions in
+            flight per job), 'tool_server' (Unix socket of a tool server, see `eval/tool_server.py`, shared by all
+            jobs) and 'endpoints', mapping each model name to a list of {'api_base': ..., 'capacity': ...} entries,
+            where capacity is the number of jobs that may run on that endpoint at once.
+        poll_interval : float
+            Seconds between checks of the running jobs.
+
+        """
+        self.definition = definition
+        self.poll_interval = poll_interval
+        self.concurrency = definition.get('concurrency', 1)
+
+        self.jobs = [
+            SweepJob(
+                model_name,
+                split,
+                toolbox,
+                n_shots,
+                definition.get('num_samples', -1),
+                definition.get('tool_server'),
+                definition.get('mode', 'step'),
+            )
+            for model_name, split, toolbox, n_shots in itertools.product(
+                definition['models'],
+                definition['splits'],
+                definition.get('toolboxes', ['all']),
+                definition.get('n_shots', [0]),
+            )
+        ]
+
+        # Each endpoint tracks how many jobs are running on it
+        self.endpoints = {}
+        for model_name in definition['models']:
+            default_api_base = None if model_name.startswith('openai/') else DEFAULT_API_BASE
+            endpoints = definition.get('endpoints', {}).get(model_name, [{'api_base': default_api_base}])
+            self.endpoints[model_name] = [{'capacity': 1, **endpoint, 'running': 0} for endpoint in endpoints]
+
+        self.started_at = None
+
+    def free_endpoint(
+        self,
+        model_name: str,
+    ) -> dict | None:
+        """Return the endpoint of a model with the most free capacity, or None if all are full."""
+        endpoints = [e for e in self.endpoints[model_name] if e['running'] < e['capacity']]
+        return max(endpoints, key=lambda e: e['capacity'] - e['running']) if endpoints else None
+
+    def schedule(self) -> None:
+        """Start pending jobs while their model has free endpoint capacity."""
+        for job in self.jobs:
+            if job.status != 'pending':
+                continue
+            endpoint = self.free_endpoint(job.model_name)
+            if endpoint is None:
+                continue
+            endpoint['running'] += 1
+            job.start(endpoint, self.concurrency)
+
+    def throughput(self) -> float:
+        """Return the number of questions completed per second since the sweep started."""
+        elapsed = time.monotonic() - self.started_at
+        completed = sum(max(job.done - job.done_at_start, 0) for job in self.jobs)
+        return completed / elapsed if elapsed > 0 else 0.0
+
+    def render(self) -> Table:
+        """Render the live table of jobs, with overall throughput and ETA in the caption."""
+        table = Table(title='Sweep', show_lines=False)
+        table.add_column('Job', style='cyan')
+        table.add_column('Endpoint')
+        table.add_column('Status')
+        table.add_column('Progress', justify='right')
+        table.add_column('Elapsed (s)', justify='right')
+
+        for job in self.jobs:
+            done = job.done
+            if job.started_at is not None:
+                elapsed = f'{(job.finished_at or time.monotonic()) - job.started_at:.0f}'
+            else:
+                elapsed = ''
+            api_base = job.endpoint['api_base'] if job.endpoint else ''
+            style = STATUS_STYLES[job.status]
+            table.add_row(
+                job.name,
+                str(api_base or ''),
+                f'[{style}]{job.status}[/{style}]',
+                f'{done}/{job.total}',
+                elapsed,
+            )
+
+        throughput = self.throughput()
+        remaining = sum(max(job.total - job.done, 0) for job in self.jobs if job.status in {'pending', 'running'})
+        eta = f'{remaining / throughput / 60:.1f} min' if throughput > 0 else '-'
+        table.caption = f'{throughput * 60:.2f} questions/min · {remaining} remaining · ETA {eta}'
+        return table
+
+    def run(self) -> list[SweepJob]:
+        """Run the sweep until every job has finished, showing a live table of progress.
+
+        Returns
+        -------
+        list[SweepJob]
+            The jobs of the sweep with their final status.
+
+        """
+        self.started_at = time.monotonic()
+        try:
+            with Live(self.render(), console=Console(), refresh_per_second=1) as live:
+                while any(job.status in {'pending', 'running'} for job in self.jobs):
+                    for job in self.jobs:
+                        if job.status == 'running' and job.poll():
+                            job.endpoint['running'] -= 1
+                    self.schedule()
+                    live.update(self.render())
+                    time.sleep(self.poll_interval)
+                live.update(self.render())
+        except KeyboardInterrupt:
+            for job in self.jobs:
+                if job.status == 'running':
+                    job.process.terminate()
+            raise
+
+        return self.jobs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a sweep of evaluations defined in a JSON file.')
+    parser.add_argument(
+        'definition',
+        type=str,
+        help='Path to the sweep definition, e.g. "eval/sweeps/qwen3.json".',
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Print the jobs and the commands that would be run, without running them.',
+    )
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=2.0,
+        help='Seconds between checks of the running jobs.',
+    )
+    args = parser.parse_args()
+
+    with Path(args.definition).open() as f:
+        definition = json.load(f)
+
+    orchestrator = SweepOrchestrator(definition, poll_interval=args.poll_interval)
+
+    if args.dry_run:
+        for job in orchestrator.jobs:
+            endpoint = orchestrator.endpoints[job.model_name][0]
+            print(f'[{job.status}] {" ".join(job.command(endpoint["api_base"], orchestrator.concurrency))}')
+    else:
+        jobs = orchestrator.run()
+        failed = [job.name for job in jobs if job.status == 'failed']
+        if failed:
+            print(f'Failed jobs (see {LOG_DIR}): {failed}')
+            sys.exit(1)
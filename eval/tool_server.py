@@ -0,0 +1,392 @@
+"""Local tool server shared by many runner processes, so they all use one warm, memoizing data layer.
+
+The server listens on a Unix socket and speaks JSON-RPC 2.0, one JSON object per line. It hosts a single
+`ToolExecutor`, so results memoized for one process are hits for every other process, and loads the indicator store,
+name and search indexes and region aggregates once at startup. Runners use a `ToolClient` in place of their own
+`ToolExecutor`:
+
+    python -m eval.tool_server --workers 8 &
+    python eval/evaluate.py --model-name ... --tool-server eval/cache/tools.sock
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from rich.logging import RichHandler
+
+from eval.executor import ToolExecutor
+from frankenstein.action import FrankensteinAction
+from frankenstein.aggregates import get_aggregates
+from frankenstein.name_index import get_country_index, get_indicator_index, get_region_index
+from frankenstein.search_index import get_indicator_search
+from frankenstein.utils import get_data_version
+from frankenstein.validation import get_validator
+
+DEFAULT_SOCKET_PATH = Path('eval', 'cache', 'tools.sock')
+
+# JSON-RPC error codes: the standard ones, and one for exceptions raised by a tool
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+TOOL_ERROR = -32000
+
+
+class RemoteToolError(Exception):
+    """Exception raised by a tool on the tool server, carrying the message of the original exception."""
+
+    def __init__(
+        self,
+        message: str,
+        error_type: str,
+    ) -> None:
+        """Initialize the exception with the original message.
+
+        Parameters
+        ----------
+        message : str
+            The message of the exception raised by the tool, e.g. "Warning: your function call was correct, ...".
+        error_type : str
+            The class name of the exception raised by the tool.
+
+        """
+        super().__init__(message)
+        self.error_type = error_type
+
+
+def to_json(value):
+    """Convert values the json module cannot encode (e.g. NumPy scalars and arrays) to JSON-compatible ones."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def warm_caches() -> None:
+    """Load everything the tools look up on first use, and compile the argument validator of every tool."""
+    start = time.perf_counter()
+    get_data_version()  # Loads the indicator store
+    get_country_index()
+    get_region_index()
+    get_indicator_index()
+    get_indicator_search()
+    get_aggregates()
+    for tool in FrankensteinAction().tool_map.values():
+        get_validator(tool)
+    logging.info(f'🔥 Warmed tool caches in {time.perf_counter() - start:.1f}s')
+
+
+class ToolRequestHandler(socketserver.StreamRequestHandler):
+    """Serve the requests of one client connection, one line of JSON each, until the client disconnects."""
+
+    def handle(self) -> None:
+        """Answer each request line with a response line, running the request on the server's worker pool."""
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.pool.submit(self.server.respond, line).result()
+            except RuntimeError:  # The server is shutting down
+                return
+            self.wfile.write(response)
+
+
+class ToolServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """JSON-RPC server executing tool calls for many clients with one shared `ToolExecutor`.
+
+    Each connection is served by its own thread, and requests are executed on a bounded pool of worker threads.
+    Methods are 'execute' (params 'name' and 'arguments'), 'get_stats', 'reset_stats', 'clear' and 'ping'.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_SOCKET_PATH,
+        executor: ToolExecutor | None = None,
+        max_workers: int = 8,
+    ) -> None:
+        """Initialize the server and bind its socket.
+
+        Parameters
+        ----------
+        path : str | Path
+            Path of the Unix socket to listen on. A stale socket file left by a stopped server is replaced.
+        executor : ToolExecutor | None
+            Executor for tool calls. A new memoizing executor is created if not given.
+        max_workers : int
+            Maximum number of requests executed at the same time.
+
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            if ToolClient(self.path).is_alive():
+                raise RuntimeError(f'A tool server is already listening on {self.path}.')
+            self.path.unlink()
+        self.executor = executor or ToolExecutor()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        super().__init__(str(self.path), ToolRequestHandler)
+
+    def respond(
+        self,
+        line: bytes,
+    ) -> bytes:
+        """Execute one JSON-RPC request and return its encoded response."""
+        try:
+            request = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return self.encode(None, error={'code': PARSE_ERROR, 'message': f'Parse error: {e}'})
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return self.encode(None, error={'code': INVALID_REQUEST, 'message': 'Invalid request'})
+
+        request_id = request.get('id')
+        method = request['method']
+        params = request.get('params') or {}
+        if method == 'execute':
+            try:
+                result = self.executor.execute(params['name'], params.get('arguments') or {})
+            except Exception as e:
+                return self.encode(
+                    request_id, error={'code': TOOL_ERROR, 'message': str(e), 'data': {'type': type(e).__name__}}
+                )
+            return self.encode(request_id, result=result)
+        if method == 'get_stats':
+            return self.encode(request_id, result=self.executor.get_stats())
+        if method == 'reset_stats':
+            self.executor.reset_stats()
+            return self.encode(request_id, result=None)
+        if method == 'clear':
+            self.executor.clear()
+            return self.encode(request_id, result=None)
+        if method == 'ping':
+            return self.encode(request_id, result=get_data_version())
+        return self.encode(request_id, error={'code': METHOD_NOT_FOUND, 'message': f'Method not found: {method}'})
+
+    @staticmethod
+    def encode(
+        request_id,
+        result=None,
+        error: dict | None = None,
+    ) -> bytes:
+        """Encode a JSON-RPC response as one line."""
+        response = {'jsonrpc': '2.0', 'id': request_id}
+        if error is None:
+            response['result'] = result
+        else:
+            response['error'] = error
+        return (json.dumps(response, default=to_json, separators=(',', ':')) + '\n').encode()
+
+    def server_close(self) -> None:
+        """Stop the worker pool and remove the socket file."""
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.path.unlink(missing_ok=True)
+
+
+class ToolClient:
+    """Drop-in replacement for `ToolExecutor` that executes tool calls on a `ToolServer`.
+
+    Each thread keeps its own connection to the server, so concurrent tool calls of one runner do not wait for each
+    other. Exceptions raised by tools are re-raised as `RemoteToolError` with the original message, which is all the
+    runner sends back to the model.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_SOCKET_PATH,
+        timeout: float = 60.0,
+    ) -> None:
+        """Initialize the client. Connections are opened on first use.
+
+        Parameters
+        ----------
+        path : str | Path
+            Path of the server's Unix socket.
+        timeout : float
+            Seconds to wait for the server to answer a request.
+
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self.local = threading.local()
+        self.request_ids = itertools.count(1)
+
+    def connect(self) -> tuple[socket.socket, object]:
+        """Return this thread's connection to the server and a line reader over it, connecting if needed."""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(str(self.path))
+            except OSError:
+                sock.close()
+                raise
+            connection = self.local.connection = (sock, sock.makefile('rb'))
+        return connection
+
+    def disconnect(self) -> None:
+        """Close this thread's connection to the server, if open."""
+        connection = getattr(self.local, 'connection', None)
+        self.local.connection = None
+        if connection is not None:
+            sock, reader = connection
+            reader.close()
+            sock.close()
+
+    def call(
+        self,
+        method: str,
+        params: dict | None = None,
+    ):
+        """Send a JSON-RPC request and return its result.
+
+        A request whose connection was dropped (e.g. because the server restarted) is sent again once on a new
+        connection.
+
+        Parameters
+        ----------
+        method : str
+            The method to call.
+        params : dict | None
+            The parameters of the method.
+
+        Returns
+        -------
+        Any
+            The result of the method.
+
+        Raises
+        ------
+        RemoteToolError
+            If the method is 'execute' and the tool raised an exception.
+        ConnectionError
+            If the server cannot be reached or returned an invalid response.
+
+        """
+        request_id = next(self.request_ids)
+        request = json.dumps(
+            {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params or {}},
+            default=to_json,
+            separators=(',', ':'),
+        )
+        for attempt in range(2):
+            try:
+                sock, reader = self.connect()
+                sock.sendall(request.encode() + b'\n')
+                line = reader.readline()
+                if not line:
+                    raise ConnectionError(f'The tool server at {self.path} closed the connection.')
+                break
+            except OSError as e:
+                self.disconnect()
+                if attempt:
+                    raise ConnectionError(f'Could not reach the tool server at {self.path}: {e}') from e
+
+        response = json.loads(line)
+        if response.get('id') != request_id:
+            self.disconnect()
+            raise ConnectionError(f'The tool server at {self.path} answered request {response.get("id")}.')
+        error = response.get('error')
+        if error is None:
+            return response.get('result')
+        if error['code'] == TOOL_ERROR:
+            raise RemoteToolError(error['message'], error.get('data', {}).get('type', 'Exception'))
+        raise ConnectionError(f'The tool server at {self.path} returned an error: {error["message"]}')
+
+    def execute(
+        self,
+        name: str,
+        arguments: dict,
+    ):
+        """Execute a tool call on the server, which returns a memoized result where possible.
+
+        Parameters
+        ----------
+        name : str
+            The name of the tool.
+        arguments : dict
+            The arguments of the tool call.
+
+        Returns
+        -------
+        Any
+            The result of the tool call, decoded from JSON.
+
+        """
+        return self.call('execute', {'name': name, 'arguments': arguments})
+
+    def is_alive(self) -> bool:
+        """Return whether a server answers on the socket."""
+        try:
+            self.call('ping')
+        except (ConnectionError, ValueError):
+            return False
+        finally:
+            self.disconnect()
+        return True
+
+    def get_stats(self) -> dict:
+        """Return the cache statistics of the server, over the tool calls of all of its clients."""
+        return self.call('get_stats')
+
+    def reset_stats(self) -> None:
+        """Reset the cache statistics of the server."""
+        self.call('reset_stats')
+
+    def clear(self) -> None:
+        """Clear the results cached by the server."""
+        self.call('clear')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve tool calls to runner processes over a Unix socket.')
+    parser.add_argument(
+        '--socket',
+        type=str,
+        default=str(DEFAULT_SOCKET_PATH),
+        help='Path of the Unix socket to listen on.',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Maximum number of tool calls executed at the same time.',
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=65536,
+        help='Maximum number of tool results to memoize.',
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level='INFO',
+        format='%(message)s',
+        datefmt='[%X]',
+        handlers=[RichHandler()],
+    )
+
+    warm_caches()
+    server = ToolServer(args.socket, executor=ToolExecutor(max_size=args.cache_size), max_workers=args.workers)
+    logging.info(f'🛠️  Serving tool calls on {server.path} with {args.workers} workers')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logging.info(f'🗃️  Tool cache: {server.executor.get_stats()}')
+        server.server_close()
@@ -0,0 +1,366 @@
+"""Work queues that let several evaluation workers (possibly on different hosts) share one dataset split.
+
+Workers claim batches of question ids with time-limited leases and keep them alive with heartbeats, so the
+questions of a worker that dies are handed to another worker once its leases expire. Each worker writes its
+results to its own shard, and `merge_shards` deduplicates the shards into the canonical run file in 'eval/runs/'.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+
+class SQLiteWorkQueue:
+    """Work queue backed by a SQLite file, e.g. on storage shared by all hosts."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        lease_seconds: float = 600.0,
+    ) -> None:
+        """Initialize the queue, creating the database if needed.
+
+        Parameters
+        ----------
+        path : str | Path
+            Path to the SQLite file.
+        lease_seconds : float
+            Seconds after which a claimed question that has not been heartbeated can be claimed by another worker.
+
+        """
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS tasks ('
+                'run TEXT NOT NULL, id TEXT NOT NULL, worker TEXT, lease_expires REAL, done INTEGER NOT NULL DEFAULT 0, '
+                'PRIMARY KEY (run, id))'
+            )
+
+    @contextlib.contextmanager
+    def connect(self):
+        """Open a new connection, closed on exit. Connections are not shared, so the queue is thread-safe."""
+        connection = sqlite3.connect(self.path, timeout=60.0, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def populate(
+        self,
+        run: str,
+        ids: list[str],
+    ) -> None:
+        """Add question ids to the queue of a run. Ids already present are left untouched."""
+        with self.connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany('INSERT OR IGNORE INTO tasks (run, id) VALUES (?, ?)', [(run, str(i)) for i in ids])
+            connection.execute('COMMIT')
+
+    def claim(
+        self,
+        run: str,
+        worker: str,
+        batch_size: int,
+    ) -> list[str]:
+        """Lease up to `batch_size` unfinished questions that are unclaimed or whose lease has expired.
+
+        Questions are handed out in the order they were added to the queue.
+        """
+        now = time.time()
+        with self.connect() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            ids = [
+                row[0]
+                for row in connection.execute(
+                    'SELECT id FROM tasks WHERE run = ? AND done = 0 AND (worker IS NULL OR lease_expires < ?) '
+                    'ORDER BY rowid LIMIT ?',
+                    (run, now, batch_size),
+                )
+            ]
+            connection.executemany(
+                'UPDATE tasks SET worker = ?, lease_expires = ? WHERE run = ? AND id = ?',
+                [(worker, now + self.lease_seconds, run, i) for i in ids],
+            )
+            connection.execute('COMMIT')
+        return ids
+
+    def heartbeat(
+        self,
+        run: str,
+        worker: str,
+    ) -> None:
+        """Extend the leases of all unfinished questions held by a worker."""
+        with self.connect() as connection:
+            connection.execute(
+                'UPDATE tasks SET lease_expires = ? WHERE run = ? AND worker = ? AND done = 0',
+                (time.time() + self.lease_seconds, run, worker),
+            )
+
+    def complete(
+        self,
+        run: str,
+        worker: str,
+        question_id: str,
+    ) -> None:
+        """Mark a question as finished."""
+        with self.connect() as connection:
+            connection.execute(
+                'UPDATE tasks SET done = 1, worker = ? WHERE run = ? AND id = ?',
+                (worker, run, str(question_id)),
+            )
+
+    def remaining(
+        self,
+        run: str,
+    ) -> int:
+        """Return the number of unfinished questions of a run, whether claimed or not."""
+        with self.connect() as connection:
+            return connection.execute('SELECT COUNT(*) FROM tasks WHERE run = ? AND done = 0', (run,)).fetchone()[0]
+
+
+class LeaseFileWorkQueue:
+    """Work queue backed by lease files in a directory, for when SQLite locking is unavailable.
+
+    Each question has a task file, a lease file while it is claimed (created with O_EXCL, so only one worker can
+    hold it, and touched on every heartbeat), and a done file once finished. An expired lease is taken over by
+    atomically renaming it away before a new lease is created.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        lease_seconds: float = 600.0,
+    ) -> None:
+        """Initialize the queue.
+
+        Parameters
+        ----------
+        directory : str | Path
+            Directory holding the queue. Created if it does not exist.
+        lease_seconds : float
+            Seconds after which a claimed question that has not been heartbeated can be claimed by another worker.
+
+        """
+        self.directory = Path(directory)
+        self.lease_seconds = lease_seconds
+        self.held = {}
+
+    @staticmethod
+    def key(question_id: str) -> str:
+        """Return a file-name-safe key for a question id."""
+        return hashlib.sha1(str(question_id).encode()).hexdigest()[:20]
+
+    def run_dir(
+        self,
+        run: str,
+        kind: str,
+    ) -> Path:
+        """Return (and create) the directory of a run holding 'tasks', 'leases' or 'done' files."""
+        path = self.directory / run / kind
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def populate(
+        self,
+        run: str,
+        ids: list[str],
+    ) -> None:
+        """Add question ids to the queue of a run. Ids already present are left untouched."""
+        tasks = self.run_dir(run, 'tasks')
+        for question_id in ids:
+            path = tasks / self.key(question_id)
+            if not path.exists():
+                path.write_text(str(question_id))
+
+    def try_lease(
+        self,
+        path: Path,
+        worker: str,
+    ) -> bool:
+        """Create a lease file exclusively, returning False if another worker holds it."""
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as f:
+            f.write(worker)
+        return True
+
+    def claim(
+        self,
+        run: str,
+        worker: str,
+        batch_size: int,
+    ) -> list[str]:
+        """Lease up to `batch_size` unfinished questions that are unclaimed or whose lease has expired."""
+        tasks, leases, done = (self.run_dir(run, kind) for kind in ('tasks', 'leases', 'done'))
+        claimed = []
+        for task in sorted(tasks.iterdir()):
+            if len(claimed) >= batch_size:
+                break
+            if (done / task.name).exists():
+                continue
+            lease = leases / task.name
+            if not self.try_lease(lease, worker):
+                try:
+                    expired = lease.stat().st_mtime + self.lease_seconds < time.time()
+                except FileNotFoundError:
+                    expired = True
+                if not expired:
+                    continue
+                # Only one worker can rename the expired lease away, the others get FileNotFoundError
+                stale = lease.with_name(f'{lease.name}.{uuid.uuid4().hex}.expired')
+                try:
+                    lease.rename(stale)
+                except FileNotFoundError:
+                    continue
+                if stale.stat().st_mtime + self.lease_seconds >= time.time():
+                    # Another worker took the lease over since we checked it, so hand it back
+                    with contextlib.suppress(FileExistsError):
+                        os.link(stale, lease)
+                    stale.unlink()
+                    continue
+                stale.unlink()
+                if not self.try_lease(lease, worker):
+                    continue
+            claimed.append(task.read_text())
+            self.held.setdefault(run, set()).add(task.name)
+        return claimed
+
+    def heartbeat(
+        self,
+        run: str,
+        worker: str,
+    ) -> None:
+        """Touch the lease files held by this worker to extend their leases."""
+        leases = self.run_dir(run, 'leases')
+        for key in list(self.held.get(run, set())):
+            lease = leases / key
+            try:
+                if lease.read_text() == worker:
+                    os.utime(lease)
+                else:
+                    self.held[run].discard(key)
+            except FileNotFoundError:
+                self.held[run].discard(key)
+
+    def complete(
+        self,
+        run: str,
+        worker: str,
+        question_id: str,
+    ) -> None:
+        """Mark a question as finished and release its lease."""
+        key = self.key(question_id)
+        (self.run_dir(run, 'done') / key).write_text(worker)
+        (self.run_dir(run, 'leases') / key).unlink(missing_ok=True)
+        self.held.get(run, set()).discard(key)
+
+    def remaining(
+        self,
+        run: str,
+    ) -> int:
+        """Return the number of unfinished questions of a run, whether claimed or not."""
+        tasks, done = self.run_dir(run, 'tasks'), self.run_dir(run, 'done')
+        return sum(1 for task in tasks.iterdir() if not (done / task.name).exists())
+
+
+def open_work_queue(
+    location: str | Path,
+    lease_seconds: float = 600.0,
+) -> SQLiteWorkQueue | LeaseFileWorkQueue:
+    """Open a work queue, using SQLite for '.sqlite'/'.db' files and lease files for directories.
+
+    Parameters
+    ----------
+    location : str | Path
+        Path to a SQLite file or to a directory.
+    lease_seconds : float
+        Seconds after which an un-heartbeated lease expires.
+
+    Returns
+    -------
+    SQLiteWorkQueue | LeaseFileWorkQueue
+        The work queue.
+
+    """
+    location = Path(location)
+    if location.suffix in {'.sqlite', '.sqlite3', '.db'}:
+        return SQLiteWorkQueue(location, lease_seconds=lease_seconds)
+    return LeaseFileWorkQueue(location, lease_seconds=lease_seconds)
+
+
+def get_shard_dir(output_path: Path) -> Path:
+    """Return the directory holding the per-worker shards of a run, e.g. 'eval/runs/shards/<run>/'."""
+    return output_path.parent / 'shards' / output_path.stem
+
+
+def merge_shards(output_path: Path) -> pd.DataFrame:
+    """Merge the per-worker shards of a run into its canonical results file.
+
+    Rows already in the canonical file take precedence, then shards in name order. Each question id is kept once.
+
+    Parameters
+    ----------
+    output_path : Path
+        Path of the canonical run file in 'eval/runs/'.
+
+    Returns
+    -------
+    pd.DataFrame
+        The merged results.
+
+    """
+    frames = []
+    if output_path.exists():
+        frames.append(pd.read_json(output_path, orient='records', lines=True, precise_float=True))
+    for shard in sorted(get_shard_dir(output_path).glob('*.jsonl')):
+        if shard.stat().st_size:
+            frames.append(pd.read_json(shard, orient='records', lines=True, precise_float=True))
+    if not frames:
+        return pd.DataFrame()
+
+    merged = pd.concat(frames, ignore_index=True)
+    merged = merged.drop_duplicates(subset='id' if 'id' in merged.columns else 'question', keep='first')
+
+    # Write to a temporary file first, so concurrent merges never leave a partial file behind
+    tmp_path = output_path.with_name(f'.{output_path.name}.{uuid.uuid4().hex}.tmp')
+    merged.to_json(tmp_path, orient='records', lines=True)
+    tmp_path.replace(output_path)
+    return merged
+
+
+def append_to_shard(
+    shard_path: Path,
+    result_row: dict,
+) -> None:
+    """Append one result row to a worker's shard."""
+    shard_path.parent.mkdir(parents=True, exist_ok=True)
+    line = pd.DataFrame([result_row]).to_json(orient='records', lines=True).strip()
+    with shard_path.open('a') as f:
+        f.write(line + '\n')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Merge the per-worker shards of distributed runs.')
+    parser.add_argument(
+        'runs',
+        type=str,
+        nargs='+',
+        help='Canonical run files to merge shards into, e.g. "eval/runs/Qwen3-30B-A3B_answerable-full_all-tools_0-shot.jsonl".',
+    )
+    args = parser.parse_args()
+
+    for run in args.runs:
+        merged = merge_shards(Path(run))
+        print(json.dumps({'run': run, 'rows': len(merged)}))
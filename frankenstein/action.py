@@ -2,6 +2,7 @@ import inspect
 import json
 
 from frankenstein.tools import arithmetic, data_retrieval, utils
+from frankenstein.validation import validate_arguments
 
 
 class FrankensteinAction:
@@ -83,7 +84,7 @@ class FrankensteinAction:
 
         try:
             tool = self.tool_map[self.action]
-            self.result = tool(**self.kwargs)
+            self.result = tool(**validate_arguments(self.action, tool, self.kwargs))
         except Exception:
             self.result = None
             if error_handling == 'raise':
@@ -0,0 +1,319 @@
+"""Materialized statistics and rankings of each region, per indicator and year, rebuilt incrementally."""
+
+import functools
+import hashlib
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from frankenstein.indicator_store import COUNTRIES_FILE, IndicatorStore, get_store
+
+AGGREGATES_FILE = Path('resources', 'cache', 'region_aggregates.npz')
+STATISTICS = ('count', 'sum', 'mean', 'min', 'max')
+
+
+def hash_columns(store: IndicatorStore) -> np.ndarray:
+    """Return a short hash of the values of every (indicator, year) column of the store, shaped [indicator, year]."""
+    hashes = np.empty((len(store.indicators), len(store.years)), dtype='U16')
+    for i in range(len(store.indicators)):
+        for y in range(len(store.years)):
+            hashes[i, y] = hashlib.sha1(np.ascontiguousarray(store.cube[i, :, y]).tobytes()).hexdigest()[:16]
+    return hashes
+
+
+class RegionAggregates:
+    """Count, sum, mean, min and max of the values of the countries of each region, and their descending ranking.
+
+    Values are aggregated as the tools would: each value is rounded to 5 decimal places (as by `retrieve_value`),
+    missing values are left out, the sum is added in the order of the region's countries and rounded (as by `add`),
+    and the mean is the sum divided by the count, rounded (as by `mean`). Ranks are 1 + the number of larger values
+    (as by `rank`).
+
+    Statistics are kept per (indicator, year) column together with a hash of the column's values. When the store
+    changes, only the columns whose hash changed are recomputed.
+    """
+
+    def __init__(
+        self,
+        members: dict[str, list[str]],
+        indicators: list[str],
+        years: list[str],
+        statistics: np.ndarray,
+        order: np.ndarray,
+        ranks: np.ndarray,
+        hashes: np.ndarray,
+    ) -> None:
+        """Initialize the aggregates.
+
+        Parameters
+        ----------
+        members : dict[str, list[str]]
+            The country codes of each region.
+        indicators : list[str]
+            Indicator codes.
+        years : list[str]
+            Years.
+        statistics : np.ndarray
+            Statistics of shape [region, indicator, year, statistic], in the order of `STATISTICS`.
+        order : np.ndarray
+            Shape [indicator, year, country], with the countries grouped by region: the positions (within the region)
+            of the region's countries by decreasing value, missing values last.
+        ranks : np.ndarray
+            Shape [indicator, year, country], grouped like `order`: the rank of each country, or 0 if missing.
+        hashes : np.ndarray
+            Hash of the values of each [indicator, year] column the statistics were computed from.
+
+        """
+        self.members = members
+        self.indicators = indicators
+        self.years = years
+        self.statistics = statistics
+        self.order = order
+        self.ranks = ranks
+        self.hashes = hashes
+        self.region_index = {region: i for i, region in enumerate(members)}
+        self.indicator_index = {code: i for i, code in enumerate(indicators)}
+        self.year_index = {year: i for i, year in enumerate(years)}
+        self.columns = {}
+        self.positions = {}
+        start = 0
+        for region, countries in members.items():
+            self.columns[region] = slice(start, start + len(countries))
+            self.positions[region] = {code: i for i, code in enumerate(countries)}
+            start += len(countries)
+
+    @classmethod
+    def build(
+        cls,
+        store: IndicatorStore,
+        members: dict[str, list[str]],
+        previous: 'RegionAggregates | None' = None,
+    ) -> 'RegionAggregates':
+        """Compute the aggregates of a store, reusing the columns of previous aggregates whose values are unchanged.
+
+        Parameters
+        ----------
+        store : IndicatorStore
+            The indicator store.
+        members : dict[str, list[str]]
+            The country codes of each region.
+        previous : RegionAggregates | None
+            Aggregates computed before, e.g. loaded from disk.
+
+        Returns
+        -------
+        RegionAggregates
+            The aggregates.
+
+        """
+        n_countries = sum(len(countries) for countries in members.values())
+        shape = (len(store.indicators), len(store.years))
+        statistics = np.full((len(members), *shape, len(STATISTICS)), np.nan)
+        order = np.zeros((*shape, n_countries), dtype=np.int16)
+        ranks = np.zeros((*shape, n_countries), dtype=np.int16)
+        hashes = hash_columns(store)
+
+        stale = np.ones(shape, dtype=bool)
+        if previous is not None and previous.members == members:
+            for i, code in enumerate(store.indicators):
+                j = previous.indicator_index.get(code)
+                if j is None:
+                    continue
+                for y, year in enumerate(store.years):
+                    k = previous.year_index.get(year)
+                    if k is not None and previous.hashes[j, k] == hashes[i, y]:
+                        statistics[:, i, y] = previous.statistics[:, j, k]
+                        order[i, y] = previous.order[j, k]
+                        ranks[i, y] = previous.ranks[j, k]
+                        stale[i, y] = False
+
+        aggregates = cls(members, store.indicators, store.years, statistics, order, ranks, hashes)
+        rows = np.flatnonzero(stale.any(axis=1))
+        if rows.size:
+            columns = np.flatnonzero(stale[rows].any(axis=0))
+            aggregates.compute(store, rows, columns)
+            logging.info(f'📊 Recomputed region aggregates of {rows.size} indicators x {columns.size} years')
+        return aggregates
+
+    def compute(
+        self,
+        store: IndicatorStore,
+        rows: np.ndarray,
+        columns: np.ndarray,
+    ) -> None:
+        """Compute the aggregates of the given indicators (rows) and years (columns) of the store."""
+        block = store.cube[np.ix_(rows, np.arange(len(store.countries)), columns)]
+        # Python's round, as used by `retrieve_value`, so aggregates match tool results exactly
+        block = np.array([round(v, 5) for v in block.ravel().tolist()]).reshape(block.shape)
+
+        for r, (region, countries) in enumerate(self.members.items()):
+            values = block[:, [store.country_index[code] for code in countries], :].transpose(0, 2, 1)
+            valid = ~np.isnan(values)
+            count = valid.sum(axis=2)
+            # Python's (compensated) sum in region order, as used by `add` and `mean`
+            sums = np.array(
+                [[sum(v for v in column if v == v) for column in indicator] for indicator in values.tolist()]
+            ).reshape(count.shape)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = np.where(count > 0, sums / count, np.nan)
+            statistics = np.stack(
+                [
+                    count,
+                    np.where(count > 0, [[round(s, 5) for s in row] for row in sums.tolist()], np.nan),
+                    [[round(m, 5) for m in row] for row in means.tolist()],
+                    np.fmin.reduce(values, axis=2),
+                    np.fmax.reduce(values, axis=2),
+                ],
+                axis=-1,
+            )
+            self.statistics[r][np.ix_(rows, columns)] = statistics
+
+            section = self.columns[region]
+            self.order[np.ix_(rows, columns, np.arange(section.start, section.stop))] = np.argsort(
+                -values, axis=2, kind='stable'
+            )
+            larger = (values[:, :, None, :] > values[:, :, :, None]).sum(axis=3)
+            self.ranks[np.ix_(rows, columns, np.arange(section.start, section.stop))] = np.where(valid, larger + 1, 0)
+
+    def get_statistic(
+        self,
+        region: str,
+        indicator_code: str,
+        year: str,
+        statistic: str,
+    ) -> float:
+        """Return a statistic of a region for an indicator and year: NaN if no country has data (0 for 'count').
+
+        Years and indicators without data in the store (e.g. None for an indicator whose code was not found) have no
+        data.
+        """
+        i = self.year_index.get(str(year))
+        if i is None or indicator_code not in self.indicator_index:
+            return 0 if statistic == 'count' else np.nan
+        value = self.statistics[
+            self.region_index[region], self.indicator_index[indicator_code], i, STATISTICS.index(statistic)
+        ]
+        return int(value) if statistic == 'count' else float(value)
+
+    def get_ranking(
+        self,
+        region: str,
+        indicator_code: str,
+        year: str,
+    ) -> list[str]:
+        """Return the country codes of a region with data for an indicator and year, by decreasing value."""
+        i = self.year_index.get(str(year))
+        if i is None or indicator_code not in self.indicator_index:
+            return []
+        section = self.columns[region]
+        order = self.order[self.indicator_index[indicator_code], i, section]
+        count = self.get_statistic(region, indicator_code, year, 'count')
+        return [self.members[region][p] for p in order[:count]]
+
+    def get_rank(
+        self,
+        region: str,
+        indicator_code: str,
+        year: str,
+        country_code: str,
+    ) -> int | None:
+        """Return the rank of a country among the countries of a region, or None if it has no data."""
+        i = self.year_index.get(str(year))
+        if i is None or indicator_code not in self.indicator_index:
+            return None
+        rank = self.ranks[
+            self.indicator_index[indicator_code], i, self.columns[region].start + self.positions[region][country_code]
+        ]
+        return int(rank) or None
+
+    def save(
+        self,
+        path: Path = AGGREGATES_FILE,
+    ) -> None:
+        """Persist the aggregates."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open('wb') as f:
+            np.savez(
+                f,
+                regions=np.array(list(self.members)),
+                region_sizes=np.array([len(countries) for countries in self.members.values()]),
+                countries=np.array([code for countries in self.members.values() for code in countries]),
+                indicators=np.array(self.indicators),
+                years=np.array(self.years),
+                statistics=self.statistics,
+                order=self.order,
+                ranks=self.ranks,
+                hashes=self.hashes,
+            )
+
+    @classmethod
+    def load(
+        cls,
+        path: Path = AGGREGATES_FILE,
+    ) -> 'RegionAggregates | None':
+        """Load persisted aggregates, or return None if there are none or they cannot be read."""
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                countries = data['countries'].tolist()
+                members = {}
+                start = 0
+                for region, size in zip(data['regions'].tolist(), data['region_sizes'].tolist()):
+                    members[region] = countries[start : start + size]
+                    start += size
+                return cls(
+                    members,
+                    data['indicators'].tolist(),
+                    data['years'].tolist(),
+                    data['statistics'],
+                    data['order'],
+                    data['ranks'],
+                    data['hashes'],
+                )
+        except (OSError, KeyError, ValueError) as e:
+            logging.warning(f'⚠️  Ignoring unreadable region aggregates {path}: {e}')
+            return None
+
+
+def get_region_members(countries_path: Path = COUNTRIES_FILE) -> dict[str, list[str]]:
+    """Return the country codes of each region, in the order of the countries file."""
+    countries = pd.read_csv(countries_path).dropna(subset=['region'])
+    members = {}
+    for code, region in zip(countries['country_code'], countries['region']):
+        members.setdefault(region, [])
+        if code not in members[region]:
+            members[region].append(code)
+    return members
+
+
+def get_aggregates() -> RegionAggregates:
+    """Return the region aggregates of the current version of the indicator store."""
+    return build_aggregates(get_store().version)
+
+
+@functools.lru_cache(maxsize=1)
+def build_aggregates(version: str) -> RegionAggregates:
+    """Return the region aggregates of a version of the indicator store, updating and persisting them if it changed.
+
+    Parameters
+    ----------
+    version : str
+        The version of the store, so the aggregates are rebuilt (incrementally, from the persisted ones) after the
+        store is updated.
+
+    Returns
+    -------
+    RegionAggregates
+        The aggregates.
+
+    """
+    store = get_store()
+    previous = RegionAggregates.load()
+    aggregates = RegionAggregates.build(store, get_region_members(), previous)
+    changed = previous is None or previous.members != aggregates.members
+    if changed or not np.array_equal(previous.hashes, aggregates.hashes):
+        aggregates.save()
+    return aggregates
@@ -1,20 +1,30 @@
 """Exceptions used for Frankenstein actions with messages to guide the model in correcting errors."""
 
 
+def format_suggestions(suggestions: list[str] | None) -> str:
+    """Return a sentence listing the valid names nearest to an invalid one, or an empty string if there are none."""
+    if not suggestions:
+        return ''
+    return f" The nearest valid names are: {', '.join(repr(s) for s in suggestions)}."
+
+
 class InvalidIndicatorNameError(Exception):
     """Exception raised when an invalid indicator name is used."""
 
-    def __init__(self, indicator_name: str):
+    def __init__(self, indicator_name: str, suggestions: list[str] | None = None):
         """Initialize the exception with a message.
 
         Parameters
         ----------
         indicator_name : str
             The invalid indicator name that caused the error.
+        suggestions : list[str] | None
+            The valid names nearest to the invalid one, best first.
 
         """
         super().__init__(
             f"Error: indicator name '{indicator_name}' is not valid. Ensure you have used the correct indicator name from the question."
+            + format_suggestions(suggestions)
         )
 
 
@@ -38,34 +48,40 @@ class InvalidIndicatorCodeError(Exception):
 class InvalidCountryNameError(Exception):
     """Exception raised when an invalid country name is used."""
 
-    def __init__(self, country_name: str):
+    def __init__(self, country_name: str, suggestions: list[str] | None = None):
         """Initialize the exception with a message.
 
         Parameters
         ----------
         country_name : str
             The invalid country name that caused the error.
+        suggestions : list[str] | None
+            The valid names nearest to the invalid one, best first.
 
         """
         super().__init__(
             f"Error: country name '{country_name}' is not valid. Double-check the country name in the question and ensure it is spelled correctly."
+            + format_suggestions(suggestions)
         )
 
 
 class InvalidRegionNameError(Exception):
     """Exception raised when an invalid region name is used."""
 
-    def __init__(self, region: str):
+    def __init__(self, region: str, suggestions: list[str] | None = None):
         """Initialize the exception with a message.
 
         Parameters
         ----------
         region : str
             The invalid region name that caused the error.
+        suggestions : list[str] | None
+            The valid names nearest to the invalid one, best first.
 
         """
         super().__init__(
             f"Error: region name '{region}' is not valid. Ensure you have used the correct region name from the question."
+            + format_suggestions(suggestions)
         )
 
 
@@ -86,6 +102,27 @@ class InvalidCountryCodeError(Exception):
         )
 
 
+class InvalidYearError(Exception):
+    """Exception raised when a year is not a valid year, or is outside the years of the data."""
+
+    def __init__(self, year, first_year: str, last_year: str):
+        """Initialize the exception with a message.
+
+        Parameters
+        ----------
+        year : Any
+            The invalid year that caused the error.
+        first_year : str
+            The first year of the data.
+        last_year : str
+            The last year of the data.
+
+        """
+        super().__init__(
+            f"Error: year '{year}' is not valid. Use a four-digit year between '{first_year}' and '{last_year}', the years for which data is available."
+        )
+
+
 class NoDataAvailableError(Exception):
     """Exception raised when no data is available for a given indicator and country."""
 
@@ -101,3 +138,39 @@ class NoDataAvailableError(Exception):
         super().__init__(
             f"Warning: your function call was correct, but no data is available for country code '{arguments['country_code']}' for indicator code '{arguments['indicator_code']}' in year '{arguments['year']}'."
         )
+
+
+class InvalidToolArgumentError(Exception):
+    """Exception raised when the arguments of a tool call do not match the tool's signature."""
+
+    def __init__(self, tool_name: str, problem: str):
+        """Initialize the exception with a message.
+
+        Parameters
+        ----------
+        tool_name : str
+            The name of the tool that was called.
+        problem : str
+            What is wrong with the arguments.
+
+        """
+        super().__init__(
+            f"Error: invalid arguments for '{tool_name}': {problem}. Check the tool's parameters and call it again."
+        )
+
+
+class NoRegionDataAvailableError(Exception):
+    """Exception raised when no country of a region has data for a given indicator and year."""
+
+    def __init__(self, arguments: dict):
+        """Initialize the exception with a message.
+
+        Parameters
+        ----------
+        arguments : dict
+            The arguments used in the function call that caused the error.
+
+        """
+        super().__init__(
+            f"Warning: your function call was correct, but no country in region '{arguments['region']}' has data for indicator code '{arguments['indicator_code']}' in year '{arguments['year']}'."
+        )
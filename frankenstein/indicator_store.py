@@ -0,0 +1,464 @@
+"""In-memory store of the indicator data under 'resources/wdi/', as one dense cube of values."""
+
+import contextlib
+import functools
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from frankenstein.exceptions import InvalidYearError
+
+WDI_IND_DIR = Path('resources', 'wdi')
+COUNTRIES_FILE = Path('resources', 'un_m49_cleaned.csv')
+
+# Name of the shared memory segment holding the store, set by `share_store` for the processes it starts
+SHARED_STORE_VARIABLE = 'FRANKENSTEIN_SHARED_STORE'
+HEADER_SIZE = 8  # Bytes holding the length of the JSON metadata at the start of a shared segment
+CUBE_ALIGNMENT = 64
+
+
+class IndicatorStore:
+    """Dense float64 cube of indicator values indexed by [indicator, country, year], with NaN for missing values.
+
+    Years are the last axis, so the values of one country and indicator over consecutive years are a contiguous
+    slice. Countries are those of UN M49, so a code is valid exactly when it has a row in the cube.
+
+    Each indicator has a version hashing its values, and the store's version hashes those of all indicators. Values
+    can be updated in place (e.g. when a new year of data is published) with `update` or `refresh`, which bump the
+    versions of the changed indicators only, so caches keyed on them are invalidated precisely.
+    """
+
+    def __init__(
+        self,
+        cube: np.ndarray,
+        indicators: list[str],
+        countries: list[str],
+        years: list[str],
+        indicator_versions: dict[str, str] | None = None,
+        file_digests: dict[str, str] | None = None,
+    ) -> None:
+        """Initialize the store.
+
+        Parameters
+        ----------
+        cube : np.ndarray
+            Values of shape (len(indicators), len(countries), len(years)).
+        indicators : list[str]
+            Indicator codes, in cube order.
+        countries : list[str]
+            Country codes, in cube order.
+        years : list[str]
+            Years, in increasing order.
+        indicator_versions : dict[str, str] | None
+            Version of each indicator, as computed by `hash_values`. Computed from the cube if not given.
+        file_digests : dict[str, str] | None
+            Hash of the file each indicator was loaded from, used by `refresh` to find the files that changed.
+
+        """
+        self.cube = cube
+        self.indicators = indicators
+        self.countries = countries
+        self.years = years
+        self.indicator_index = {code: i for i, code in enumerate(indicators)}
+        self.country_index = {code: i for i, code in enumerate(countries)}
+        self.year_index = {year: i for i, year in enumerate(years)}
+        self.indicator_versions = indicator_versions or {code: self.hash_values(code) for code in indicators}
+        self.file_digests = file_digests or {}
+        self.version = self.get_version()
+        self.segment = None  # Shared memory segment the cube is a view of, when attached
+
+    @classmethod
+    def load(
+        cls,
+        directory: Path = WDI_IND_DIR,
+        countries_path: Path = COUNTRIES_FILE,
+    ) -> 'IndicatorStore':
+        """Build the store from one CSV file per indicator, with a row per country and a column per year.
+
+        Parameters
+        ----------
+        directory : Path
+            Directory of the indicator files, named '<indicator code>.csv'.
+        countries_path : Path
+            File listing the valid country codes.
+
+        Returns
+        -------
+        IndicatorStore
+            The store.
+
+        """
+        countries = list(dict.fromkeys(pd.read_csv(countries_path)['country_code']))
+        frames, file_digests = read_indicator_files(sorted(directory.glob('*.csv')))
+
+        years = sorted({year for frame in frames.values() for year in frame.columns}, key=int)
+        cube = np.full((len(frames), len(countries), len(years)), np.nan)
+        for i, frame in enumerate(frames.values()):
+            frame = frame.reindex(index=countries, columns=years)
+            cube[i] = frame.to_numpy(dtype=np.float64, na_value=np.nan)
+        return cls(cube, list(frames), countries, years, file_digests=file_digests)
+
+    def hash_values(
+        self,
+        indicator_code: str,
+    ) -> str:
+        """Return a short hash of the values of an indicator and the years they are for.
+
+        Years without any value are left out, so appending a year leaves the hash of indicators without data for it
+        unchanged.
+        """
+        values = self.cube[self.indicator_index[indicator_code]]
+        columns = np.flatnonzero(~np.isnan(values).all(axis=0))
+        digest = hashlib.sha256(','.join(self.years[c] for c in columns).encode())
+        digest.update(np.ascontiguousarray(values[:, columns]).tobytes())
+        return digest.hexdigest()[:12]
+
+    def get_version(self) -> str:
+        """Return a short hash of the years and the versions of all indicators."""
+        digest = hashlib.sha256(','.join(self.years).encode())
+        for code in self.indicators:
+            digest.update(f'{code}:{self.indicator_versions[code]};'.encode())
+        return digest.hexdigest()[:12]
+
+    def update(
+        self,
+        frames: dict[str, pd.DataFrame],
+    ) -> dict[str, list[str]]:
+        """Update values in place from tables laid out like the indicator files, appending any new years.
+
+        Only the cells the tables hold are written: rows of countries in the store, for the years in the columns.
+        Missing values in these cells clear the stored value. The versions of the indicators whose values changed are
+        bumped, so caches of other indicators stay valid. A store attached to shared memory is read-only: update the
+        publishing process's store and publish it again instead.
+
+        Parameters
+        ----------
+        frames : dict[str, pd.DataFrame]
+            Tables of values by indicator code, indexed by country code with a column per year.
+
+        Returns
+        -------
+        dict[str, list[str]]
+            The years whose values changed, by indicator code.
+
+        """
+        if self.segment is not None:
+            raise ValueError('This store is attached read-only to shared memory. Update the published store instead.')
+        unknown = sorted(set(frames) - set(self.indicator_index))
+        if unknown:
+            raise ValueError(f'Unknown indicator codes {unknown}. Reload the store to add indicators.')
+
+        frames = {code: frame.rename(columns=str) for code, frame in frames.items()}
+        new_years = {year for frame in frames.values() for year in frame.columns} - set(self.years)
+        if new_years:
+            self.append_years(sorted(new_years, key=int))
+
+        changed = {}
+        for code, frame in frames.items():
+            frame = frame[frame.index.isin(self.country_index)]
+            cells = np.ix_([self.country_index[c] for c in frame.index], [self.year_index[y] for y in frame.columns])
+            matrix = self.cube[self.indicator_index[code]]
+            values = frame.to_numpy(dtype=np.float64, na_value=np.nan)
+            current = matrix[cells]
+            differs = ~((current == values) | (np.isnan(current) & np.isnan(values)))
+            if differs.any():
+                matrix[cells] = values
+                changed[code] = [frame.columns[j] for j in np.flatnonzero(differs.any(axis=0))]
+
+        for code in changed:
+            self.indicator_versions[code] = self.hash_values(code)
+        self.version = self.get_version()
+        if changed or new_years:
+            logging.info(f'🔄 Updated the values of {len(changed)} indicators, adding {len(new_years)} years')
+        return changed
+
+    def append_years(
+        self,
+        years: list[str],
+    ) -> None:
+        """Add empty slices for new years to the year axis, keeping the years in increasing order."""
+        self.years = sorted(set(self.years) | set(years), key=int)
+        positions = [i for i, year in enumerate(self.years) if year not in years]
+        cube = np.full((*self.cube.shape[:2], len(self.years)), np.nan)
+        cube[:, :, positions] = self.cube
+        self.cube = cube
+        self.year_index = {year: i for i, year in enumerate(self.years)}
+
+    def refresh(
+        self,
+        directory: Path = WDI_IND_DIR,
+    ) -> dict[str, list[str]]:
+        """Update the store from the indicator files that changed since they were read, without reading the others.
+
+        The indicators of the store are fixed, so files of new indicators are not read and indicators whose file was
+        deleted keep their values. Both are logged as warnings: reload the store with `load` to pick them up.
+
+        Parameters
+        ----------
+        directory : Path
+            Directory of the indicator files.
+
+        Returns
+        -------
+        dict[str, list[str]]
+            The years whose values changed, by indicator code.
+
+        """
+        paths = sorted(directory.glob('*.csv'))
+        added = [path.stem for path in paths if path.stem not in self.indicator_index]
+        if added:
+            logging.warning(f'⚠️  Skipped {len(added)} new indicator files, reload the store to add them: {added}')
+        deleted = sorted(set(self.indicators) - {path.stem for path in paths})
+        if deleted:
+            logging.warning(f'⚠️  Kept the values of {len(deleted)} indicators whose files were deleted: {deleted}')
+        paths = [path for path in paths if path.stem in self.indicator_index]
+        digests = {path: hashlib.sha256(path.read_bytes()).hexdigest()[:12] for path in paths}
+        stale = [path for path in paths if digests[path] != self.file_digests.get(path.stem)]
+        frames, file_digests = read_indicator_files(stale)
+        changed = self.update(frames)
+        self.file_digests.update(file_digests)
+        return changed
+
+    def publish(self) -> shared_memory.SharedMemory:
+        """Copy the store into a new shared memory segment, for other processes to `attach` to without copying it.
+
+        The segment starts with the length of a JSON header holding the index maps and the cube's shape, followed by
+        the header and, at the next 64-byte boundary, the cube. The caller owns the segment and must close and unlink
+        it.
+
+        Returns
+        -------
+        shared_memory.SharedMemory
+            The segment, whose `name` identifies it to other processes.
+
+        """
+        header = json.dumps(
+            {
+                'indicators': self.indicators,
+                'countries': self.countries,
+                'years': self.years,
+                'indicator_versions': self.indicator_versions,
+                'shape': self.cube.shape,
+            }
+        ).encode()
+        offset = get_cube_offset(len(header))
+
+        segment = shared_memory.SharedMemory(create=True, size=offset + self.cube.nbytes)
+        segment.buf[:HEADER_SIZE] = len(header).to_bytes(HEADER_SIZE, 'little')
+        segment.buf[HEADER_SIZE : HEADER_SIZE + len(header)] = header
+        cube = np.ndarray(self.cube.shape, dtype=np.float64, buffer=segment.buf, offset=offset)
+        cube[:] = self.cube
+        del cube  # Release the view, so the segment can be closed
+        return segment
+
+    @classmethod
+    def attach(
+        cls,
+        name: str,
+    ) -> 'IndicatorStore':
+        """Return a read-only store whose cube is a view of a segment made by `publish`, without copying or parsing.
+
+        Parameters
+        ----------
+        name : str
+            The name of the segment.
+
+        Returns
+        -------
+        IndicatorStore
+            The store. It keeps the segment mapped for as long as it is used.
+
+        """
+        segment = attach_segment(name)
+        size = int.from_bytes(segment.buf[:HEADER_SIZE], 'little')
+        metadata = json.loads(bytes(segment.buf[HEADER_SIZE : HEADER_SIZE + size]))
+        cube = np.ndarray(tuple(metadata['shape']), dtype=np.float64, buffer=segment.buf, offset=get_cube_offset(size))
+        cube.flags.writeable = False
+        store = cls(
+            cube, metadata['indicators'], metadata['countries'], metadata['years'], metadata['indicator_versions']
+        )
+        store.segment = segment
+        return store
+
+    def get_value(
+        self,
+        country_code: str,
+        indicator_code: str,
+        year: str,
+    ) -> float:
+        """Return one value, or NaN if it is missing or the year is not in the store."""
+        i = self.year_index.get(str(year))
+        if i is None:
+            return np.nan
+        return self.cube[self.indicator_index[indicator_code], self.country_index[country_code], i]
+
+    def get_year_range(
+        self,
+        start_year: str,
+        end_year: str,
+    ) -> tuple[list[str], slice]:
+        """Return the years from start_year to end_year (inclusive) and the slice of the year axis holding them.
+
+        Years of the range outside the store are included, but not covered by the slice: they have no data. Years
+        may be given in any form `normalize_year` accepts (e.g. 2019, '2019' or '2019.0').
+        """
+        start, end = normalize_year(start_year), normalize_year(end_year)
+        if start is None or end is None:
+            raise ValueError(f'Invalid year range {start_year!r} to {end_year!r}.')
+        start, end = int(start), int(end)
+        if start > end:
+            raise ValueError(f'start_year {start_year} is after end_year {end_year}.')
+        stored = [i for i, year in enumerate(self.years) if start <= int(year) <= end]
+        columns = slice(stored[0], stored[-1] + 1) if stored else slice(0, 0)
+        return [str(year) for year in range(start, end + 1)], columns
+
+    def check_year(
+        self,
+        year,
+    ) -> str:
+        """Return a year as stored (e.g. '2019' for 2019 or '2019.0').
+
+        Raises
+        ------
+        InvalidYearError
+            If the year is not a whole number, or is outside the years of the store.
+
+        """
+        normalized = normalize_year(year)
+        if normalized is None or not int(self.years[0]) <= int(normalized) <= int(self.years[-1]):
+            raise InvalidYearError(year, self.years[0], self.years[-1])
+        return normalized
+
+    def get_series(
+        self,
+        country_code: str,
+        indicator_code: str,
+        start_year: str,
+        end_year: str,
+    ) -> dict[str, float]:
+        """Return the values of one country and indicator for each year of a range, NaN where missing."""
+        return self.get_matrix([country_code], indicator_code, start_year, end_year)[country_code]
+
+    def get_matrix(
+        self,
+        country_codes: list[str],
+        indicator_code: str,
+        start_year: str,
+        end_year: str,
+    ) -> dict[str, dict[str, float]]:
+        """Return the values of several countries for one indicator and each year of a range, NaN where missing.
+
+        Parameters
+        ----------
+        country_codes : list[str]
+            Country codes, all in the store.
+        indicator_code : str
+            Indicator code, in the store.
+        start_year : str
+            First year of the range.
+        end_year : str
+            Last year of the range.
+
+        Returns
+        -------
+        dict[str, dict[str, float]]
+            The value of each year, by country.
+
+        """
+        years, columns = self.get_year_range(start_year, end_year)
+        rows = [self.country_index[code] for code in country_codes]
+        block = self.cube[self.indicator_index[indicator_code], rows, columns]
+        stored = dict(zip(self.years[columns], range(block.shape[1])))
+        return {
+            code: {year: block[r, stored[year]] if year in stored else np.nan for year in years}
+            for r, code in enumerate(country_codes)
+        }
+
+
+def read_indicator_files(paths: list[Path]) -> tuple[dict[str, pd.DataFrame], dict[str, str]]:
+    """Read indicator files, returning the table of each indicator (with years as strings) and a hash of each file."""
+    frames, digests = {}, {}
+    for path in paths:
+        data = path.read_bytes()
+        digests[path.stem] = hashlib.sha256(data).hexdigest()[:12]
+        frames[path.stem] = pd.read_csv(io.BytesIO(data), index_col='country_code').rename(columns=str)
+    return frames, digests
+
+
+def normalize_year(year) -> str | None:
+    """Return a year as a string of its digits (e.g. '2019' for 2019, '2019' or '2019.0'), or None if it is not one."""
+    try:
+        value = float(str(year).strip())
+    except ValueError:
+        return None
+    if not value.is_integer():
+        return None
+    return str(int(value))
+
+
+def get_cube_offset(header_size: int) -> int:
+    """Return the offset of the cube in a shared segment: the first aligned byte after the header."""
+    return -(-(HEADER_SIZE + header_size) // CUBE_ALIGNMENT) * CUBE_ALIGNMENT
+
+
+def attach_segment(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing shared memory segment, leaving its cleanup to the process that created it."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    segment = shared_memory.SharedMemory(name=name)
+    if multiprocessing.parent_process() is None:
+        # Attaching registers the segment with this process's own resource tracker, which would unlink it on exit.
+        # Child processes share their parent's tracker, where the segment is already registered.
+        resource_tracker.unregister(segment._name, 'shared_memory')
+    return segment
+
+
+@contextlib.contextmanager
+def share_store(store: IndicatorStore | None = None):
+    """Publish a store in shared memory for the processes started inside the context, which attach to it read-only.
+
+    Processes started inside the context (e.g. the workers of a process pool) inherit the segment's name through the
+    `FRANKENSTEIN_SHARED_STORE` environment variable, and `get_store` attaches to it instead of loading the CSV
+    files, so the cube is held in memory once however many workers there are. The segment is unlinked on exit.
+
+    Parameters
+    ----------
+    store : IndicatorStore | None
+        The store to publish, by default that of `get_store`.
+
+    Yields
+    ------
+    str
+        The name of the segment.
+
+    """
+    segment = (store or get_store()).publish()
+    previous = os.environ.get(SHARED_STORE_VARIABLE)
+    os.environ[SHARED_STORE_VARIABLE] = segment.name
+    try:
+        yield segment.name
+    finally:
+        if previous is None:
+            os.environ.pop(SHARED_STORE_VARIABLE, None)
+        else:
+            os.environ[SHARED_STORE_VARIABLE] = previous
+        segment.close()
+        segment.unlink()
+
+
+@functools.cache
+def get_store() -> IndicatorStore:
+    """Return the indicator store: the shared one if a parent process published it, else loaded on first use."""
+    name = os.environ.get(SHARED_STORE_VARIABLE)
+    if name:
+        return IndicatorStore.attach(name)
+    return IndicatorStore.load()
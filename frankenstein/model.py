@@ -1,12 +1,14 @@
 """Library of tools to be provided to the model and provide the basis for solutions.
 
-Currently unused in favour of existing/simpler approach in tools.py, but kept for future reference.
+The tool classes are currently unused in favour of existing/simpler approach in tools.py, but kept for future
+reference. `Plan` is the schema of the plans executed in plan-then-execute evaluation.
 """
 
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from frankenstein.exceptions import (
     InvalidCountryCodeError,
@@ -187,6 +189,23 @@ class FinalAnswer(BaseModel):
         return self.answer
 
 
+class PlanStep(BaseModel):
+    """One tool call of a plan. An argument value "$<id>" is replaced by the output of the earlier step <id>."""
+
+    id: str = Field(description='Unique id of the step, e.g. "s1".')
+    tool: str = Field(description='Name of the tool to call.')
+    arguments: dict[str, Any] = Field(
+        default={},
+        description='Arguments of the tool call. Use "$<id>" as a value (or list element) for the output of step <id>.',
+    )
+
+
+class Plan(BaseModel):
+    """A plan of tool calls, forming a DAG through references to the outputs of earlier steps."""
+
+    steps: list[PlanStep] = Field(description='Steps of the plan. A step may only use outputs of earlier steps.')
+
+
 class ToolCalls(BaseModel):
     tool_calls: list[
         Think | Add
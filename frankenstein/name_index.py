@@ -0,0 +1,147 @@
+"""Indexes of country, region and indicator names, for exact lookups and suggestions of the nearest valid names."""
+
+import functools
+import json
+import re
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+
+import pandas as pd
+
+NGRAM_SIZE = 3
+N_SUGGESTIONS = 5
+
+
+def normalize(text: str) -> str:
+    """Normalize a name for fuzzy matching: strip accents, case-fold, and keep only letters, digits and '%'."""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode()
+    return ' '.join(re.sub(r'[^0-9a-z%]+', ' ', text.casefold()).split())
+
+
+def get_ngrams(text: str) -> set[str]:
+    """Return the character n-grams of a normalized name, padded so that word starts and ends count."""
+    padded = f'{" " * (NGRAM_SIZE - 1)}{text} '
+    return {padded[i : i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+class NameIndex:
+    """Exact lookup of names, and ranking of the valid names nearest to an invalid one.
+
+    Exact lookups are dictionary lookups. Suggestions are ranked by the Dice similarity of the character trigrams of
+    the normalized query and of each valid name or alias (e.g. 'Vietnam' for 'Viet Nam'), using an inverted index
+    from trigrams to names, so only names sharing a trigram with the query are scored.
+    """
+
+    def __init__(
+        self,
+        values: dict[str, str],
+        aliases: dict[str, str] | None = None,
+    ) -> None:
+        """Build the index.
+
+        Parameters
+        ----------
+        values : dict[str, str]
+            The value (e.g. a code) of each valid name.
+        aliases : dict[str, str] | None
+            Other names (e.g. official names or paraphrases), each mapped to the valid name it stands for. Aliases
+            are only used for suggestions.
+
+        """
+        self.values = values
+        self.names = []  # Valid name of each indexed entry
+        self.sizes = []  # Number of n-grams of each indexed entry
+        self.postings = defaultdict(list)
+
+        entries = {normalize(name): name for name in values}
+        for alias, name in (aliases or {}).items():
+            entries.setdefault(normalize(alias), name)
+        for text, name in entries.items():
+            ngrams = get_ngrams(text)
+            for ngram in ngrams:
+                self.postings[ngram].append(len(self.names))
+            self.names.append(name)
+            self.sizes.append(len(ngrams))
+
+    def get(
+        self,
+        name: str,
+    ) -> str | None:
+        """Return the value of a valid name, or None if the name is not valid."""
+        return self.values.get(name)
+
+    def suggest(
+        self,
+        name: str,
+        k: int = N_SUGGESTIONS,
+    ) -> list[str]:
+        """Return the valid names nearest to a name, best first.
+
+        Parameters
+        ----------
+        name : str
+            The (invalid) name.
+        k : int
+            The maximum number of names to return.
+
+        Returns
+        -------
+        list[str]
+            Up to k valid names sharing at least one trigram with the name.
+
+        """
+        ngrams = get_ngrams(normalize(name))
+        shared = defaultdict(int)
+        for ngram in ngrams:
+            for entry in self.postings.get(ngram, ()):
+                shared[entry] += 1
+
+        scores = {}
+        for entry, count in shared.items():
+            score = 2 * count / (len(ngrams) + self.sizes[entry])
+            if score > scores.get(self.names[entry], 0):
+                scores[self.names[entry]] = score
+        return sorted(scores, key=lambda n: -scores[n])[:k]
+
+
+@functools.cache
+def get_country_index() -> NameIndex:
+    """Return the index of country names (from UN M49) to country codes, with ISO 3166 names and codes as aliases."""
+    countries = pd.read_csv(Path('resources', 'un_m49_cleaned.csv'))
+    values = {}
+    for name, code in zip(countries['country_name'], countries['country_code']):
+        values.setdefault(name, code)
+    names = {code: name for name, code in values.items()}
+
+    iso = pd.read_csv(Path('resources', 'iso_3166.csv'))
+    aliases = {alias: names[code] for alias, code in zip(iso['country_name'], iso['country_code']) if code in names}
+    aliases.update({code: name for code, name in names.items()})
+    return NameIndex(values, aliases)
+
+
+@functools.cache
+def get_region_index() -> NameIndex:
+    """Return the index of region names."""
+    regions = pd.read_csv(Path('resources', 'un_m49_cleaned.csv'))['region'].dropna().unique()
+    return NameIndex({region: region for region in regions})
+
+
+@functools.cache
+def get_indicator_index() -> NameIndex:
+    """Return the index of indicator names to indicator codes, with their paraphrases as aliases."""
+    indicators = pd.read_csv(Path('resources', 'wdi.csv'))
+    values = {}
+    for name, code in zip(indicators['name'], indicators['id']):
+        values.setdefault(name, code)
+    names = {code: name for name, code in values.items()}
+
+    with Path('resources', 'indicator_paraphrases.json').open() as f:
+        paraphrases = json.load(f)
+    aliases = {
+        paraphrase: names[indicator['id']]
+        for indicator in paraphrases
+        if indicator['id'] in names
+        for paraphrase in indicator.get('paraphrase', [])
+    }
+    return NameIndex(values, aliases)
@@ -0,0 +1,167 @@
+"""BM25 index of indicator names, paraphrases and descriptions, for ranked indicator search."""
+
+import functools
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+
+STOPWORDS = frozenset({'a', 'an', 'and', 'as', 'at', 'by', 'for', 'from', 'in', 'of', 'on', 'or', 'the', 'to', 'with'})
+
+# Times each token of a field is counted in a document, so name matches outrank description matches
+FIELD_WEIGHTS = {'name': 3, 'paraphrase': 2, 'description': 1}
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lower-case word tokens, dropping stopwords."""
+    return [token for token in re.findall(r'[a-z0-9%$]+', str(text).lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 ranking over documents made of weighted fields.
+
+    Term frequencies, document lengths and inverse document frequencies are computed once when the index is built,
+    so a search only walks the postings of its query terms.
+    """
+
+    def __init__(
+        self,
+        documents: list[dict[str, list[str]]],
+        field_weights: dict[str, int] = FIELD_WEIGHTS,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        """Build the index.
+
+        Parameters
+        ----------
+        documents : list[dict[str, list[str]]]
+            The texts of each field of each document, e.g. {'name': ['GDP (current US$)'], 'paraphrase': [...]}.
+        field_weights : dict[str, int]
+            Number of times the tokens of each field are counted.
+        k1 : float
+            BM25 term frequency saturation.
+        b : float
+            BM25 document length normalization.
+
+        """
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # Term -> [(document, term frequency)]
+        self.lengths = []
+
+        for i, document in enumerate(documents):
+            frequencies = Counter()
+            for field, texts in document.items():
+                for text in texts:
+                    for token in tokenize(text):
+                        frequencies[token] += field_weights.get(field, 1)
+            for term, frequency in frequencies.items():
+                self.postings[term].append((i, frequency))
+            self.lengths.append(sum(frequencies.values()))
+
+        n = len(documents)
+        self.average_length = sum(self.lengths) / n if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(
+        self,
+        query: str,
+        top_k: int | None = None,
+    ) -> list[tuple[int, float]]:
+        """Rank the documents matching a query.
+
+        Parameters
+        ----------
+        query : str
+            The query text.
+        top_k : int | None
+            The maximum number of documents to return, or None for all matching documents.
+
+        Returns
+        -------
+        list[tuple[int, float]]
+            The index and score of each document sharing at least one term with the query, best first. Ties keep
+            document order.
+
+        """
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for document, frequency in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[document] / self.average_length)
+                scores[document] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if top_k is None else ranked[:top_k]
+
+
+class IndicatorSearch:
+    """Search of the indicators by keywords: an exact name match first, then BM25 relevance."""
+
+    def __init__(
+        self,
+        indicators: list[dict],
+    ) -> None:
+        """Build the search index.
+
+        Parameters
+        ----------
+        indicators : list[dict]
+            The indicators, each with a 'name', 'description' and list of 'paraphrase'.
+
+        """
+        self.results = [
+            {'indicator_name': indicator['name'], 'indicator_description': indicator['description']}
+            for indicator in indicators
+        ]
+        self.by_name = {}
+        for i, indicator in enumerate(indicators):
+            self.by_name.setdefault(indicator['name'].strip().lower(), i)
+        self.index = BM25Index(
+            [
+                {
+                    'name': [indicator['name']],
+                    'paraphrase': indicator.get('paraphrase') or [],
+                    'description': [indicator.get('description') or ''],
+                }
+                for indicator in indicators
+            ]
+        )
+
+    def search(
+        self,
+        keywords: list[str],
+        top_k: int,
+    ) -> list[dict]:
+        """Return the name and description of the indicators most relevant to the keywords, best first.
+
+        Parameters
+        ----------
+        keywords : list[str]
+            The keywords or phrases to search for. A single phrase equal to an indicator name returns that indicator
+            only.
+        top_k : int
+            The maximum number of indicators to return.
+
+        Returns
+        -------
+        list[dict]
+            The 'indicator_name' and 'indicator_description' of each matching indicator.
+
+        """
+        if len(keywords) == 1 and keywords[0].strip().lower() in self.by_name:
+            return [dict(self.results[self.by_name[keywords[0].strip().lower()]])]
+        return [dict(self.results[i]) for i, _ in self.index.search(' '.join(keywords), top_k)]
+
+
+@functools.cache
+def get_indicator_search() -> IndicatorSearch:
+    """Return the search index of the indicators in 'resources/indicator_paraphrases.json'."""
+    with Path('resources', 'indicator_paraphrases.json').open() as f:
+        return IndicatorSearch(json.load(f))
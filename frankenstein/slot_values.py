@@ -7,6 +7,8 @@ from pathlib import Path
 
 import pandas as pd
 
+from frankenstein.indicator_store import get_store
+
 logging.basicConfig(level=logging.INFO)
 
 
@@ -114,8 +116,8 @@ class Year(Slot):
 
     @staticmethod
     def get_values() -> list[str]:
-        """Return past years."""
-        max_year = 2023
+        """Return the 20 years before the latest year of the indicator data."""
+        max_year = int(get_store().years[-1])
         return [f'{year}' for year in range(max_year - 20, max_year)]
 
 
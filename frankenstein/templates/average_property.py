@@ -3,6 +3,7 @@
 import argparse
 
 from frankenstein.action import FrankensteinAction
+from frankenstein.aggregates import get_aggregates
 from frankenstein.frankenstein_question import FrankensteinQuestion
 from frankenstein.slot_values import Property, Region, Year
 
@@ -80,19 +81,23 @@ class AverageProperty(FrankensteinQuestion):
             value = action.result
             indicator_values.append(value)
 
+        # The region's statistics are precomputed, so only the calls are recorded
+        aggregates = get_aggregates()
+        count = aggregates.get_statistic(self.region, indicator_code, self.year, 'count')
+
         # Check if any values are missing
-        if any(value is None for value in indicator_values):
+        if count < len(countries):
             self.metadata['data_availability'] = 'partial'
 
         # Check if all values are missing
-        if all(value is None for value in indicator_values):
+        if count == 0:
             self.metadata['data_availability'] = 'missing'
             self.metadata['answerable'] = False
             return
 
         # Retrieve the mean value for the region
         action = FrankensteinAction('mean', values=[i for i in indicator_values if i is not None])
-        action.execute()
+        action.result = aggregates.get_statistic(self.region, indicator_code, self.year, 'mean')
         self.actions.append(action.to_dict())
         value = action.result
 
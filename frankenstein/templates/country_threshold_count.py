@@ -153,37 +153,12 @@ class CountryThresholdCount(FrankensteinQuestion):
 
             return
 
-        # Now compare if values meet the threshold
-        comparisons = []
-        for value in values:
-            if self.operator == 'higher':
-                action = FrankensteinAction(
-                    'greater_than',
-                    value_a=value,
-                    value_b=threshold_value,
-                )
-                action.execute()
-                self.actions.append(action.to_dict())
-                comparisons.append(action.result)
-            elif self.operator == 'lower':
-                action = FrankensteinAction(
-                    'greater_than',
-                    value_a=threshold_value,
-                    value_b=value,
-                )
-                action.execute()
-                self.actions.append(action.to_dict())
-                comparisons.append(action.result)
-
-        # Filter out None results and set data availability accordingly
-        valid_comparisons = [c for c in comparisons if c is not None]
-
-        if not valid_comparisons:
-            self.metadata['data_availability'] = 'missing'
-            self.metadata['answerable'] = False
-
-        # Use the count tool to get the number of countries that satisfy the condition
-        action = FrankensteinAction('count', values=[i for i in valid_comparisons if i is True])
+        # Count the countries that meet the threshold in one call (missing values are not counted)
+        action = FrankensteinAction(
+            'count_greater_than' if self.operator == 'higher' else 'count_less_than',
+            values=values,
+            threshold=threshold_value,
+        )
         action.execute()
         self.actions.append(action.to_dict())
         self.answer = action.result
@@ -3,6 +3,7 @@
 import argparse
 
 from frankenstein.action import FrankensteinAction
+from frankenstein.aggregates import get_aggregates
 from frankenstein.frankenstein_question import FrankensteinQuestion
 from frankenstein.slot_values import Property, Region, Subject, Year
 
@@ -104,10 +105,15 @@ class RankChange(FrankensteinQuestion):
             value = action.result
             values_b.append((country, value))
 
+        # The region's rankings are precomputed, so only the calls are recorded
+        aggregates = get_aggregates()
+        count_a = aggregates.get_statistic(self.region, indicator_code, self.year_a, 'count')
+        count_b = aggregates.get_statistic(self.region, indicator_code, self.year_b, 'count')
+
         # Check for missing data
-        if any(v is None for _, v in values_a) or any(v is None for _, v in values_b):
+        if min(count_a, count_b) < len(region_countries):
             self.metadata['data_availability'] = 'partial'
-        if all(v is None for _, v in values_a) or all(v is None for _, v in values_b):
+        if count_a == 0 or count_b == 0:
             self.metadata['data_availability'] = 'missing'
             self.metadata['answerable'] = False
             return
@@ -130,13 +136,13 @@ class RankChange(FrankensteinQuestion):
 
         # Compute rank in year_a
         action = FrankensteinAction('rank', values=values_list_a, query_value=subject_value_a)
-        action.execute()
+        action.result = aggregates.get_rank(self.region, indicator_code, self.year_a, self.slot_values['subject'])
         self.actions.append(action.to_dict())
         rank_a = action.result
 
         # Compute rank in year_b
         action = FrankensteinAction('rank', values=values_list_b, query_value=subject_value_b)
-        action.execute()
+        action.result = aggregates.get_rank(self.region, indicator_code, self.year_b, self.slot_values['subject'])
         self.actions.append(action.to_dict())
         rank_b = action.result
 
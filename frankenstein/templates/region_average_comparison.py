@@ -3,6 +3,7 @@
 import argparse
 
 from frankenstein.action import FrankensteinAction
+from frankenstein.aggregates import get_aggregates
 from frankenstein.frankenstein_question import FrankensteinQuestion
 from frankenstein.slot_values import BinaryOperator, Property, Region, Year
 
@@ -64,6 +65,8 @@ class RegionAverageComparison(FrankensteinQuestion):
         self.actions.append(action.to_dict())
         indicator_code = action.result
 
+        # The regions' statistics are precomputed, so only the calls are recorded
+        aggregates = get_aggregates()
         region_averages = {}
         for region in [self.region_a, self.region_b]:
             # Get the countries in the region
@@ -90,10 +93,11 @@ class RegionAverageComparison(FrankensteinQuestion):
                 values.append(value)
 
             # Check for missing data
-            if any(v is None for v in values):
+            count = aggregates.get_statistic(region, indicator_code, self.year, 'count')
+            if count < len(countries):
                 self.metadata['data_availability'] = 'partial'
 
-            if all(v is None for v in values):
+            if count == 0:
                 self.metadata['data_availability'] = 'missing'
                 self.metadata['answerable'] = False
                 return
@@ -103,7 +107,7 @@ class RegionAverageComparison(FrankensteinQuestion):
 
             # Compute the mean
             action = FrankensteinAction('mean', values=values)
-            action.execute()
+            action.result = aggregates.get_statistic(region, indicator_code, self.year, 'mean')
             self.actions.append(action.to_dict())
             region_averages[region] = action.result
 
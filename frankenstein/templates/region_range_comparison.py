@@ -3,6 +3,7 @@
 import argparse
 
 from frankenstein.action import FrankensteinAction
+from frankenstein.aggregates import get_aggregates
 from frankenstein.frankenstein_question import FrankensteinQuestion
 from frankenstein.slot_values import BinaryOperator, Property, Region, Year
 
@@ -64,6 +65,8 @@ class RegionRangeComparison(FrankensteinQuestion):
         self.actions.append(action.to_dict())
         indicator_code = action.result
 
+        # The regions' statistics are precomputed, so only the calls are recorded
+        aggregates = get_aggregates()
         region_ranges = {}
         for region in [self.region_a, self.region_b]:
             # Get the countries in the region
@@ -90,10 +93,11 @@ class RegionRangeComparison(FrankensteinQuestion):
                 values.append(value)
 
             # Check for missing data
-            if any(v is None for v in values):
+            count = aggregates.get_statistic(region, indicator_code, self.year, 'count')
+            if count < len(countries):
                 self.metadata['data_availability'] = 'partial'
 
-            if all(v is None for v in values):
+            if count == 0:
                 self.metadata['data_availability'] = 'missing'
                 self.metadata['answerable'] = False
                 return
@@ -103,12 +107,12 @@ class RegionRangeComparison(FrankensteinQuestion):
 
             # Compute the range (max - min)
             action = FrankensteinAction('maximum', values=values)
-            action.execute()
+            action.result = aggregates.get_statistic(region, indicator_code, self.year, 'max')
             self.actions.append(action.to_dict())
             max_value = action.result
 
             action = FrankensteinAction('minimum', values=values)
-            action.execute()
+            action.result = aggregates.get_statistic(region, indicator_code, self.year, 'min')
             self.actions.append(action.to_dict())
             min_value = action.result
 
@@ -3,6 +3,7 @@
 import argparse
 
 from frankenstein.action import FrankensteinAction
+from frankenstein.aggregates import get_aggregates
 from frankenstein.frankenstein_question import FrankensteinQuestion
 from frankenstein.slot_values import Property, Region, Subject, Year
 
@@ -97,11 +98,15 @@ class SubjectPropertyRank(FrankensteinQuestion):
             value = action.result
             region_values.append((country, value))
 
+        # The region's rankings are precomputed, so only the calls are recorded
+        aggregates = get_aggregates()
+        count = aggregates.get_statistic(self.region, indicator_code, self.year, 'count')
+
         # Check for missing data
-        if any(v is None for _, v in region_values):
+        if count < len(region_countries):
             self.metadata['data_availability'] = 'partial'
 
-        if all(v is None for _, v in region_values):
+        if count == 0:
             self.metadata['data_availability'] = 'missing'
             self.metadata['answerable'] = False
             return
@@ -121,7 +126,7 @@ class SubjectPropertyRank(FrankensteinQuestion):
             return
 
         action = FrankensteinAction('rank', values=values_list, query_value=subject_value)
-        action.execute()
+        action.result = aggregates.get_rank(self.region, indicator_code, self.year, subject_code)
         self.actions.append(action.to_dict())
         subject_rank = action.result
 
@@ -3,6 +3,7 @@
 import argparse
 
 from frankenstein.action import FrankensteinAction
+from frankenstein.aggregates import get_aggregates
 from frankenstein.frankenstein_question import FrankensteinQuestion
 from frankenstein.slot_values import Property, Region, Year
 
@@ -78,19 +79,23 @@ class TotalProperty(FrankensteinQuestion):
             value = action.result
             property_values.append(value)
 
+        # The region's statistics are precomputed, so only the calls are recorded
+        aggregates = get_aggregates()
+        count = aggregates.get_statistic(self.region, indicator_code, self.year, 'count')
+
         # Check if all values are missing
-        if all(v is None for v in property_values):
+        if count == 0:
             self.metadata['data_availability'] = 'missing'
             self.metadata['answerable'] = False
             return
 
         # Check if any values are missing
-        if any(v is None for v in property_values):
+        if count < len(countries):
             self.metadata['data_availability'] = 'partial'
 
         # Compute the total property value
         action = FrankensteinAction('add', values=[i for i in property_values if i is not None])
-        action.execute()
+        action.result = aggregates.get_statistic(self.region, indicator_code, self.year, 'sum')
         self.actions.append(action.to_dict())
         total_value = action.result
 
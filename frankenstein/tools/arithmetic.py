@@ -1,9 +1,13 @@
 """Library of tools to be provided to the model and provide the basis for solutions."""
 
-import ast
+import math
 
+import numpy as np
 import pandas as pd
 
+from frankenstein.tools import coercion
+from frankenstein.tools import expression as expression_grammar
+
 # from rich.logging import RichHandler
 
 # logging.basicConfig(
@@ -26,10 +30,9 @@ def add(
         The sum of the numbers in the list.
 
     """
-    if isinstance(values, str):
-        values = ast.literal_eval(values)
-    values = [float(value) for value in values if pd.notna(value)]
-    return round(sum(float(value) for value in values if pd.notna(value)), 5)
+    values = coercion.to_array(values)
+    # Python's (compensated) sum keeps results identical to adding the values one by one
+    return round(sum(values.tolist()), 5)
 
 
 def subtract(
@@ -95,13 +98,8 @@ def multiply(
         The product of the numbers in the list, rounded to 5 decimal places.
 
     """
-    if isinstance(values, str):
-        values = ast.literal_eval(values)
-    values = [float(value) for value in values]
-    product = 1
-    for number in values:
-        product *= number
-    return round(product, 5)
+    values = coercion.to_array(values, drop_nan=False, allow_missing=False)
+    return round(math.prod(values.tolist()), 5)
 
 
 def divide(
@@ -135,12 +133,10 @@ def mean(
         The mean of the numbers in the list, rounded to 5 decimal places.
 
     """
-    if isinstance(values, str):
-        values = ast.literal_eval(values)
-    values = [float(value) for value in values if pd.notna(value)]
-    if not values:
+    values = coercion.to_array(values)
+    if not values.size:
         raise ValueError('No valid (non-NaN) values provided to mean()')
-    return round(sum(values) / len(values), 5)
+    return round(sum(values.tolist()) / len(values), 5)
 
 
 # def mode(
@@ -200,13 +196,10 @@ def maximum(
         The maximum of the numbers in the list.
 
     """
-    if isinstance(values, str):
-        values = ast.literal_eval(values)
-    # Filter out None/NaN values
-    values = [float(value) for value in values if pd.notna(value)]
-    if not values:
+    values = coercion.to_array(values)
+    if not values.size:
         raise ValueError('No valid (non-NaN) values provided to maximum()')
-    return round(max(values), 5)
+    return round(float(values.max()), 5)
 
 
 def minimum(
@@ -221,13 +214,10 @@ def minimum(
         The minimum of the numbers in the list.
 
     """
-    if isinstance(values, str):
-        values = ast.literal_eval(values)
-    # Filter out None/NaN values
-    values = [float(value) for value in values if pd.notna(value)]
-    if not values:
+    values = coercion.to_array(values)
+    if not values.size:
         raise ValueError('No valid (non-NaN) values provided to minimum()')
-    return round(min(values), 5)
+    return round(float(values.min()), 5)
 
 
 def count(
@@ -242,8 +232,7 @@ def count(
         The number of elements in the list.
 
     """
-    if isinstance(values, str):
-        values = ast.literal_eval(values)
+    values = coercion.parse(values)
     # Only filter out NaN (for numbers), keep bools/strings
     values = [v for v in values if pd.notna(v)]
     return len(values)
@@ -264,14 +253,16 @@ def rank(
         If there are duplicate values, the rank of the first occurrence is returned.
 
     """
-    if isinstance(values, str):
-        values = ast.literal_eval(values)
-    values = [float(value) for value in values if pd.notna(value)]
-    sorted_values = sorted(values, reverse=True)
+    values = np.sort(coercion.to_array(values))
     try:
-        return sorted_values.index(query_value) + 1
-    except ValueError as e:
-        raise ValueError(f'Value {query_value} not found in the list. Ensure it is present in the values.') from e
+        query = float(query_value)
+    except (TypeError, ValueError):
+        query = math.nan
+    # The rank of the first occurrence is one more than the number of larger values
+    first, last = np.searchsorted(values, query, side='left'), np.searchsorted(values, query, side='right')
+    if first == last:
+        raise ValueError(f'Value {query_value} not found in the list. Ensure it is present in the values.')
+    return int(len(values) - last) + 1
 
 
 def sort(
@@ -286,10 +277,7 @@ def sort(
         The sorted list of numbers.
 
     """
-    if isinstance(values, str):
-        values = ast.literal_eval(values)
-    values = [float(value) for value in values if pd.notna(value)]
-    return sorted(values)
+    return np.sort(coercion.to_array(values)).tolist()
 
 
 def index(
@@ -306,13 +294,183 @@ def index(
         The 0-based index of the first occurrence of query_value in values after filtering out NaN.
 
     """
-    if isinstance(values, str):
-        values = ast.literal_eval(values)
-    values = [float(value) for value in values if pd.notna(value)]
+    values = coercion.to_array(values)
     try:
-        return values.index(query_value)
-    except ValueError as e:
-        raise ValueError(f'Value {query_value} not found in the list. Ensure it is present in the values.') from e
+        query = float(query_value)
+    except (TypeError, ValueError):
+        query = math.nan
+    matches = np.flatnonzero(values == query)
+    if not matches.size:
+        raise ValueError(f'Value {query_value} not found in the list. Ensure it is present in the values.')
+    return int(matches[0])
+
+
+def count_greater_than(
+    values: list[float],
+    threshold: float,
+) -> int:
+    """Count the values in a list that are greater than a threshold.
+
+    Args:
+        values: A list of numbers to compare with the threshold.
+        threshold: The number to compare with.
+
+    Returns:
+        The number of values greater than threshold. NaN values are not counted.
+
+    """
+    array = coercion.to_array(values)
+    return int(np.count_nonzero(array > float(threshold)))
+
+
+def count_less_than(
+    values: list[float],
+    threshold: float,
+) -> int:
+    """Count the values in a list that are less than a threshold.
+
+    Args:
+        values: A list of numbers to compare with the threshold.
+        threshold: The number to compare with.
+
+    Returns:
+        The number of values less than threshold. NaN values are not counted.
+
+    """
+    array = coercion.to_array(values)
+    return int(np.count_nonzero(array < float(threshold)))
+
+
+def filter_greater_than(
+    values: list[float],
+    threshold: float,
+) -> list[float]:
+    """Keep the values in a list that are greater than a threshold.
+
+    Args:
+        values: A list of numbers to filter.
+        threshold: The number to compare with.
+
+    Returns:
+        The values greater than threshold, in their original order. NaN values are dropped.
+
+    """
+    array = coercion.to_array(values)
+    return array[array > float(threshold)].tolist()
+
+
+def filter_less_than(
+    values: list[float],
+    threshold: float,
+) -> list[float]:
+    """Keep the values in a list that are less than a threshold.
+
+    Args:
+        values: A list of numbers to filter.
+        threshold: The number to compare with.
+
+    Returns:
+        The values less than threshold, in their original order. NaN values are dropped.
+
+    """
+    array = coercion.to_array(values)
+    return array[array < float(threshold)].tolist()
+
+
+def argmax(
+    mapping: dict[str, float],
+) -> str:
+    """Return the key with the largest value in a mapping, e.g. the country code with the highest value.
+
+    Args:
+        mapping: A mapping of keys (e.g. country codes) to numbers.
+
+    Returns:
+        The key with the largest value. NaN values are ignored; ties go to the first key.
+
+    """
+    keys, array = coercion.to_mapping(mapping)
+    if not array.size:
+        raise ValueError('No valid (non-NaN) values provided to argmax()')
+    return keys[int(np.argmax(array))]
+
+
+def argmin(
+    mapping: dict[str, float],
+) -> str:
+    """Return the key with the smallest value in a mapping, e.g. the country code with the lowest value.
+
+    Args:
+        mapping: A mapping of keys (e.g. country codes) to numbers.
+
+    Returns:
+        The key with the smallest value. NaN values are ignored; ties go to the first key.
+
+    """
+    keys, array = coercion.to_mapping(mapping)
+    if not array.size:
+        raise ValueError('No valid (non-NaN) values provided to argmin()')
+    return keys[int(np.argmin(array))]
+
+
+def top_n(
+    mapping: dict[str, float],
+    n: int,
+    order: str = 'descending',
+) -> list[str]:
+    """Return the n keys with the largest (or smallest) values in a mapping.
+
+    Args:
+        mapping: A mapping of keys (e.g. country codes) to numbers.
+        n: The number of keys to return.
+        order: 'descending' for the keys with the largest values, 'ascending' for the smallest.
+
+    Returns:
+        Up to n keys, best first. NaN values are ignored; ties keep the order of the mapping.
+
+    """
+    if order not in ('descending', 'ascending'):
+        raise ValueError(f"Invalid order '{order}'. Use 'descending' or 'ascending'.")
+    if int(n) < 1:
+        raise ValueError(f'n must be a positive integer, not {n}.')
+    keys, array = coercion.to_mapping(mapping)
+    # A stable sort of the negated values keeps ties in mapping order when sorting descending
+    ordering = np.argsort(-array if order == 'descending' else array, kind='stable')
+    return keys[ordering[: int(n)]].tolist()
+
+
+def evaluate_expression(
+    expression: str,
+) -> float | int | bool | list[float]:
+    """Evaluate an arithmetic expression, to do several calculations in one call.
+
+    Args:
+        expression: Numbers, lists, nan, + - * / < >, parentheses and arithmetic tool calls, e.g. 'mean([1, 2]) / 4'.
+
+    Returns:
+        The value of the expression, with every step rounded and NaN-filtered as by the matching tools.
+
+    """
+    functions = {
+        'add': add,
+        'subtract': subtract,
+        'greater_than': greater_than,
+        'less_than': less_than,
+        'multiply': multiply,
+        'divide': divide,
+        'mean': mean,
+        'maximum': maximum,
+        'minimum': minimum,
+        'count': count,
+        'rank': rank,
+        'sort': sort,
+        'index': index,
+        'count_greater_than': count_greater_than,
+        'count_less_than': count_less_than,
+        'filter_greater_than': filter_greater_than,
+        'filter_less_than': filter_less_than,
+    }
+    return expression_grammar.ExpressionEvaluator(functions).evaluate(expression)
 
 
 if __name__ == '__main__':
@@ -372,3 +530,23 @@ if __name__ == '__main__':
     print('\n=== Index ===')
     print('index([10, 20, 30, 40], 30)')
     print('Result:', index([10, 20, 30, 40], 30))
+
+    print('\n=== Count Greater Than ===')
+    print('count_greater_than([10, 20, None, 40], 15)')
+    print('Result:', count_greater_than([10, 20, None, 40], 15))
+
+    print('\n=== Filter Greater Than ===')
+    print('filter_greater_than([10, 20, None, 40], 15)')
+    print('Result:', filter_greater_than([10, 20, None, 40], 15))
+
+    print('\n=== Argmax ===')
+    print("argmax({'FRA': 3.5, 'DEU': 4.2, 'ITA': None})")
+    print('Result:', argmax({'FRA': 3.5, 'DEU': 4.2, 'ITA': None}))
+
+    print('\n=== Top N ===')
+    print("top_n({'FRA': 3.5, 'DEU': 4.2, 'ITA': 1.0}, 2, 'ascending')")
+    print('Result:', top_n({'FRA': 3.5, 'DEU': 4.2, 'ITA': 1.0}, 2, 'ascending'))
+
+    print('\n=== Evaluate Expression ===')
+    print("evaluate_expression('divide(subtract(mean([1.5, 2, nan]), 1), 4) * 100')")
+    print('Result:', evaluate_expression('divide(subtract(mean([1.5, 2, nan]), 1), 4) * 100'))
@@ -0,0 +1,95 @@
+"""Coercion of tool arguments to NumPy arrays, shared by the arithmetic tools.
+
+This module is deliberately kept apart from the tool modules: every function defined in (or imported into) a tool
+module is offered to the model as a tool.
+"""
+
+import ast
+
+import numpy as np
+import pandas as pd
+
+
+def parse(value):
+    """Parse an argument passed as a string (e.g. '[1, 2, 3]') into a Python value. Other values are returned as is."""
+    if isinstance(value, str):
+        return ast.literal_eval(value)
+    return value
+
+
+def to_array(
+    values,
+    drop_nan: bool = True,
+    allow_missing: bool = True,
+) -> np.ndarray:
+    """Convert a list of numbers (or its string form) to a float64 array.
+
+    Lists of numbers, numeric strings and None are converted in one NumPy call, with None becoming NaN. Only lists
+    holding values NumPy cannot convert (e.g. `pd.NA`) fall back to converting each value, so missing values are
+    always those for which `pd.notna` is False, as in the tools' original per-element filtering.
+
+    Parameters
+    ----------
+    values : list | tuple | np.ndarray | pd.Series | str
+        The values to convert.
+    drop_nan : bool
+        Whether to drop missing values.
+    allow_missing : bool
+        Whether missing values other than NaN (e.g. None) are accepted as NaN. If False, they raise the TypeError
+        that `float` raises for them, as tools converting each value with `float` did.
+
+    Returns
+    -------
+    np.ndarray
+        A one-dimensional float64 array.
+
+    Raises
+    ------
+    ValueError
+        If the values are not a flat list of numbers.
+    TypeError
+        If `allow_missing` is False and a value is None or another missing value that is not NaN.
+
+    """
+    values = parse(values)
+    if isinstance(values, np.ndarray) and values.dtype == np.float64:
+        array = values
+    else:
+        try:
+            array = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            array = np.array([float(v) if pd.notna(v) else np.nan for v in values], dtype=np.float64)
+    if array.ndim != 1:
+        raise ValueError(f'Expected a flat list of numbers, got {values!r}.')
+    if not allow_missing and np.isnan(array).any() and array is not values:
+        for value in values:
+            if not isinstance(value, (float, np.floating)) and pd.isna(value):
+                float(value)  # Raises the TypeError of the original per-element conversion
+    if drop_nan:
+        missing = np.isnan(array)
+        if missing.any():
+            array = array[~missing]
+    return array
+
+
+def to_mapping(mapping) -> tuple[np.ndarray, np.ndarray]:
+    """Convert a mapping of keys to numbers (or its string form) to arrays of keys and values, without missing values.
+
+    Parameters
+    ----------
+    mapping : dict | str
+        The mapping to convert, e.g. {'FRA': 3.5, 'DEU': None}.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The keys (as an object array) and float64 values of the entries whose value is not missing, in mapping order.
+
+    """
+    mapping = parse(mapping)
+    if not isinstance(mapping, dict):
+        raise ValueError(f'Expected a mapping of keys to numbers, got {mapping!r}.')
+    keys = np.asarray(list(mapping), dtype=object)
+    array = to_array(list(mapping.values()), drop_nan=False)
+    valid = ~np.isnan(array)
+    return keys[valid], array[valid]
@@ -7,14 +7,20 @@ from pathlib import Path
 import pandas as pd
 from rich.logging import RichHandler
 
+from frankenstein import aggregates as region_aggregates
 from frankenstein.exceptions import (
     InvalidCountryCodeError,
     InvalidCountryNameError,
     InvalidIndicatorCodeError,
     InvalidIndicatorNameError,
     InvalidRegionNameError,
+    InvalidToolArgumentError,
     NoDataAvailableError,
+    NoRegionDataAvailableError,
 )
+from frankenstein.indicator_store import get_store
+from frankenstein.name_index import get_country_index, get_indicator_index, get_region_index
+from frankenstein.search_index import get_indicator_search
 
 logging.basicConfig(
     level=logging.INFO,
@@ -26,68 +32,39 @@ logging.basicConfig(
 
 def search_for_indicator_names(
     keywords: list[str] | str,
-) -> list[dict]:
-    """Retrieve indicator names and descriptions that match the given keywords.
+    top_k: int = 10,
+    offset: int = 0,
+) -> list[dict | str]:
+    """Retrieve the indicator names and descriptions most relevant to the given keywords.
 
     Args:
         keywords: A list of keywords or a string to search for.
+        top_k: The maximum number of indicators to return.
+        offset: The number of most relevant indicators to skip, to see the ones after them.
 
     Returns:
-        A list of dictionaries containing the indicator names and descriptions that match the keywords.
+        A list of dictionaries containing the names and descriptions of the matching indicators, most relevant first, followed by a note with the offset of the next ones if more indicators match.
 
     """
-    indicator_key = pd.read_json(Path('resources', 'indicator_paraphrases.json'))
-    indicator_key['original_name'] = indicator_key['name']
-    indicator_key['name'] = indicator_key['name'].str.lower()
-    indicator_key = indicator_key.drop('paraphrase', axis=1)
-    indicator_key = indicator_key.rename(
-        columns={
-            'original_name': 'indicator_name',
-            'description': 'indicator_description',
-        }
-    )
-    indicator_key = indicator_key.to_dict(orient='records')
-
-    def clean_dict(indicators: list[dict]) -> list[dict]:
-        """Clean the indicator dictionary by removing 'name' and 'id' keys from dicts."""
-        cleaned_dict = []
-        for indicator in indicators:
-            cleaned_indicator = {k: v for k, v in indicator.items() if k in ['indicator_name', 'indicator_description']}
-            # cleaned_indicator['indicator_name'] = cleaned_indicator.pop('original_name')
-            # cleaned_indicator['indicator_description'] = cleaned_indicator.pop('description', '')
-            cleaned_dict.append(cleaned_indicator)
-        return cleaned_dict
-
     if isinstance(keywords, str):
-        # First check for exact match on original name
-        result = [item for item in indicator_key if item['name'] == keywords]
-        if result:
-            return clean_dict(result)
-
-        # Otherwise, treat as a string to search for
         try:
             # Try to parse string representation of a list, e.g., "['freshwater', 'resources']"
-            keywords = ast.literal_eval(keywords)
+            parsed = ast.literal_eval(keywords)
         except Exception:
-            # If not formatted as a list, treat as a single keyword
-            keywords = [keywords]
-
-    expanded_keywords = []
-    for keyword in keywords:
-        for k in keyword.split():
-            expanded_keywords.append(k.strip(','))
-
-    matched_indicators = []
-    # Now, treat each element in the list as a phrase to be searched for in name or description
-    for indicator in indicator_key:
-        for keyword in expanded_keywords:
-            if keyword.lower() in [
-                k.strip('(),') for k in indicator['name'].split()
-            ]:  # or keyword in indicator['indicator_description']:
-                matched_term = keyword.strip().lower()
-                matched_indicators.append(indicator)
-
-    return clean_dict(matched_indicators)
+            parsed = None
+        # If not formatted as a list, treat as a single phrase
+        keywords = [str(k) for k in parsed] if isinstance(parsed, list) else [keywords]
+
+    offset, top_k = max(int(offset), 0), int(top_k)
+    # One more than asked for, to tell whether more indicators match
+    results = get_indicator_search().search([str(k) for k in keywords], offset + top_k + 1)[offset:]
+    if len(results) > top_k:
+        results = results[:top_k]
+        results.append(
+            f'More indicators match. If the indicator you need is not listed, search again with more specific '
+            f'keywords, or with the same keywords and offset={offset + top_k} to see the next ones.'
+        )
+    return results
 
 
 def get_country_code_from_name(
@@ -102,11 +79,11 @@ def get_country_code_from_name(
         The three-letter country code.
 
     """
-    data = pd.read_csv(Path('resources', 'un_m49_cleaned.csv'))
-    try:
-        return data[data['country_name'] == country_name]['country_code'].to_list()[0]
-    except IndexError as e:
-        raise InvalidCountryNameError(country_name) from e
+    index = get_country_index()
+    country_code = index.get(country_name)
+    if country_code is None:
+        raise InvalidCountryNameError(country_name, index.suggest(country_name))
+    return country_code
 
 
 def get_country_name_from_code(
@@ -140,11 +117,11 @@ def get_indicator_code_from_name(
         The indicator code.
 
     """
-    data = pd.read_csv(Path('resources', 'wdi.csv'))
-    try:
-        return data[data['name'] == indicator_name.strip()]['id'].to_list()[0]
-    except IndexError as e:
-        raise InvalidIndicatorNameError(indicator_name) from e
+    index = get_indicator_index()
+    indicator_code = index.get(indicator_name.strip())
+    if indicator_code is None:
+        raise InvalidIndicatorNameError(indicator_name, index.suggest(indicator_name))
+    return indicator_code
 
 
 def get_indicator_name_from_code(
@@ -180,8 +157,9 @@ def get_country_codes_in_region(
     """
     data = pd.read_csv(Path('resources', 'un_m49_cleaned.csv'))
 
-    if region not in data['region'].tolist():
-        raise InvalidRegionNameError(region)
+    index = get_region_index()
+    if index.get(region) is None:
+        raise InvalidRegionNameError(region, index.suggest(region))
 
     return data[data['region'] == region]['country_code'].tolist()
 
@@ -206,30 +184,13 @@ def retrieve_value(
         InvalidIndicatorCodeError: If the file for the indicator code does not exist.
 
     """
-    # Check country code is valid
-    data = pd.read_csv(Path('resources', 'un_m49_cleaned.csv'))
-    if country_code not in data['country_code'].tolist():
+    store = get_store()
+    if country_code not in store.country_index:
         raise InvalidCountryCodeError(country_code)
+    if indicator_code not in store.indicator_index:
+        raise InvalidIndicatorCodeError(indicator_code)
 
-    try:
-        data = pd.read_csv(
-            Path('resources', 'wdi', f'{indicator_code}.csv'),
-            index_col='country_code',
-        )
-    except FileNotFoundError as e:
-        raise InvalidIndicatorCodeError(indicator_code) from e
-
-    try:
-        value = data.loc[country_code, year]
-    except KeyError as e:
-        raise NoDataAvailableError(
-            {
-                'country_code': country_code,
-                'indicator_code': indicator_code,
-                'year': year,
-            }
-        ) from e
-
+    value = store.get_value(country_code, indicator_code, year)
     if pd.isna(value):
         raise NoDataAvailableError(
             {
@@ -243,6 +204,124 @@ def retrieve_value(
     # return {'subject': country_code, 'property': indicator_code, 'object': float(value), 'time': year}
 
 
+def retrieve_series(
+    country_code: str,
+    indicator_code: str,
+    start_year: str,
+    end_year: str,
+) -> dict[str, float | None]:
+    """Return the values of an indicator for a country over a range of years, in one call.
+
+    Args:
+        country_code: The three-letter country code to look up the indicator for.
+        indicator_code: The indicator code to look up.
+        start_year: The first year of the range.
+        end_year: The last year of the range (inclusive).
+
+    Returns:
+        A mapping from each year of the range to its value, rounded to 5 decimal places, or null where no data is
+        available.
+
+    Raises:
+        InvalidCountryCodeError: If the country code is not valid.
+        InvalidIndicatorCodeError: If the indicator code is not valid.
+        InvalidYearError: If a year is not valid or is outside the years of the data.
+
+    """
+    store = get_store()
+    if country_code not in store.country_index:
+        raise InvalidCountryCodeError(country_code)
+    if indicator_code not in store.indicator_index:
+        raise InvalidIndicatorCodeError(indicator_code)
+    start_year, end_year = store.check_year(start_year), store.check_year(end_year)
+    if int(start_year) > int(end_year):
+        raise InvalidToolArgumentError('retrieve_series', f"start_year '{start_year}' is after end_year '{end_year}'")
+
+    series = store.get_series(country_code, indicator_code, start_year, end_year)
+    return {year: None if pd.isna(value) else round(float(value), 5) for year, value in series.items()}
+
+
+def retrieve_matrix(
+    country_codes: list[str],
+    indicator_code: str,
+    start_year: str,
+    end_year: str,
+) -> dict[str, dict[str, float | None]]:
+    """Return the values of an indicator for several countries over a range of years, in one call.
+
+    Args:
+        country_codes: The three-letter country codes to look up the indicator for.
+        indicator_code: The indicator code to look up.
+        start_year: The first year of the range.
+        end_year: The last year of the range (inclusive); use the same year as start_year for a single year.
+
+    Returns:
+        A mapping from each country code to a mapping from each year to its value, or null where no data is available.
+
+    Raises:
+        InvalidCountryCodeError: If a country code is not valid.
+        InvalidIndicatorCodeError: If the indicator code is not valid.
+        InvalidYearError: If a year is not valid or is outside the years of the data.
+
+    """
+    if isinstance(country_codes, str):
+        country_codes = ast.literal_eval(country_codes)
+    store = get_store()
+    for country_code in country_codes:
+        if country_code not in store.country_index:
+            raise InvalidCountryCodeError(country_code)
+    if indicator_code not in store.indicator_index:
+        raise InvalidIndicatorCodeError(indicator_code)
+    start_year, end_year = store.check_year(start_year), store.check_year(end_year)
+    if int(start_year) > int(end_year):
+        raise InvalidToolArgumentError('retrieve_matrix', f"start_year '{start_year}' is after end_year '{end_year}'")
+
+    matrix = store.get_matrix(list(country_codes), indicator_code, start_year, end_year)
+    return {
+        country_code: {year: None if pd.isna(value) else round(float(value), 5) for year, value in series.items()}
+        for country_code, series in matrix.items()
+    }
+
+
+def region_statistic(
+    region: str,
+    indicator_code: str,
+    year: str,
+    statistic: str,
+) -> float | int:
+    """Return a statistic of an indicator over the countries of a region in a given year, in one call.
+
+    Args:
+        region: The region to compute the statistic for.
+        indicator_code: The indicator code to look up.
+        year: The year to look up the indicator for.
+        statistic: One of 'count' (countries with data), 'sum', 'mean', 'min' or 'max'.
+
+    Returns:
+        The statistic over the countries of the region with data, rounded to 5 decimal places. The same as calling
+        retrieve_value for each country in the region and then count, add, mean, minimum or maximum.
+
+    Raises:
+        InvalidRegionNameError: If the region is not valid.
+        InvalidIndicatorCodeError: If the indicator code is not valid.
+        NoRegionDataAvailableError: If no country in the region has data for the indicator and year.
+
+    """
+    if statistic not in region_aggregates.STATISTICS:
+        statistics = ', '.join(map(repr, region_aggregates.STATISTICS))
+        raise InvalidToolArgumentError('region_statistic', f"argument 'statistic' must be one of {statistics}")
+    index = get_region_index()
+    if index.get(region) is None:
+        raise InvalidRegionNameError(region, index.suggest(region))
+    if indicator_code not in get_store().indicator_index:
+        raise InvalidIndicatorCodeError(indicator_code)
+
+    aggregates = region_aggregates.get_aggregates()
+    if statistic != 'count' and not aggregates.get_statistic(region, indicator_code, year, 'count'):
+        raise NoRegionDataAvailableError({'region': region, 'indicator_code': indicator_code, 'year': year})
+    return aggregates.get_statistic(region, indicator_code, year, statistic)
+
+
 if __name__ == '__main__':
     print('\n=== Search for Indicator Codes ===')
     print('search_for_indicator_names("Children enrolled in preprimary education")')
@@ -0,0 +1,152 @@
+"""Restricted grammar of arithmetic expressions, evaluated with the arithmetic tools.
+
+This module is deliberately kept apart from the tool modules: every function defined in (or imported into) a tool
+module is offered to the model as a tool.
+"""
+
+import ast
+import math
+from collections.abc import Callable
+
+MAX_EXPRESSION_LENGTH = 2000
+MAX_NODES = 500
+
+# Operators and the tool applying each of them, called with a list of operands if `True`, or with two values if not
+BINARY_OPERATORS = {
+    ast.Add: ('add', True),
+    ast.Sub: ('subtract', False),
+    ast.Mult: ('multiply', True),
+    ast.Div: ('divide', False),
+}
+COMPARISON_OPERATORS = {
+    ast.Gt: 'greater_than',
+    ast.Lt: 'less_than',
+}
+NAN_NAMES = {'nan', 'NaN', 'None', 'null'}
+
+GRAMMAR = (
+    'Expressions may only contain numbers, lists of numbers, nan, the operators + - * / < >, parentheses, and calls '
+    'to the arithmetic tools'
+)
+
+
+class ExpressionEvaluator:
+    """Evaluate an arithmetic expression by walking its syntax tree, refusing anything outside the grammar.
+
+    Every operator is applied by the tool of the same meaning (e.g. `a / b` by `divide(a, b)`), so an expression
+    returns exactly what the equivalent chain of tool calls would, including the rounding of each intermediate result
+    to 5 decimal places and the filtering of NaN values from lists.
+    """
+
+    def __init__(
+        self,
+        functions: dict[str, Callable],
+    ) -> None:
+        """Initialize the evaluator.
+
+        Parameters
+        ----------
+        functions : dict[str, Callable]
+            The tools expressions may call, by name. They must include the tools applying the operators.
+
+        """
+        self.functions = functions
+
+    def refuse(
+        self,
+        what: str,
+    ) -> ValueError:
+        """Return the error raised for a part of an expression outside the grammar."""
+        return ValueError(f'{what} is not allowed. {GRAMMAR}: {", ".join(sorted(self.functions))}.')
+
+    def evaluate(
+        self,
+        expression: str,
+    ):
+        """Parse and evaluate an expression.
+
+        Parameters
+        ----------
+        expression : str
+            The expression, e.g. 'divide(subtract(mean([1, 2, 3]), 2), 4) * 100'.
+
+        Returns
+        -------
+        float | int | bool | list[float]
+            The value of the expression.
+
+        Raises
+        ------
+        ValueError
+            If the expression cannot be parsed or is outside the grammar, or if a tool raises it.
+
+        """
+        if not isinstance(expression, str):
+            raise ValueError(f'The expression must be a string, not {type(expression).__name__}.')
+        if len(expression) > MAX_EXPRESSION_LENGTH:
+            raise ValueError(
+                f'The expression is {len(expression)} characters long; at most {MAX_EXPRESSION_LENGTH} are allowed. '
+                'Split it into several calls.'
+            )
+        try:
+            tree = ast.parse(expression.strip(), mode='eval')
+        except (SyntaxError, RecursionError, MemoryError) as e:
+            raise ValueError(f'Could not parse the expression {expression!r}. {GRAMMAR}.') from e
+
+        nodes = sum(1 for _ in ast.walk(tree))
+        if nodes > MAX_NODES:
+            raise ValueError(f'The expression has {nodes} parts; at most {MAX_NODES} are allowed. Split it up.')
+        return self.visit(tree.body)
+
+    def visit(
+        self,
+        node: ast.AST,
+    ):
+        """Evaluate a node of the syntax tree."""
+        if isinstance(node, ast.Constant):
+            if node.value is None:
+                return math.nan
+            if isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+                return node.value
+            raise self.refuse(f'The constant {node.value!r}')
+
+        if isinstance(node, ast.Name):
+            if node.id in NAN_NAMES:
+                return math.nan
+            if node.id in self.functions:
+                raise self.refuse(f"Using the tool '{node.id}' without calling it")
+            raise self.refuse(f"The name '{node.id}'")
+
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return [self.visit(element) for element in node.elts]
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+            operand = self.visit(node.operand)
+            if isinstance(operand, bool) or not isinstance(operand, (int, float)):
+                raise ValueError(f'Unary {"-" if isinstance(node.op, ast.USub) else "+"} applies to numbers only.')
+            return -operand if isinstance(node.op, ast.USub) else operand
+
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            name, takes_list = BINARY_OPERATORS[type(node.op)]
+            left, right = self.visit(node.left), self.visit(node.right)
+            return self.functions[name]([left, right]) if takes_list else self.functions[name](left, right)
+
+        if isinstance(node, ast.Compare):
+            if len(node.ops) != 1 or type(node.ops[0]) not in COMPARISON_OPERATORS:
+                raise self.refuse('A comparison other than a single < or >')
+            name = COMPARISON_OPERATORS[type(node.ops[0])]
+            return self.functions[name](self.visit(node.left), self.visit(node.comparators[0]))
+
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in self.functions:
+                raise self.refuse(f"Calling '{ast.unparse(node.func)}'")
+            if any(isinstance(arg, ast.Starred) for arg in node.args) or any(kw.arg is None for kw in node.keywords):
+                raise self.refuse('Unpacking arguments with * or **')
+            args = [self.visit(arg) for arg in node.args]
+            kwargs = {kw.arg: self.visit(kw.value) for kw in node.keywords}
+            try:
+                return self.functions[node.func.id](*args, **kwargs)
+            except TypeError as e:
+                raise ValueError(f"Invalid arguments to '{node.func.id}': {e}") from e
+
+        raise self.refuse(f"'{ast.unparse(node)}'")
@@ -1,14 +1,24 @@
 import ast  # <-- Add this import
+import functools
+import hashlib
 import inspect
 import json
 import re
+from pathlib import Path
 from typing import Union, get_args, get_origin
 
 import rich.console
 import rich.table
 
+from frankenstein.indicator_store import get_store
 from frankenstein.tools import arithmetic, data_retrieval, utils
 
+DATA_FILES = (
+    Path('resources', 'wdi.csv'),
+    Path('resources', 'un_m49_cleaned.csv'),
+    Path('resources', 'indicator_paraphrases.json'),
+)
+
 
 def parse_json_arguments(obj):
     """Recursively parse JSON-formatted argument strings in tool_calls and any string that looks like a JSON list/dict."""
@@ -162,6 +172,10 @@ def python_type_to_openai(
         item_type = python_type_to_openai(args[0]) if args else {'type': 'string'}
         return {'type': 'array', 'items': item_type}
 
+    if origin is dict or python_type is dict:
+        value_type = python_type_to_openai(args[1]) if len(args) == 2 else {}
+        return {'type': 'object', 'additionalProperties': value_type}
+
     if origin is Union:
         return python_type_to_openai(args[0])  # Simplified fallback
 
@@ -267,6 +281,49 @@ def get_tool_metadata(
     return metadata
 
 
+@functools.lru_cache(maxsize=1)
+def get_resource_version() -> str:
+    """Return a short content hash of the resource files the tools read from, other than the indicator values."""
+    digest = hashlib.sha256()
+    for path in DATA_FILES:
+        if not path.exists():
+            continue
+        digest.update(path.as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def get_data_version(
+    indicator_codes: list[str] | None = None,
+) -> str:
+    """Return a short content hash of the data the tools read from.
+
+    Used to key caches (e.g. n-shot examples and memoized tool results) so they are invalidated when the data changes.
+    The indicator values are covered by the versions of the indicator store, which change when its values are
+    updated, so the version is current after an update without hashing any file again.
+
+    Parameters
+    ----------
+    indicator_codes : list[str] | None
+        The indicators whose values to cover, e.g. the one a tool call reads, so updating other indicators leaves the
+        version unchanged. All indicators and years are covered if not given.
+
+    Returns
+    -------
+    str
+        The first 12 hex characters of a SHA-256 digest over the resource files and the indicator store versions.
+
+    """
+    store = get_store()
+    digest = hashlib.sha256(get_resource_version().encode())
+    if indicator_codes is None:
+        digest.update(store.version.encode())
+    else:
+        for code in indicator_codes:
+            digest.update(f'{code}:{store.indicator_versions.get(code, "")};'.encode())
+    return digest.hexdigest()[:12]
+
+
 if __name__ == '__main__':
     # Example usage
     metadata = get_tool_metadata(toolbox='all')
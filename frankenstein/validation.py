@@ -0,0 +1,311 @@
+"""Validation and coercion of tool call arguments, compiled once per tool from its type hints."""
+
+import ast
+import functools
+import inspect
+import json
+import math
+import types
+import typing
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+
+from frankenstein.exceptions import InvalidToolArgumentError
+
+# Tools whose arguments are passed through as is, as they echo model output rather than compute anything
+UNVALIDATED_TOOLS = frozenset({'think', 'final_answer'})
+
+
+def describe(value) -> str:
+    """Return a short representation of a value for error messages."""
+    text = 'null' if value is None else repr(value)
+    return text if len(text) <= 60 else text[:57] + '...'
+
+
+def is_missing(value) -> bool:
+    """Return whether a value inside a list or mapping stands for a missing number (None, NaN, pd.NA or pd.NaT)."""
+    return value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and math.isnan(value))
+
+
+def parse_literal(value: str):
+    """Parse a list or mapping passed as a string, e.g. '[1, 2, null]' or "['a', 'b']"."""
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return ast.literal_eval(value.strip())
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        raise ValueError(f'could not parse {describe(value)}') from None
+
+
+def to_float(value) -> float:
+    """Convert a number or numeric string to a float."""
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    raise ValueError(f'expected a number, got {describe(value)}')
+
+
+def to_optional_float(value) -> float:
+    """Convert an item of a list or mapping of numbers to a float: missing values become NaN and booleans 0 or 1."""
+    if is_missing(value):
+        return math.nan
+    if isinstance(value, (bool, np.bool_)):
+        return float(value)
+    return to_float(value)
+
+
+def to_int(value) -> int:
+    """Convert an integer, integral float or integer string to an int."""
+    if isinstance(value, str):
+        try:
+            value = float(value.strip())
+        except ValueError:
+            pass
+    if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return int(value)
+    raise ValueError(f'expected an integer, got {describe(value)}')
+
+
+def to_str(value) -> str:
+    """Convert a string or number to a string, writing integral floats without a fractional part (e.g. '2019')."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        return str(int(value)) if float(value).is_integer() else str(value)
+    raise ValueError(f'expected a string, got {describe(value)}')
+
+
+def to_bool(value) -> bool:
+    """Convert a boolean or 'true'/'false' string to a bool."""
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in {'true', 'false'}:
+        return value.strip().lower() == 'true'
+    raise ValueError(f'expected true or false, got {describe(value)}')
+
+
+def to_float_array(value) -> np.ndarray | list:
+    """Convert a list of numbers (or its string form) to a float64 array, with missing values as NaN.
+
+    The whole list is converted in one NumPy call; items are only checked one by one to report which item is not a
+    number. Lists holding missing values other than NaN (e.g. None or `pd.NA`) are returned as is, for the tool's own
+    handling of missing values: some tools drop them, others (e.g. `multiply`) reject them.
+    """
+    if isinstance(value, str):
+        value = parse_literal(value)
+    if not isinstance(value, (list, tuple, np.ndarray)):
+        raise ValueError(f'expected a list of numbers, got {describe(value)}')
+    try:
+        array = np.asarray(value, dtype=np.float64)
+    except (TypeError, ValueError):
+        array = None
+    if array is not None and array.ndim == 1:
+        # NumPy turns None into NaN, so only look for missing markers when the array holds NaN
+        if isinstance(value, np.ndarray) or not np.isnan(array).any():
+            return array
+        if not any(is_missing(item) and not isinstance(item, float) for item in value):
+            return array
+
+    for i, item in enumerate(value):
+        if not is_missing(item):
+            try:
+                to_float(item)
+            except ValueError:
+                raise ValueError(f'expected a list of numbers, but item {i} is {describe(item)}') from None
+    if array is None or array.ndim == 1:
+        return list(value)
+    raise ValueError(f'expected a flat list of numbers, got {describe(value)}')
+
+
+def compile_converter(
+    annotation,
+    item: bool = False,
+) -> Callable:
+    """Build the function converting an argument to the type it is annotated with.
+
+    Parameters
+    ----------
+    annotation : type
+        The type hint of the parameter, e.g. `float`, `list[float]`, `dict[str, float]` or `list[str] | str`.
+    item : bool
+        Whether the value is an item of a list or mapping, where numbers may be missing (see `to_optional_float`).
+
+    Returns
+    -------
+    Callable
+        A function returning the converted value, or raising ValueError describing what was expected.
+
+    """
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin in (typing.Union, types.UnionType):
+        allow_none = type(None) in args
+        converters = [compile_converter(arg, item) for arg in args if arg is not type(None)]
+
+        def convert_union(value):
+            if value is None and allow_none:
+                return None
+            problems = []
+            for converter in converters:
+                try:
+                    return converter(value)
+                except ValueError as e:
+                    problems.append(str(e))
+            raise ValueError(' or '.join(problems))
+
+        return convert_union
+
+    if origin in (list, tuple) or annotation in (list, tuple):
+        item_type = args[0] if args else typing.Any
+        if item_type is float:
+            return to_float_array
+        item_converter = compile_converter(item_type, item=True)
+
+        def convert_list(value):
+            if isinstance(value, str):
+                value = parse_literal(value)
+            if not isinstance(value, (list, tuple, np.ndarray)):
+                raise ValueError(f'expected a list, got {describe(value)}')
+            converted = []
+            for i, element in enumerate(value):
+                try:
+                    converted.append(item_converter(element))
+                except ValueError as e:
+                    raise ValueError(f'item {i} is invalid: {e}') from None
+            return converted
+
+        return convert_list
+
+    if origin is dict or annotation is dict:
+        value_converter = compile_converter(args[1] if len(args) == 2 else typing.Any, item=True)
+
+        def convert_dict(value):
+            if isinstance(value, str):
+                value = parse_literal(value)
+            if not isinstance(value, dict):
+                raise ValueError(f'expected a mapping, got {describe(value)}')
+            converted = {}
+            for key, element in value.items():
+                try:
+                    converted[str(key)] = value_converter(element)
+                except ValueError as e:
+                    raise ValueError(f'the value of {describe(key)} is invalid: {e}') from None
+            return converted
+
+        return convert_dict
+
+    if annotation is float:
+        return to_optional_float if item else to_float
+    return {int: to_int, str: to_str, bool: to_bool}.get(annotation, lambda value: value)
+
+
+class ToolValidator:
+    """Validate and convert the arguments of calls to one tool, following the tool's signature and type hints.
+
+    Numbers passed as strings, lists and mappings passed as strings, and years passed as numbers are converted.
+    Lists of numbers are converted to float64 arrays in one step, so the tools do not parse them again. Unknown,
+    missing and unconvertible arguments raise an `InvalidToolArgumentError` naming the argument and the problem,
+    before the tool is called.
+    """
+
+    def __init__(
+        self,
+        function: Callable,
+    ) -> None:
+        """Compile the validator of a tool.
+
+        Parameters
+        ----------
+        function : Callable
+            The tool function.
+
+        """
+        self.name = function.__name__
+        hints = typing.get_type_hints(function)
+        parameters = inspect.signature(function).parameters.values()
+        self.converters = {p.name: compile_converter(hints.get(p.name, typing.Any)) for p in parameters}
+        self.required = [p.name for p in parameters if p.default is inspect.Parameter.empty]
+
+    def __call__(
+        self,
+        arguments: dict,
+    ) -> dict:
+        """Validate and convert the arguments of a call.
+
+        Parameters
+        ----------
+        arguments : dict
+            The arguments of the call, by parameter name.
+
+        Returns
+        -------
+        dict
+            The converted arguments.
+
+        Raises
+        ------
+        InvalidToolArgumentError
+            If an argument is unknown, missing or cannot be converted to the parameter's type.
+
+        """
+        unknown = [key for key in arguments if key not in self.converters]
+        if unknown:
+            raise InvalidToolArgumentError(
+                self.name,
+                f'unknown argument(s) {", ".join(map(repr, unknown))}; its arguments are {", ".join(self.converters)}',
+            )
+        missing = [key for key in self.required if key not in arguments]
+        if missing:
+            raise InvalidToolArgumentError(self.name, f'missing argument(s) {", ".join(map(repr, missing))}')
+
+        converted = {}
+        for key, value in arguments.items():
+            try:
+                converted[key] = self.converters[key](value)
+            except ValueError as e:
+                raise InvalidToolArgumentError(self.name, f"argument '{key}' {e}") from None
+        return converted
+
+
+@functools.cache
+def get_validator(function: Callable) -> ToolValidator:
+    """Return the validator of a tool, compiling it on first use."""
+    return ToolValidator(function)
+
+
+def validate_arguments(
+    name: str,
+    function: Callable,
+    arguments: dict,
+) -> dict:
+    """Validate and convert the arguments of a tool call, except for tools in `UNVALIDATED_TOOLS`.
+
+    Parameters
+    ----------
+    name : str
+        The name of the tool.
+    function : Callable
+        The tool function.
+    arguments : dict
+        The arguments of the call.
+
+    Returns
+    -------
+    dict
+        The converted arguments.
+
+    """
+    if name in UNVALIDATED_TOOLS:
+        return arguments
+    return get_validator(function)(arguments)
@@ -33,12 +33,14 @@ class WDIDataFetcher:
         year_start: int = YEAR_BEGIN,
         year_end: int = YEAR_END,
         overwrite: bool = False,
+        update: bool = False,
     ):
         self.featured = featured
         self.output = output
         self.year_start = year_start
         self.year_end = year_end
         self.overwrite = overwrite
+        self.update = update
         self.data_path = DATA_PATH
         self.wdi_ind_dir = WDI_IND_DIR
         self.un_m49_cleaned_path = UN_M49_PATH
@@ -164,6 +166,7 @@ class WDIDataFetcher:
         indicator_data: list,
         country_codes: list,
         save_path: Path,
+        merge: bool = False,
     ) -> None:
         """Save the indicator_data data to a CSV file.
 
@@ -175,15 +178,57 @@ class WDIDataFetcher:
             List of ISO 3166-1 alpha-3 country codes to filter the data.
         save_path : Path
             Path to save the CSV file.
+        merge : bool
+            If True, merge the data into the existing file: fetched values replace existing ones, and other values
+            are kept.
 
         """
         df = pd.DataFrame(indicator_data)
         pivot = df.pivot_table(index='countryiso3code', columns='date', values='value')
         pivot = pivot[pivot.index.isin(country_codes)]
         pivot.index.name = 'country_code'
+        if merge and save_path.exists():
+            existing = pd.read_csv(save_path, index_col='country_code')
+            pivot = pivot.rename(columns=str).combine_first(existing.rename(columns=str))
+            pivot = pivot[sorted(pivot.columns, key=int)]
         pivot = pivot.sort_index()
         pivot.to_csv(save_path)
 
+    def update_indicator_data(
+        self,
+        indicators: list,
+        country_codes: list,
+    ) -> None:
+        """Fetch the years after the last year of each existing indicator file, up to year_end, and merge them in.
+
+        Only the new years are requested and written, so moving `YEAR_END` forward does not re-fetch every indicator.
+        Processes holding the indicator store can pick up the new values with `get_store().refresh()`.
+
+        Parameters
+        ----------
+        indicators : list
+            The indicators with an existing file.
+        country_codes : list
+            List of ISO 3166-1 alpha-3 country codes to filter the data.
+
+        """
+        stale = []
+        for i in indicators:
+            path = self.wdi_ind_dir / f'{i["id"]}.csv'
+            years = [int(year) for year in pd.read_csv(path, nrows=0).columns if year != 'country_code']
+            last_year = max(years, default=self.year_start - 1)
+            if last_year < self.year_end:
+                stale.append((i, path, max(last_year + 1, self.year_start)))
+        self.console.log(
+            f'[cyan]Update[/cyan]        {len(stale)} of {len(indicators)} indicators have years to fetch up to {self.year_end}'
+        )
+
+        for i, path, year_begin in stale:
+            data = self.fetch_indicator_data(i['id'], year_begin, self.year_end)
+            if data:
+                self.save_indicator_data(data, country_codes, path, merge=True)
+            time.sleep(0.1)
+
     def ensure_dirs(
         self,
     ) -> None:
@@ -212,6 +257,9 @@ class WDIDataFetcher:
 
         output_csv_path = self.data_path / self.output
 
+        if self.update and not self.overwrite and already_present:
+            self.update_indicator_data(already_present, country_codes)
+
         if self.overwrite:
             self.console.log('[bold yellow]Overwrite enabled: re-fetching all indicators.[/bold yellow]')
             missing_indicators = indicators
@@ -273,9 +321,12 @@ def main():
     parser = argparse.ArgumentParser(description='Fetch World Development Indicators data from the World Bank API.')
     parser.add_argument('--featured', action='store_true', help='Fetch only featured indicators.')
     parser.add_argument('--output', type=str, default='wdi.csv', help='Output CSV filename (default: wdi.csv)')
-    parser.add_argument('--year-start', type=int, default=2003, help='Start year (default: 2003)')
-    parser.add_argument('--year-end', type=int, default=2023, help='End year (default: 2023)')
+    parser.add_argument('--year-start', type=int, default=YEAR_BEGIN, help=f'Start year (default: {YEAR_BEGIN})')
+    parser.add_argument('--year-end', type=int, default=YEAR_END, help=f'End year (default: {YEAR_END})')
     parser.add_argument('--overwrite', action='store_true', help='Overwrite existing output file if present')
+    parser.add_argument(
+        '--update', action='store_true', help='Fetch only the years after those in existing indicator files'
+    )
     args = parser.parse_args()
 
     fetcher = WDIDataFetcher(
@@ -284,6 +335,7 @@ def main():
         year_start=args.year_start,
         year_end=args.year_end,
         overwrite=args.overwrite,
+        update=args.update,
     )
     fetcher.run()
 